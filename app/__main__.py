@@ -4,12 +4,16 @@ from zoneinfo import ZoneInfo
 
 from bot import DigestBotApp
 from config import Settings
-from database import Database
+from database import AsyncDatabase, Database
+from delivery_index import DeliveryIndex
+from message_store import MessageStore
 from parsing.orchestrator import DigestOrchestrator
 from parsing.parser_manager import ParserManager
 from parsing.parsers.tg_parser import TelegramParser
 from parsing.parsers.vk_parser import VkParser
+from parsing.parsers.website_parser import WebsiteParser
 from parsing.text_composer import TextComposer
+from source_strategies import SourceStrategyStore
 
 if __name__ == "__main__":
     logging.basicConfig(level=logging.INFO, format="%(asctime)s - %(name)s - %(levelname)s - %(message)s")
@@ -21,18 +25,32 @@ if __name__ == "__main__":
         api_hash=settings.tg_api_hash(),
         phone_number=settings.phone_number(),
         session_name="user_session",
+        entity_cache_path="tg_entities.json",
+        lean=True,
     )
-    vk_parser = VkParser(token=settings.vk_token(), session_name="vk_session")
+    vk_parser = VkParser(token=settings.vk_token(), session_name="vk_session", lean=True)
+
+    database = Database(
+        dsn=settings.db_dsn(),
+        pool_size=settings.db_pool_size(),
+        max_overflow=settings.db_max_overflow(),
+        pool_timeout=settings.db_pool_timeout(),
+        pool_recycle=settings.db_pool_recycle(),
+    )
+    web_parser = WebsiteParser(state_path="web_state.json", strategy_store=SourceStrategyStore(database.engine))
 
     parser_manager = ParserManager(
         tg_parser=tg_parser,
         vk_parser=vk_parser,
+        web_parser=web_parser,
     )
-
     orchestrator = DigestOrchestrator(
-        database=Database(dsn=settings.db_dsn()),
+        database=AsyncDatabase(database),
         parser_manager=parser_manager,
         composer=TextComposer(message_len=200),
+        message_store=MessageStore(database.engine),
+        stream_window=settings.digest_stream_window(),
+        delivery_index=DeliveryIndex(database.engine),
     )
 
     bot_app = DigestBotApp(
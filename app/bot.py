@@ -1,3 +1,4 @@
+import asyncio
 import datetime as dt
 import logging
 from typing import Any, Dict, List
@@ -5,6 +6,7 @@ from typing import Any, Dict, List
 from telegram.ext import Application, ContextTypes
 
 from handlers.register import register_basic_handlers
+from send_queue import SendQueue
 
 logger = logging.getLogger(__name__)
 
@@ -26,6 +28,7 @@ class DigestBotApp:
         self._chat_id_errors = chat_id_errors
         self._orchestrator = orchestrator
         self._daily_time = daily_time or dt.time(hour=17, minute=0)
+        self._send_queue = SendQueue()
 
     def run(self) -> None:
         """Запускает polling и регистрирует обработчики."""
@@ -37,6 +40,7 @@ class DigestBotApp:
             .build()
         )
         application.bot_data["orchestrator"] = self._orchestrator
+        application.bot_data["send_queue"] = self._send_queue
         register_basic_handlers(application)
         application.run_polling()
 
@@ -51,46 +55,50 @@ class DigestBotApp:
         logger.info("Next run time: %s", getattr(job, "next_run_time", None))
 
     async def _send_digest(self, context: ContextTypes.DEFAULT_TYPE) -> None:
-        """Собирает дайджест и отправляет его в чаты."""
+        """Собирает дайджест потоком: части уходят в чат, пока остальные источники еще разбираются.
+
+        Отправка идет через общую очередь с лимитами Telegram; отчеты в чат ошибок
+        уходят параллельно с еще не отправленными частями дайджеста.
+        """
+        send = context.bot.send_message
+        pending: List[asyncio.Future] = []
         try:
-            result = await self._orchestrator.collect_digest(
+            result: Dict[str, Any] = {}
+            async for kind, payload in self._orchestrator.stream_digest(
                 date_from=None,
                 date_to=dt.date.today() - dt.timedelta(days=1),
                 update_db_dates=True,
-            )
+            ):
+                if kind == "text":
+                    pending.append(self._submit(send, self._chat_id, payload))
+                elif kind == "result":
+                    result = payload
 
             for report in self._error_reports(result):
-                await context.bot.send_message(chat_id=self._chat_id_errors, text=report, parse_mode=None)
-
-            for text in self._digest_texts(result):
-                await context.bot.send_message(chat_id=self._chat_id, text=text, parse_mode=None)
+                pending.append(self._submit(send, self._chat_id_errors, report))
+            await asyncio.gather(*pending)
 
             logger.info("Scheduled digest sent")
 
         except Exception:
             logger.exception("Failed to send scheduled digest")
-            await context.bot.send_message(
+            await asyncio.gather(*pending, return_exceptions=True)
+            await self._send_queue.send(
+                self._chat_id_errors,
+                send,
                 chat_id=self._chat_id_errors,
                 text="Ошибка при отправке дайджеста по расписанию",
             )
 
+    def _submit(self, send, chat_id: int, text: str) -> asyncio.Future:
+        """Ставит текст в очередь отправки чата."""
+        return self._send_queue.submit(chat_id, send, chat_id=chat_id, text=text, parse_mode=None)
+
     async def _on_shutdown(self, application: Application) -> None:
         """Закрывает внешние ресурсы оркестратора."""
         await self._orchestrator.disconnect()
         logger.info("Orchestrator disconnected")
 
-    def _digest_texts(self, result: Dict[str, Any]) -> List[str]:
-        """Нормализует дайджест к списку сообщений."""
-        values = result.get("texts")
-        if isinstance(values, list):
-            return [value for value in values if isinstance(value, str) and value]
-
-        value = result.get("text")
-        if isinstance(value, str) and value:
-            return [value]
-
-        return []
-
     def _error_reports(self, result: Dict[str, Any]) -> List[str]:
         """Собирает отчеты для чата ошибок."""
         stats = result.get("stats") or {}
@@ -102,6 +110,10 @@ class DigestBotApp:
                 f"Не обработались: {stats.get('sources_failed', 0)}",
                 f"Нет парсера: {stats.get('sources_without_parser', 0)}",
                 f"Всего источников: {stats.get('sources_total', 0)}",
+                f"Кэш загрузок: попаданий {stats.get('cache_hits', 0)}, промахов {stats.get('cache_misses', 0)}",
+                f"Загружено страниц: {stats.get('pages_fetched', 0)}, {stats.get('bytes_fetched', 0) // 1024} КБ",
+                f"Склеено дубликатов: {stats.get('duplicates_merged', 0)}",
+                f"Уже отправлялись: {stats.get('already_delivered', 0)}",
             ]
         )
 
@@ -19,12 +19,17 @@ class Settings:
         self._chat_id = int(self._get_required("MY_CHAT_ID"))
         self._chat_id_errors = int(self._get_required("CHAT_ID_ERRORS"))
         self._db_dsn = os.getenv("DB_DSN")
+        self._db_pool_size = int(os.getenv("DB_POOL_SIZE", "5"))
+        self._db_max_overflow = int(os.getenv("DB_MAX_OVERFLOW", "5"))
+        self._db_pool_timeout = float(os.getenv("DB_POOL_TIMEOUT", "30"))
+        self._db_pool_recycle = int(os.getenv("DB_POOL_RECYCLE", "1800"))
         self._tg_api_id = self._get_required("TG_API_ID")
         self._tg_api_hash = self._get_required("TG_API_HASH")
         self._phone_number = self._get_required("PHONE_NUMBER")
         self._vk_token = self._get_required("VK_TOKEN")
         self._sending_hour = int(self._get_required("SENDING_HOUR"))
         self._sending_minute = int(self._get_required("SENDING_MINUTES"))
+        self._digest_stream_window = int(os.getenv("DIGEST_STREAM_WINDOW", "50"))
 
     def _get_required(self, key: str) -> str:
         """Получает и проверяет переменную окружения."""
@@ -45,6 +50,18 @@ class Settings:
     def db_dsn(self) -> str:
         return self._db_dsn
 
+    def db_pool_size(self) -> int:
+        return self._db_pool_size
+
+    def db_max_overflow(self) -> int:
+        return self._db_max_overflow
+
+    def db_pool_timeout(self) -> float:
+        return self._db_pool_timeout
+
+    def db_pool_recycle(self) -> int:
+        return self._db_pool_recycle
+
     def tg_api_id(self) -> int:
         return self._tg_api_id
 
@@ -62,3 +79,6 @@ class Settings:
 
     def sending_minute(self) -> int:
         return self._sending_minute
+
+    def digest_stream_window(self) -> int:
+        return self._digest_stream_window
@@ -1,22 +1,45 @@
+import asyncio
 import datetime as dt
+import functools
 import logging
-from typing import Dict, List
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict, List, Mapping, Optional, Tuple
 
-from sqlalchemy import create_engine, select, update
+from sqlalchemy import Column, String, bindparam, column, create_engine, make_url, select, update, values
+from sqlalchemy.dialects import postgresql, sqlite
 from sqlalchemy.orm import sessionmaker
 
 from models.department import Department
 
 logger = logging.getLogger(__name__)
 
+# insert с on_conflict_do_update для поддерживаемых диалектов; общий для хранилищ поверх engine.
+UPSERT_INSERTS = {"postgresql": postgresql.insert, "sqlite": sqlite.insert}
+
 
 class Database:
     """Работает с таблицей источников."""
 
-    def __init__(self, dsn: str) -> None:
-        """Создает engine и фабрику сессий."""
-        self.engine = create_engine(dsn)
+    def __init__(
+        self,
+        dsn: str,
+        pool_size: int = 5,
+        max_overflow: int = 5,
+        pool_timeout: float = 30.0,
+        pool_recycle: int = 1800,
+    ) -> None:
+        """Создает engine с настроенным пулом соединений и фабрику сессий."""
+        pool_options: Dict[str, Any] = {"pool_pre_ping": True}
+        if make_url(dsn).get_backend_name() != "sqlite":
+            pool_options.update(
+                pool_size=pool_size,
+                max_overflow=max_overflow,
+                pool_timeout=pool_timeout,
+                pool_recycle=pool_recycle,
+            )
+        self.engine = create_engine(dsn, **pool_options)
         self.Session = sessionmaker(bind=self.engine)
+        self.pool_size = pool_size
 
     def sources(self) -> List[Dict]:
         """Возвращает плоский список источников."""
@@ -27,12 +50,12 @@ class Database:
             result: List[Dict] = []
             for dep in departments:
                 links = [
-                    (dep.website_url, "web"),
-                    (dep.vk_url, "vk"),
-                    (dep.tg_url, "tg"),
+                    (dep.website_url, "web", None),
+                    (dep.vk_url, "vk", dep.vk_last_post_id),
+                    (dep.tg_url, "tg", dep.tg_last_message_id),
                 ]
 
-                for link, s_type in links:
+                for link, s_type, last_message_id in links:
                     if link and str(link).strip() not in ("", "-"):
                         result.append(
                             {
@@ -41,38 +64,98 @@ class Database:
                                 "source_type": s_type,
                                 "contact": dep.contact,
                                 "last_message_date": dep.last_news_date,
+                                "last_message_id": last_message_id,
                             }
                         )
             return result
 
-    def update_dates(self, messages: List[Dict]) -> None:
-        """Обновляет last_news_date по сообщениям."""
-        with self.Session() as session:
-            for message in messages:
-                name = message.get("source_name")
-                raw_date = message.get("date")
-
-                if isinstance(raw_date, str):
-                    try:
-                        new_date = dt.datetime.strptime(raw_date, "%Y-%m-%d").date()
-                    except ValueError:
-                        logger.error("Неверный формат даты в сообщении: %s", raw_date)
-                        continue
-                elif isinstance(raw_date, dt.date):
-                    new_date = raw_date
-                else:
-                    logger.warning("Неподдерживаемый тип даты для %s: %s", name, type(raw_date))
+    def update_dates(self, messages: List[Mapping]) -> None:
+        """Обновляет last_news_date и курсоры источников по сообщениям.
+
+        Сообщения сворачиваются до максимума на источник, и каждое поле обновляется
+        одним запросом; значения только растут.
+        """
+        latest_dates: Dict[str, dt.date] = {}
+        cursors: Dict[Tuple[str, str], int] = {}
+        for message in messages:
+            name = message.get("source_name")
+            external_id = message.get("external_id")
+            if isinstance(external_id, int):
+                key = (name, message.get("source_link"))
+                cursors[key] = max(cursors.get(key, external_id), external_id)
+
+            raw_date = message.get("date")
+            if isinstance(raw_date, dt.date):
+                new_date = raw_date
+            elif isinstance(raw_date, str):
+                try:
+                    new_date = dt.datetime.strptime(raw_date, "%Y-%m-%d").date()
+                except ValueError:
+                    logger.error("Неверный формат даты в сообщении: %s", raw_date)
                     continue
+            else:
+                logger.warning("Неподдерживаемый тип даты для %s: %s", name, type(raw_date))
+                continue
+
+            if name not in latest_dates or latest_dates[name] < new_date:
+                latest_dates[name] = new_date
 
-                stmt = (
-                    update(Department)
-                    .where(Department.name == name)
-                    .where((Department.last_news_date == None) | (Department.last_news_date < new_date))
-                    .values(last_news_date=new_date, updated_at=dt.datetime.now(dt.timezone.utc))
-                )
-                session.execute(stmt)
+        departments = Department.__table__
+        with self.Session() as session:
+            connection = session.connection()
+            self._advance(
+                connection,
+                departments.c.last_news_date,
+                [(name, None, new_date) for name, new_date in latest_dates.items()],
+                extra_values={departments.c.updated_at: dt.datetime.now(dt.timezone.utc)},
+            )
+            cursor_rows = [(name, link, external_id) for (name, link), external_id in cursors.items()]
+            for url_column, cursor_column in (
+                (departments.c.tg_url, departments.c.tg_last_message_id),
+                (departments.c.vk_url, departments.c.vk_last_post_id),
+            ):
+                self._advance(connection, cursor_column, cursor_rows, link_column=url_column)
             session.commit()
 
+    def _advance(
+        self,
+        connection,
+        target: Column,
+        rows: List[Tuple[str, Optional[str], Any]],
+        link_column: Optional[Column] = None,
+        extra_values: Optional[Dict[Column, Any]] = None,
+    ) -> None:
+        """Поднимает target до значений из rows (name, link, value) одним запросом.
+
+        В PostgreSQL это UPDATE ... FROM (VALUES ...), в остальных СУБД — executemany.
+        """
+        if not rows:
+            return
+
+        departments = Department.__table__
+        if connection.dialect.name == "postgresql":
+            updates = values(
+                column("name", String),
+                column("link", String),
+                column("value", target.type),
+                name="updates",
+            ).data(rows)
+            name, link, value = updates.c.name, updates.c.link, updates.c.value
+            params = None
+        else:
+            name, link, value = bindparam("u_name"), bindparam("u_link"), bindparam("u_value", type_=target.type)
+            params = [{"u_name": row[0], "u_link": row[1], "u_value": row[2]} for row in rows]
+
+        stmt = update(departments).where(departments.c.name == name)
+        if link_column is not None:
+            stmt = stmt.where(link_column == link)
+        stmt = stmt.where(target.is_(None) | (target < value)).values({target: value, **(extra_values or {})})
+
+        if params is None:
+            connection.execute(stmt)
+        else:
+            connection.execute(stmt, params)
+
     def update_dates_to(self, target_date: dt.date) -> int:
         """Ставит одинаковую дату всем кафедрам."""
         with self.Session() as session:
@@ -88,3 +171,46 @@ class Database:
         """Ставит вчерашнюю дату всем кафедрам."""
         yesterday = dt.date.today() - dt.timedelta(days=1)
         return self.update_dates_to(yesterday)
+
+
+class AsyncDatabase:
+    """Асинхронный фасад Database: запросы выполняются в пуле потоков, а не в цикле событий бота."""
+
+    def __init__(self, database: Database, max_workers: Optional[int] = None) -> None:
+        """Создает пул потоков по размеру пула соединений."""
+        self._database = database
+        self._executor = ThreadPoolExecutor(
+            max_workers=max_workers or database.pool_size,
+            thread_name_prefix="db",
+        )
+
+    @property
+    def engine(self):
+        """Возвращает engine синхронной базы."""
+        return self._database.engine
+
+    async def run(self, func: Callable, *args, **kwargs) -> Any:
+        """Выполняет блокирующий вызов в пуле потоков базы."""
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self._executor, functools.partial(func, *args, **kwargs))
+
+    async def sources(self) -> List[Dict]:
+        """Возвращает плоский список источников."""
+        return await self.run(self._database.sources)
+
+    async def update_dates(self, messages: List[Mapping]) -> None:
+        """Обновляет last_news_date и курсоры источников по сообщениям."""
+        await self.run(self._database.update_dates, messages)
+
+    async def update_dates_to(self, target_date: dt.date) -> int:
+        """Ставит одинаковую дату всем кафедрам."""
+        return await self.run(self._database.update_dates_to, target_date)
+
+    async def update_dates_to_yesterday(self) -> int:
+        """Ставит вчерашнюю дату всем кафедрам."""
+        return await self.run(self._database.update_dates_to_yesterday)
+
+    def close(self) -> None:
+        """Останавливает пул потоков и закрывает соединения."""
+        self._executor.shutdown(wait=True)
+        self._database.engine.dispose()
@@ -0,0 +1,93 @@
+import datetime as dt
+import hashlib
+import logging
+from typing import Iterable, Mapping, Optional, Set
+
+from sqlalchemy import delete, select
+from sqlalchemy.orm import sessionmaker
+
+from database import UPSERT_INSERTS
+from models.department import DeliveredFingerprint
+from parsing.dedup import normalize_text
+
+logger = logging.getLogger(__name__)
+
+# Сколько дней помнить отправленные новости; перемотка дат источников дальше этого срока вернет старые посты.
+DELIVERY_TTL_DAYS = 90
+# Держит число параметров одного запроса ниже лимитов SQLite (32766) и PostgreSQL (65535).
+QUERY_BATCH_SIZE = 30000
+
+
+class DeliveryIndex:
+    """Индекс отпечатков текстов уже отправленных новостей.
+
+    Отпечаток — 64-битный хэш нормализованного текста, поэтому одна и та же
+    новость узнается независимо от источника и даты, с которой ее вернул парсер.
+    Записи старше ttl_days удаляются при каждой записи новых.
+    """
+
+    def __init__(self, engine, ttl_days: int = DELIVERY_TTL_DAYS) -> None:
+        """Создает фабрику сессий поверх общего engine и сохраняет срок хранения отпечатков."""
+        self.engine = engine
+        self.Session = sessionmaker(bind=engine)
+        self._insert = UPSERT_INSERTS[engine.dialect.name]
+        self._ttl = dt.timedelta(days=ttl_days)
+
+    @staticmethod
+    def fingerprint(message: Mapping) -> Optional[int]:
+        """Возвращает отпечаток текста новости или None, если в тексте нет слов."""
+        words = normalize_text(message.get("message"))
+        if not words:
+            return None
+        digest = hashlib.blake2b(" ".join(words).encode("utf-8"), digest_size=8).digest()
+        return int.from_bytes(digest, "big", signed=True)
+
+    def delivered(self, fingerprints: Iterable[int]) -> Set[int]:
+        """Возвращает те из отпечатков, что уже отправлялись в пределах срока хранения."""
+        values = list(set(fingerprints))
+        if not values:
+            return set()
+
+        found: Set[int] = set()
+        with self.Session() as session:
+            for start in range(0, len(values), QUERY_BATCH_SIZE):
+                stmt = (
+                    select(DeliveredFingerprint.fingerprint)
+                    .where(DeliveredFingerprint.fingerprint.in_(values[start : start + QUERY_BATCH_SIZE]))
+                    .where(DeliveredFingerprint.delivered_on >= self._cutoff())
+                )
+                found.update(session.scalars(stmt))
+        return found
+
+    def recent(self) -> Set[int]:
+        """Возвращает все отпечатки в пределах срока хранения одним запросом."""
+        with self.Session() as session:
+            stmt = select(DeliveredFingerprint.fingerprint).where(DeliveredFingerprint.delivered_on >= self._cutoff())
+            return set(session.scalars(stmt))
+
+    def remember(self, fingerprints: Iterable[int]) -> int:
+        """Записывает отпечатки отправленных новостей и удаляет устаревшие."""
+        values = sorted(set(fingerprints))
+        today = dt.date.today()
+        with self.Session() as session:
+            purged = session.execute(
+                delete(DeliveredFingerprint).where(DeliveredFingerprint.delivered_on < self._cutoff())
+            ).rowcount
+            for start in range(0, len(values), QUERY_BATCH_SIZE // 2):
+                rows = [
+                    {"fingerprint": value, "delivered_on": today}
+                    for value in values[start : start + QUERY_BATCH_SIZE // 2]
+                ]
+                stmt = self._insert(DeliveredFingerprint).values(rows)
+                stmt = stmt.on_conflict_do_update(
+                    index_elements=[DeliveredFingerprint.fingerprint],
+                    set_={"delivered_on": stmt.excluded.delivered_on},
+                )
+                session.execute(stmt)
+            session.commit()
+        logger.info("Отпечатков отправленных новостей записано: %s, удалено устаревших: %s", len(values), purged)
+        return len(values)
+
+    def _cutoff(self) -> dt.date:
+        """Возвращает самую раннюю дату отправки, которая еще учитывается."""
+        return dt.date.today() - self._ttl
@@ -6,6 +6,8 @@ from typing import Any, Dict, List
 from telegram import Update
 from telegram.ext import ContextTypes
 
+from handlers.reply import reply_texts
+
 
 def _digest_texts(result: Dict[str, Any]) -> List[str]:
     """Нормализует текст дайджеста к списку сообщений."""
@@ -39,9 +41,9 @@ async def digest_last_week_handler(update: Update, context: ContextTypes.DEFAULT
     if not update.message:
         return
 
+    texts = _digest_texts(result)
     errors = result.get("errors") or []
     if errors:
-        await update.message.reply_text("Ошибки при парсинге:\n" + "\n".join(errors))
+        texts.insert(0, "Ошибки при парсинге:\n" + "\n".join(errors))
 
-    for text in _digest_texts(result):
-        await update.message.reply_text(text)
+    await reply_texts(update, context, texts)
@@ -0,0 +1,21 @@
+"""Отправка ответов команд через общую очередь бота."""
+
+from typing import List
+
+from telegram import Update
+from telegram.ext import ContextTypes
+
+
+async def reply_texts(update: Update, context: ContextTypes.DEFAULT_TYPE, texts: List[str]) -> None:
+    """Отвечает на команду несколькими сообщениями по порядку.
+
+    Если бот зарегистрировал очередь отправки, сообщения идут через нее с учетом
+    лимитов Telegram, иначе отправляются напрямую.
+    """
+    send_queue = context.application.bot_data.get("send_queue")
+    if send_queue is None:
+        for text in texts:
+            await update.message.reply_text(text)
+        return
+
+    await send_queue.send_many(update.message.chat_id, update.message.reply_text, texts)
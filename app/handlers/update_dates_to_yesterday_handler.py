@@ -15,7 +15,7 @@ async def update_dates_to_yesterday_handler(update: Update, context: ContextType
         return
 
     try:
-        updated_rows = orchestrator.update_dates_to_yesterday()
+        updated_rows = await orchestrator.update_dates_to_yesterday()
     except Exception:
         if update.message:
             await update.message.reply_text("Возникла ошибка")
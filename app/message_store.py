@@ -0,0 +1,146 @@
+import datetime as dt
+import hashlib
+import logging
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from sqlalchemy import select
+from sqlalchemy.orm import sessionmaker
+
+from database import UPSERT_INSERTS
+from models.department import Message, MessageCoverage
+from parsing.records import NewsItem, Source
+
+logger = logging.getLogger(__name__)
+
+# Держит число параметров одного INSERT ниже лимита PostgreSQL (65535).
+SAVE_BATCH_SIZE = 1000
+
+
+class MessageStore:
+    """Хранит полученные новости и диапазоны дат, за которые они собраны полностью."""
+
+    def __init__(self, engine) -> None:
+        """Создает фабрику сессий поверх общего engine."""
+        self.engine = engine
+        self.Session = sessionmaker(bind=engine)
+        self._insert = UPSERT_INSERTS[engine.dialect.name]
+
+    def save(self, messages: List[Dict]) -> int:
+        """Добавляет или обновляет новости по ключу (источник, внешний id)."""
+        rows: Dict[Tuple[str, str], Dict] = {}
+        for message in messages:
+            news_date = self._to_date(message.get("date"))
+            if news_date is None or not message.get("source_link"):
+                continue
+
+            text = message.get("message") or ""
+            external_id = message.get("external_id")
+            row = {
+                "source_name": message.get("source_name") or "",
+                "source_link": message["source_link"],
+                "message_key": self.message_key(external_id, news_date, text),
+                "external_id": external_id if isinstance(external_id, int) else None,
+                "contact": message.get("contact"),
+                "news_date": news_date,
+                "text": text,
+            }
+            rows[(row["source_link"], row["message_key"])] = row
+
+        if not rows:
+            return 0
+
+        values = list(rows.values())
+        with self.Session() as session:
+            for start in range(0, len(values), SAVE_BATCH_SIZE):
+                stmt = self._insert(Message).values(values[start : start + SAVE_BATCH_SIZE])
+                stmt = stmt.on_conflict_do_update(
+                    index_elements=[Message.source_link, Message.message_key],
+                    set_={
+                        "source_name": stmt.excluded.source_name,
+                        "contact": stmt.excluded.contact,
+                        "news_date": stmt.excluded.news_date,
+                        "text": stmt.excluded.text,
+                        "updated_at": dt.datetime.now(dt.timezone.utc),
+                    },
+                )
+                session.execute(stmt)
+            session.commit()
+        logger.info("Сохранено сообщений в хранилище: %s", len(rows))
+        return len(rows)
+
+    def messages(self, source_links: Iterable[str], date_from: dt.date, date_to: dt.date) -> List[NewsItem]:
+        """Возвращает сохраненные новости источников за диапазон дат."""
+        links = list(source_links)
+        if not links:
+            return []
+
+        with self.Session() as session:
+            stmt = (
+                select(Message)
+                .where(Message.source_link.in_(links))
+                .where(Message.news_date >= date_from)
+                .where(Message.news_date <= date_to)
+                .order_by(Message.news_date.desc(), Message.id)
+            )
+            return [
+                NewsItem(
+                    source=Source.of(
+                        {"source_name": row.source_name, "source_link": row.source_link, "contact": row.contact}
+                    ),
+                    date=row.news_date,
+                    message=row.text,
+                    external_id=row.external_id,
+                )
+                for row in session.scalars(stmt)
+            ]
+
+    def coverage(self, source_links: Iterable[str]) -> Dict[str, Tuple[dt.date, dt.date]]:
+        """Возвращает сохраненные диапазоны дат по ссылкам источников."""
+        links = list(source_links)
+        if not links:
+            return {}
+
+        with self.Session() as session:
+            stmt = select(MessageCoverage).where(MessageCoverage.source_link.in_(links))
+            return {row.source_link: (row.covered_from, row.covered_to) for row in session.scalars(stmt)}
+
+    def extend_coverage(self, source_link: str, covered_from: dt.date, covered_to: dt.date) -> None:
+        """Добавляет собранный диапазон: смежный склеивается с текущим, более новый его заменяет."""
+        if covered_from > covered_to:
+            return
+
+        one_day = dt.timedelta(days=1)
+        with self.Session() as session:
+            row = session.get(MessageCoverage, source_link)
+            if row is None:
+                session.add(MessageCoverage(source_link=source_link, covered_from=covered_from, covered_to=covered_to))
+            elif covered_from <= row.covered_to + one_day and covered_to >= row.covered_from - one_day:
+                row.covered_from = min(row.covered_from, covered_from)
+                row.covered_to = max(row.covered_to, covered_to)
+                row.updated_at = dt.datetime.now(dt.timezone.utc)
+            elif covered_to > row.covered_to:
+                row.covered_from = covered_from
+                row.covered_to = covered_to
+                row.updated_at = dt.datetime.now(dt.timezone.utc)
+            session.commit()
+
+    @staticmethod
+    def message_key(external_id, news_date: dt.date, text: str) -> str:
+        """Возвращает ключ новости: внешний id или хэш даты и текста для сайтов."""
+        if external_id is not None:
+            return str(external_id)
+        return hashlib.sha1(f"{news_date.isoformat()}\n{text}".encode("utf-8")).hexdigest()
+
+    @staticmethod
+    def _to_date(value) -> Optional[dt.date]:
+        """Преобразует дату сообщения к объекту date."""
+        if isinstance(value, dt.datetime):
+            return value.date()
+        if isinstance(value, dt.date):
+            return value
+        if isinstance(value, str):
+            try:
+                return dt.datetime.strptime(value, "%Y-%m-%d").date()
+            except ValueError:
+                logger.error("Неверный формат даты в сообщении: %s", value)
+        return None
@@ -1,7 +1,7 @@
 from datetime import date, datetime
 from typing import Optional
 
-from sqlalchemy import Date, DateTime, String, func
+from sqlalchemy import BigInteger, Date, DateTime, String, Text, UniqueConstraint, func
 from sqlalchemy.orm import DeclarativeBase, Mapped, mapped_column
 
 
@@ -21,8 +21,75 @@ class Department(Base):
     vk_url: Mapped[Optional[str]] = mapped_column(String(255))
     tg_url: Mapped[Optional[str]] = mapped_column(String(255))
     last_news_date: Mapped[Optional[date]] = mapped_column(Date)
+    tg_last_message_id: Mapped[Optional[int]] = mapped_column(BigInteger)
+    vk_last_post_id: Mapped[Optional[int]] = mapped_column(BigInteger)
     updated_at: Mapped[Optional[datetime]] = mapped_column(DateTime(timezone=True), server_default=func.now())
 
     def __repr__(self) -> str:
         """Возвращает строку для отладки."""
         return f"<Department(name={self.name!r}, last_news={self.last_news_date})>"
+
+
+class Message(Base):
+    """Хранит новость, полученную из источника."""
+
+    __tablename__ = "messages"
+    __table_args__ = (UniqueConstraint("source_link", "message_key"),)
+
+    id: Mapped[int] = mapped_column(primary_key=True, autoincrement=True)
+    source_name: Mapped[str] = mapped_column(String(255), nullable=False)
+    source_link: Mapped[str] = mapped_column(String(255), nullable=False)
+    message_key: Mapped[str] = mapped_column(String(64), nullable=False)
+    external_id: Mapped[Optional[int]] = mapped_column(BigInteger)
+    contact: Mapped[Optional[str]] = mapped_column(String(255))
+    news_date: Mapped[date] = mapped_column(Date, nullable=False, index=True)
+    text: Mapped[str] = mapped_column(Text, nullable=False)
+    updated_at: Mapped[Optional[datetime]] = mapped_column(DateTime(timezone=True), server_default=func.now())
+
+    def __repr__(self) -> str:
+        """Возвращает строку для отладки."""
+        return f"<Message(source_link={self.source_link!r}, key={self.message_key!r}, date={self.news_date})>"
+
+
+class MessageCoverage(Base):
+    """Описывает непрерывный диапазон дат, за который новости источника уже сохранены."""
+
+    __tablename__ = "message_coverage"
+
+    source_link: Mapped[str] = mapped_column(String(255), primary_key=True)
+    covered_from: Mapped[date] = mapped_column(Date, nullable=False)
+    covered_to: Mapped[date] = mapped_column(Date, nullable=False)
+    updated_at: Mapped[Optional[datetime]] = mapped_column(DateTime(timezone=True), server_default=func.now())
+
+    def __repr__(self) -> str:
+        """Возвращает строку для отладки."""
+        return f"<MessageCoverage(source_link={self.source_link!r}, {self.covered_from}..{self.covered_to})>"
+
+
+class DeliveredFingerprint(Base):
+    """Хранит отпечаток текста новости, уже отправленной в дайджесте."""
+
+    __tablename__ = "delivered_fingerprints"
+
+    fingerprint: Mapped[int] = mapped_column(BigInteger, primary_key=True, autoincrement=False)
+    delivered_on: Mapped[date] = mapped_column(Date, nullable=False, index=True)
+
+    def __repr__(self) -> str:
+        """Возвращает строку для отладки."""
+        return f"<DeliveredFingerprint(fingerprint={self.fingerprint}, delivered_on={self.delivered_on})>"
+
+
+class SourceStrategy(Base):
+    """Хранит найденный способ загрузки новостей сайта: лента, карта сайта или разбор HTML."""
+
+    __tablename__ = "source_strategies"
+
+    source_link: Mapped[str] = mapped_column(String(255), primary_key=True)
+    kind: Mapped[str] = mapped_column(String(16), nullable=False)
+    url: Mapped[str] = mapped_column(Text, nullable=False)
+    discovered_at: Mapped[date] = mapped_column(Date, nullable=False)
+    updated_at: Mapped[Optional[datetime]] = mapped_column(DateTime(timezone=True), server_default=func.now())
+
+    def __repr__(self) -> str:
+        """Возвращает строку для отладки."""
+        return f"<SourceStrategy(source_link={self.source_link!r}, kind={self.kind!r}, url={self.url!r})>"
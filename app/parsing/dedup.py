@@ -0,0 +1,130 @@
+import dataclasses
+import logging
+import re
+from collections import defaultdict
+from typing import Dict, List, Mapping, Optional, Sequence, Tuple
+
+logger = logging.getLogger(__name__)
+
+SKETCH_SIZE = 16
+SIMILARITY_THRESHOLD = 0.6
+# Для сравнения хватает начала текста: длинные посты не замедляют склейку.
+MAX_TEXT_CHARS = 2000
+# Значения скетча, которые встречаются у многих новостей (шаблонные фразы), не дают кандидатов.
+MAX_BUCKET_SIZE = 64
+
+_URL_RE = re.compile(r"https?://\S+|www\.\S+")
+_WORD_RE = re.compile(r"[^\W_]+")
+
+
+def normalize_text(text: Optional[str]) -> List[str]:
+    """Приводит текст к словам без регистра, ссылок и пунктуации."""
+    text = (text or "")[:MAX_TEXT_CHARS].lower().replace("ё", "е")
+    if "http" in text or "www." in text:
+        text = _URL_RE.sub(" ", text)
+    return _WORD_RE.findall(text)
+
+
+def sketch(words: Sequence[str], size: int = SKETCH_SIZE) -> Tuple[int, ...]:
+    """Возвращает bottom-k MinHash-скетч по шинглам из трех слов."""
+    if len(words) < 3:
+        return (hash(tuple(words)),)
+    return tuple(sorted(set(map(hash, zip(words, words[1:], words[2:]))))[:size])
+
+
+def similarity(first: Tuple[int, ...], second: Tuple[int, ...]) -> float:
+    """Оценивает сходство Жаккара двух текстов по их скетчам."""
+    size = max(len(first), len(second))
+    union = sorted(set(first) | set(second))[:size]
+    common = set(first) & set(second)
+    return sum(1 for value in union if value in common) / len(union)
+
+
+def with_links(message: Mapping, links: Sequence[str]) -> Mapping:
+    """Возвращает новость со списком ссылок всех ее копий."""
+    if len(links) <= 1:
+        return message
+    if dataclasses.is_dataclass(message):
+        return dataclasses.replace(message, links=tuple(links))
+    return {**message, "links": list(links)}
+
+
+class NewsDeduplicator:
+    """Индекс почти одинаковых новостей: MinHash-скетч и LSH-корзины по его значениям.
+
+    Каждая новость сравнивается только с кандидатами из общих корзин, поэтому
+    время растет почти линейно от числа новостей, а не попарно.
+    """
+
+    def __init__(
+        self,
+        threshold: float = SIMILARITY_THRESHOLD,
+        sketch_size: int = SKETCH_SIZE,
+        max_bucket_size: int = MAX_BUCKET_SIZE,
+    ) -> None:
+        """Сохраняет порог сходства и размеры скетча и корзин."""
+        self._threshold = threshold
+        self._sketch_size = sketch_size
+        self._max_bucket_size = max_bucket_size
+        self._exact: Dict[int, int] = {}
+        self._sketches: List[Tuple[int, ...]] = []
+        self._buckets: Dict[int, List[int]] = defaultdict(list)
+
+    def add(self, message: Mapping) -> Tuple[int, bool]:
+        """Возвращает номер канонической новости и признак того, что эта новость новая."""
+        words = normalize_text(message.get("message"))
+        text_hash = hash(" ".join(words))
+        canonical = self._exact.get(text_hash) if words else None
+        if canonical is not None:
+            return canonical, False
+
+        signature = sketch(words, self._sketch_size)
+        canonical = self._find(signature) if words else None
+        if canonical is not None:
+            return canonical, False
+
+        canonical = len(self._sketches)
+        self._sketches.append(signature)
+        if words:
+            self._exact[text_hash] = canonical
+            for value in signature:
+                bucket = self._buckets[value]
+                if len(bucket) < self._max_bucket_size:
+                    bucket.append(canonical)
+        return canonical, True
+
+    def _find(self, signature: Tuple[int, ...]) -> Optional[int]:
+        """Ищет среди кандидатов из общих корзин самую похожую новость выше порога."""
+        candidates = set()
+        for value in signature:
+            bucket = self._buckets.get(value)
+            if bucket:
+                candidates.update(bucket)
+
+        best, best_score = None, self._threshold
+        for candidate in sorted(candidates):
+            score = similarity(signature, self._sketches[candidate])
+            if score >= best_score:
+                best, best_score = candidate, score
+        return best
+
+
+def deduplicate(messages: Sequence[Mapping]) -> List[Mapping]:
+    """Склеивает почти одинаковые новости в одну, перечисляя ссылки всех копий."""
+    index = NewsDeduplicator()
+    canonical_messages: List[Mapping] = []
+    links: List[List[str]] = []
+
+    for message in messages:
+        canonical, is_new = index.add(message)
+        link = message.get("source_link")
+        if is_new:
+            canonical_messages.append(message)
+            links.append([link])
+        elif link not in links[canonical]:
+            links[canonical].append(link)
+
+    result = [with_links(message, message_links) for message, message_links in zip(canonical_messages, links)]
+    if len(result) < len(messages):
+        logger.info("Дубликаты объединены: %s из %s новостей", len(messages) - len(result), len(messages))
+    return result
@@ -0,0 +1,142 @@
+import logging
+import time
+from collections import OrderedDict
+from datetime import date
+from typing import Dict, List, Optional, Tuple
+
+from parsing.records import NewsItem, to_date
+
+logger = logging.getLogger(__name__)
+
+# Грубая оценка памяти под одно сообщение сверх длины его строк: dict, ключи, ссылки.
+MESSAGE_OVERHEAD_BYTES = 400
+# NewsItem хранит пять слотов, а строки источника делит с остальными новостями.
+NEWS_ITEM_OVERHEAD_BYTES = 140
+
+
+def same_request(fetch: Dict, source: Dict, date_from: Optional[date], date_to: Optional[date]) -> bool:
+    """Проверяет, что загрузка выполнена с теми же границами, что и запрос."""
+    same_bounds = all(
+        fetch["source"].get(field) == source.get(field) for field in ("last_message_date", "last_message_id")
+    )
+    return fetch["date_from"] == date_from and fetch["date_to"] == date_to and same_bounds
+
+
+def covers(fetch: Dict, source: Dict, date_from: Optional[date], date_to: Optional[date]) -> bool:
+    """Проверяет, что загрузка содержит все сообщения, нужные запросу."""
+    if same_request(fetch, source, date_from, date_to):
+        return True
+
+    if fetch["date_to"] is not None and (date_to is None or fetch["date_to"] < date_to):
+        return False
+    lower_bound = date_from if date_from is not None else to_date(source.get("last_message_date"))
+    if lower_bound is None:
+        return False
+    if fetch["date_from"] is not None:
+        return fetch["date_from"] <= lower_bound
+
+    # Открытая снизу загрузка (плановый дайджест) читает посты новее last_message_date источника,
+    # а с курсором — и остаток граничного дня; более поздние дни она содержит целиком.
+    fetch_last_date = to_date(fetch["source"].get("last_message_date"))
+    return fetch_last_date is not None and fetch_last_date < lower_bound
+
+
+def slice_messages(
+    messages: List[Dict],
+    fetch: Dict,
+    source: Dict,
+    date_from: Optional[date],
+    date_to: Optional[date],
+) -> List[Dict]:
+    """Оставляет из покрывающей загрузки только сообщения запроса."""
+    if same_request(fetch, source, date_from, date_to):
+        return list(messages)
+    return [message for message in messages if message_in_range(message, source, date_from, date_to)]
+
+
+def message_in_range(message: Dict, source: Dict, date_from: Optional[date], date_to: Optional[date]) -> bool:
+    """Повторяет границы парсеров: date_from включительно, иначе курсор или last_message_date."""
+    message_date = to_date(message.get("date"))
+    if message_date is None:
+        return False
+    if date_to is not None and message_date > date_to:
+        return False
+    if date_from is not None:
+        return message_date >= date_from
+
+    last_date = to_date(source.get("last_message_date"))
+    cursor = source.get("last_message_id")
+    if cursor is not None:
+        external_id = message.get("external_id")
+        in_cursor = not isinstance(external_id, int) or external_id > cursor
+        return in_cursor and (last_date is None or message_date >= last_date)
+    return last_date is None or message_date > last_date
+
+
+class SourceFetchCache:
+    """Хранит в памяти недавние результаты загрузки источников с TTL и LRU-вытеснением по объему."""
+
+    def __init__(self, ttl: float = 300.0, max_bytes: int = 16 * 1024 * 1024) -> None:
+        """Сохраняет время жизни записи и бюджет памяти."""
+        self._ttl = ttl
+        self._max_bytes = max_bytes
+        self._entries: "OrderedDict[Tuple, Dict]" = OrderedDict()
+        self._size = 0
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key: Tuple, source: Dict, date_from: Optional[date], date_to: Optional[date]) -> Optional[List[Dict]]:
+        """Возвращает срез свежей покрывающей загрузки или None."""
+        entry = self._entries.get(key)
+        if entry is not None and time.monotonic() - entry["fetched_at"] > self._ttl:
+            self._remove(key)
+            entry = None
+
+        if entry is None or not covers(entry, source, date_from, date_to):
+            self.misses += 1
+            return None
+
+        self._entries.move_to_end(key)
+        self.hits += 1
+        return slice_messages(entry["messages"], entry, source, date_from, date_to)
+
+    def put(
+        self,
+        key: Tuple,
+        source: Dict,
+        date_from: Optional[date],
+        date_to: Optional[date],
+        messages: List[Dict],
+    ) -> None:
+        """Запоминает результат загрузки и вытесняет давно не использованные записи сверх бюджета."""
+        size = sum(self._message_size(message) for message in messages)
+        if size > self._max_bytes:
+            logger.info("Fetch result of %s is larger than cache budget: %s bytes", key, size)
+            return
+
+        self._remove(key)
+        self._entries[key] = {
+            "source": dict(source),
+            "date_from": date_from,
+            "date_to": date_to,
+            "messages": list(messages),
+            "fetched_at": time.monotonic(),
+            "size": size,
+        }
+        self._size += size
+        while self._size > self._max_bytes:
+            evicted_key, _ = next(iter(self._entries.items()))
+            self._remove(evicted_key)
+
+    def _remove(self, key: Tuple) -> None:
+        """Удаляет запись и уменьшает занятый объем."""
+        entry = self._entries.pop(key, None)
+        if entry is not None:
+            self._size -= entry["size"]
+
+    @staticmethod
+    def _message_size(message: Dict) -> int:
+        """Оценивает объем сообщения в байтах."""
+        if isinstance(message, NewsItem):
+            return NEWS_ITEM_OVERHEAD_BYTES + len(message.message)
+        return MESSAGE_OVERHEAD_BYTES + sum(len(value) for value in message.values() if isinstance(value, str))
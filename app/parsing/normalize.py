@@ -0,0 +1,101 @@
+import asyncio
+import dataclasses
+import logging
+import multiprocessing
+import os
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from typing import Deque, List, Mapping, Optional, Sequence, Tuple
+
+logger = logging.getLogger(__name__)
+
+# С какого числа новостей очистка уходит в пул процессов; меньшие пачки дешевле почистить на месте.
+PROCESS_THRESHOLD = 2000
+BATCH_SIZE = 1000
+
+
+def clean_text(text: Optional[str]) -> str:
+    """Убирает markdown-звездочки и схлопывает пробелы и переводы строк в один пробел."""
+    text = text or ""
+    if "*" in text:
+        text = text.replace("*", "")
+    return " ".join(text.split())
+
+
+def clean_texts(texts: Sequence[Optional[str]]) -> List[str]:
+    """Очищает пачку текстов; выполняется в процессе пула."""
+    return [clean_text(text) for text in texts]
+
+
+def with_text(message: Mapping, text: str) -> Mapping:
+    """Возвращает новость с очищенным текстом; неизмененная новость возвращается как есть."""
+    if message.get("message") == text:
+        return message
+    if dataclasses.is_dataclass(message):
+        return dataclasses.replace(message, message=text)
+    return {**message, "message": text}
+
+
+class TextNormalizer:
+    """Единая очистка текста новостей перед сохранением, склейкой и составлением дайджеста.
+
+    Небольшие списки чистятся на месте, большие (бэкфилл, дайджест за неделю)
+    отправляются пачками в пул процессов, чтобы event loop бота не простаивал.
+    Пул окупается только на сборе дайджеста за диапазон, где очищается весь
+    результат разом: потоковый дайджест чистит новости по одному источнику,
+    и такие пачки почти всегда меньше порога.
+    """
+
+    def __init__(
+        self,
+        threshold: int = PROCESS_THRESHOLD,
+        batch_size: int = BATCH_SIZE,
+        max_workers: Optional[int] = None,
+    ) -> None:
+        """Сохраняет порог перехода в пул процессов, размер пачки и число процессов."""
+        self._threshold = threshold
+        self._batch_size = max(1, batch_size)
+        self._max_workers = max_workers
+        self._executor: Optional[ProcessPoolExecutor] = None
+
+    async def normalize(self, messages: List[Mapping]) -> List[Mapping]:
+        """Возвращает новости с очищенным текстом в исходном порядке."""
+        if len(messages) < self._threshold:
+            return [with_text(message, clean_text(message.get("message"))) for message in messages]
+
+        if self._executor is None:
+            # spawn, а не fork: у бота уже есть потоки пулов БД и VK API.
+            self._executor = ProcessPoolExecutor(
+                max_workers=self._max_workers, mp_context=multiprocessing.get_context("spawn")
+            )
+
+        loop = asyncio.get_running_loop()
+        # Ограниченное число пачек в полете: задания и ответы не копятся в памяти разом.
+        in_flight = 2 * (self._max_workers or os.cpu_count() or 1)
+        pending: Deque[Tuple[List[Mapping], asyncio.Future]] = deque()
+        result: List[Mapping] = []
+        batches = 0
+        for start in range(0, len(messages), self._batch_size):
+            batch = messages[start : start + self._batch_size]
+            texts = [message.get("message") for message in batch]
+            pending.append((batch, loop.run_in_executor(self._executor, clean_texts, texts)))
+            batches += 1
+            if len(pending) >= in_flight:
+                await self._collect(pending, result)
+        while pending:
+            await self._collect(pending, result)
+        logger.info("Тексты очищены в пуле процессов: %s новостей, %s пачек", len(messages), batches)
+        return result
+
+    @staticmethod
+    async def _collect(pending: Deque[Tuple[List[Mapping], asyncio.Future]], result: List[Mapping]) -> None:
+        """Дожидается самой старой пачки и добавляет ее новости в результат."""
+        batch, job = pending.popleft()
+        texts = await job
+        result.extend(with_text(message, text) for message, text in zip(batch, texts))
+
+    def close(self) -> None:
+        """Останавливает пул процессов."""
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
@@ -1,20 +1,49 @@
+import asyncio
 import datetime as dt
 import logging
 import sys
 from pathlib import Path
-from typing import Dict, Optional
+from typing import Any, AsyncIterator, Dict, List, Optional, Set, Tuple
+
+from parsing.dedup import deduplicate
+from parsing.normalize import TextNormalizer
 
 logger = logging.getLogger(__name__)
 
+# С какого числа новостей склейка дубликатов уходит в поток: на 100k новостей она идет секунды
+# и иначе держала бы event loop, пока бот не может ответить на команды.
+INLINE_DEDUP_LIMIT = 2000
+
 
 class DigestOrchestrator:
     """Оркестрирует сбор и подготовку дайджеста."""
 
-    def __init__(self, database, parser_manager, composer) -> None:
-        """Сохраняет зависимости оркестратора."""
+    def __init__(
+        self,
+        database,
+        parser_manager,
+        composer,
+        message_store=None,
+        stream_window: Optional[int] = 50,
+        deduplicate: bool = True,
+        delivery_index=None,
+        normalizer: Optional[TextNormalizer] = None,
+    ) -> None:
+        """Сохраняет зависимости оркестратора, окно потокового дайджеста и признак склейки дубликатов.
+
+        delivery_index отсекает новости, уже отправленные прошлыми дайджестами;
+        применяется только в сборах, сдвигающих даты в БД. normalizer очищает
+        текст разобранных новостей один раз, до сохранения и составления.
+        """
         self._database = database
         self._parser = parser_manager
         self._composer = composer
+        self._store = message_store
+        self._stream_window = stream_window
+        self._deduplicate = deduplicate
+        self._delivery = delivery_index
+        self._normalizer = normalizer or TextNormalizer()
+        self._dates_lock = asyncio.Lock()
 
     async def collect_digest(
         self,
@@ -22,20 +51,50 @@ class DigestOrchestrator:
         date_to: Optional[dt.date] = None,
         update_db_dates: bool = False,
     ) -> Dict:
-        """Собирает сообщения и формирует итоговый текст."""
+        """Собирает сообщения и формирует итоговый текст.
+
+        Сборы, сдвигающие даты в БД, идут строго по очереди: следующий читает
+        источники уже с курсорами, записанными предыдущим.
+        """
+        if not update_db_dates:
+            return await self._collect_digest(date_from, date_to, update_db_dates)
+        async with self._dates_lock:
+            return await self._collect_digest(date_from, date_to, update_db_dates)
+
+    async def _collect_digest(
+        self,
+        date_from: Optional[dt.date],
+        date_to: Optional[dt.date],
+        update_db_dates: bool,
+    ) -> Dict:
+        """Собирает сообщения за диапазон и при необходимости сдвигает даты источников."""
         effective_date_to = date_to or (dt.date.today() - dt.timedelta(days=1))
 
-        sources = self._database.sources()
-        messages, errors, stats = await self._parser.parse(
-            sources=sources,
-            date_from=date_from,
-            date_to=effective_date_to,
-        )
+        sources = await self._database.sources()
+        if self._store is None:
+            messages, errors, stats = await self._parser.parse(
+                sources=sources,
+                date_from=date_from,
+                date_to=effective_date_to,
+            )
+            messages = await self._normalizer.normalize(messages)
+        else:
+            messages, errors, stats = await self._collect_with_store(sources, date_from, effective_date_to)
+
+        fresh, fingerprints = messages, []
+        if update_db_dates and self._delivery is not None:
+            prints = self._fingerprints(messages)
+            known = await self._database.run(self._delivery.delivered, [value for value in prints if value is not None])
+            fresh, fingerprints = self._undelivered(messages, prints, known)
+        stats["already_delivered"] = len(messages) - len(fresh)
 
-        texts = self._composer.compose(messages)
+        unique = await self._deduplicated(fresh) if self._deduplicate else fresh
+        stats["duplicates_merged"] = len(fresh) - len(unique)
+        texts = self._composer.compose(unique)
 
         if update_db_dates:
-            self._database.update_dates(messages=messages)
+            await self._database.update_dates(messages=messages)
+            await self._remember_delivered(fingerprints)
 
         return {
             "text": "\n\n".join(texts),
@@ -48,9 +107,283 @@ class DigestOrchestrator:
             "update_db_dates": update_db_dates,
         }
 
-    def update_dates_to_yesterday(self) -> int:
+    async def stream_digest(
+        self,
+        date_from: Optional[dt.date] = None,
+        date_to: Optional[dt.date] = None,
+        update_db_dates: bool = False,
+    ) -> AsyncIterator[Tuple[str, Any]]:
+        """Отдает части дайджеста по мере разбора источников.
+
+        События: ("text", часть) — готовое сообщение для отправки, последним
+        ("result", словарь) — сообщения, ошибки и статистика, как у collect_digest, но без текстов.
+        Порядок по дате соблюдается в пределах окна stream_window.
+        """
+        if not update_db_dates:
+            async for event in self._stream_digest(date_from, date_to, update_db_dates):
+                yield event
+            return
+        async with self._dates_lock:
+            async for event in self._stream_digest(date_from, date_to, update_db_dates):
+                yield event
+
+    async def _stream_digest(
+        self,
+        date_from: Optional[dt.date],
+        date_to: Optional[dt.date],
+        update_db_dates: bool,
+    ) -> AsyncIterator[Tuple[str, Any]]:
+        """Разбирает источники потоком и складывает части дайджеста по мере готовности."""
+        effective_date_to = date_to or (dt.date.today() - dt.timedelta(days=1))
+        stream = self._composer.stream(self._stream_window, deduplicate=self._deduplicate)
+        sources = await self._database.sources()
+
+        known: Optional[Set[int]] = None
+        if update_db_dates and self._delivery is not None:
+            known = await self._database.run(self._delivery.recent)
+        fingerprints: List[int] = []
+        skipped = 0
+
+        def undelivered(batch: List[Dict]) -> List[Dict]:
+            nonlocal skipped
+            if known is None:
+                return batch
+            fresh, new = self._undelivered(batch, self._fingerprints(batch), known)
+            fingerprints.extend(new)
+            skipped += len(batch) - len(fresh)
+            return fresh
+
+        stored_until: Dict[str, dt.date] = {}
+        runs = [(sources, date_from)]
+        messages: List[Dict] = []
+        if self._store is not None:
+            stored_until, live_sources, tail_sources = await self._plan_store(sources, date_from, effective_date_to)
+            runs = [(live_sources, date_from), (tail_sources, None)]
+            messages = await self._stored_messages(stored_until, date_from, effective_date_to)
+            for chunk in stream.add(undelivered(messages)):
+                yield "text", chunk
+
+        errors: List[str] = []
+        run_stats: List[Dict[str, Any]] = [{} for _ in runs]
+        succeeded: List[List[str]] = [[] for _ in runs]
+        parsed: List[Dict] = []
+        iterators = [
+            self._parser.iter_parse(run_sources, stats, errors, date_from=run_from, date_to=effective_date_to)
+            for (run_sources, run_from), stats in zip(runs, run_stats)
+        ]
+        async for index, (source, result) in self._merge(iterators):
+            # Пачка одного источника обычно меньше порога пула и чистится на месте; копить источники
+            # ради пула значило бы задержать первые части дайджеста.
+            result = await self._normalizer.normalize(result)
+            parsed.extend(result)
+            succeeded[index].append(source["source_link"])
+            for chunk in stream.add(undelivered(result)):
+                yield "text", chunk
+        for chunk in stream.finish():
+            yield "text", chunk
+
+        stats = run_stats[0]
+        if self._store is not None:
+            await self._save_to_store(runs, succeeded, parsed, effective_date_to)
+            stats = self._merge_stats(run_stats, len(sources), len(stored_until))
+        stats["duplicates_merged"] = stream.duplicates
+        stats["already_delivered"] = skipped
+        messages.extend(parsed)
+
+        if update_db_dates:
+            await self._database.update_dates(messages=messages)
+            await self._remember_delivered(fingerprints)
+
+        yield "result", {
+            "messages": messages,
+            "errors": errors,
+            "stats": stats,
+            "date_from": date_from,
+            "date_to": effective_date_to,
+            "update_db_dates": update_db_dates,
+        }
+
+    @staticmethod
+    async def _deduplicated(messages: List[Dict]) -> List[Dict]:
+        """Склеивает дубликаты; большие списки обрабатываются в потоке, чтобы не блокировать event loop."""
+        if len(messages) < INLINE_DEDUP_LIMIT:
+            return deduplicate(messages)
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(None, deduplicate, messages)
+
+    def _fingerprints(self, messages: List[Dict]) -> List[Optional[int]]:
+        """Считает отпечатки текстов новостей."""
+        return [self._delivery.fingerprint(message) for message in messages]
+
+    @staticmethod
+    def _undelivered(
+        messages: List[Dict],
+        fingerprints: List[Optional[int]],
+        known: Set[int],
+    ) -> Tuple[List[Dict], List[int]]:
+        """Оставляет новости, которых нет среди отправленных, и возвращает их отпечатки для записи."""
+        fresh: List[Dict] = []
+        new: List[int] = []
+        for message, fingerprint in zip(messages, fingerprints):
+            if fingerprint is not None:
+                if fingerprint in known:
+                    continue
+                new.append(fingerprint)
+            fresh.append(message)
+        return fresh, new
+
+    async def _remember_delivered(self, fingerprints: List[int]) -> None:
+        """Записывает отпечатки отправленных новостей в индекс."""
+        if self._delivery is not None:
+            await self._database.run(self._delivery.remember, fingerprints)
+
+    @staticmethod
+    async def _merge(iterators: List[AsyncIterator]) -> AsyncIterator[Tuple[int, Any]]:
+        """Сливает асинхронные итераторы в один поток пар (номер итератора, элемент)."""
+        queue: asyncio.Queue = asyncio.Queue()
+
+        async def pump(index: int, iterator: AsyncIterator) -> None:
+            try:
+                async for item in iterator:
+                    await queue.put((index, item, None))
+            except Exception as exc:
+                queue.put_nowait((None, None, exc))
+            else:
+                queue.put_nowait((None, None, None))
+
+        tasks = [asyncio.ensure_future(pump(index, iterator)) for index, iterator in enumerate(iterators)]
+        try:
+            remaining = len(tasks)
+            while remaining:
+                index, item, error = await queue.get()
+                if error is not None:
+                    raise error
+                if index is None:
+                    remaining -= 1
+                    continue
+                yield index, item
+        finally:
+            for task in tasks:
+                task.cancel()
+
+    async def _collect_with_store(
+        self,
+        sources: List[Dict],
+        date_from: Optional[dt.date],
+        date_to: dt.date,
+    ) -> Tuple[List[Dict], List[str], Dict[str, Any]]:
+        """Берет сохраненную часть диапазона из хранилища и докачивает только непокрытый хвост."""
+        stored_until, live_sources, tail_sources = await self._plan_store(sources, date_from, date_to)
+        runs = [(live_sources, date_from), (tail_sources, None)]
+        results = await asyncio.gather(
+            *(
+                self._parser.parse_detailed(run_sources, date_from=run_from, date_to=date_to)
+                for run_sources, run_from in runs
+            )
+        )
+
+        parsed = await self._normalizer.normalize(
+            [message for run_messages, _, _, _ in results for message in run_messages]
+        )
+        errors = [error for _, run_errors, _, _ in results for error in run_errors]
+        await self._save_to_store(runs, [succeeded for _, _, _, succeeded in results], parsed, date_to)
+        stored = await self._stored_messages(stored_until, date_from, date_to)
+
+        stats = self._merge_stats([run_stats for _, _, run_stats, _ in results], len(sources), len(stored_until))
+        return stored + parsed, errors, stats
+
+    async def _plan_store(
+        self,
+        sources: List[Dict],
+        date_from: Optional[dt.date],
+        date_to: dt.date,
+    ) -> Tuple[Dict[str, dt.date], List[Dict], List[Dict]]:
+        """Делит источники на покрытые хранилищем (до какой даты), разбираемые целиком и докачиваемые с хвоста."""
+        coverage = await self._database.run(self._store.coverage, [source["source_link"] for source in sources])
+        stored_until: Dict[str, dt.date] = {}
+        live_sources: List[Dict] = []
+        tail_sources: List[Dict] = []
+
+        for source in sources:
+            span = coverage.get(source["source_link"])
+            if date_from is None or span is None or span[0] > date_from or span[1] < date_from - dt.timedelta(days=1):
+                live_sources.append(source)
+                continue
+
+            stored_until[source["source_link"]] = min(span[1], date_to)
+            if span[1] < date_to:
+                tail_sources.append({**source, "last_message_date": span[1], "last_message_id": None})
+
+        logger.info(
+            "Из хранилища: %s источников; в сеть: %s полностью, %s за хвост",
+            len(stored_until),
+            len(live_sources),
+            len(tail_sources),
+        )
+        return stored_until, live_sources, tail_sources
+
+    async def _stored_messages(
+        self,
+        stored_until: Dict[str, dt.date],
+        date_from: Optional[dt.date],
+        date_to: dt.date,
+    ) -> List[Dict]:
+        """Читает из хранилища сообщения покрытой части диапазона."""
+        if not stored_until:
+            return []
+        stored = await self._database.run(self._store.messages, list(stored_until), date_from, date_to)
+        return [message for message in stored if message["date"] <= stored_until[message["source_link"]]]
+
+    async def _save_to_store(
+        self,
+        runs: List[Tuple[List[Dict], Optional[dt.date]]],
+        succeeded: List[List[str]],
+        parsed: List[Dict],
+        date_to: dt.date,
+    ) -> None:
+        """Сохраняет разобранные сообщения и расширяет покрытие успешно разобранных источников."""
+        await self._database.run(self._store.save, parsed)
+        for (run_sources, run_from), run_ok in zip(runs, succeeded):
+            await self._database.run(self._extend_coverage, run_sources, run_ok, run_from, date_to)
+
+    @staticmethod
+    def _merge_stats(run_stats: List[Dict[str, Any]], sources_total: int, sources_from_store: int) -> Dict[str, Any]:
+        """Складывает статистику запусков, объединяет разбивки по источникам и проставляет общее число источников."""
+        stats: Dict[str, Any] = {}
+        for item in run_stats:
+            for key, value in item.items():
+                if isinstance(value, dict):
+                    stats.setdefault(key, {}).update(value)
+                else:
+                    stats[key] = stats.get(key, 0) + value
+        stats["sources_total"] = sources_total
+        stats["sources_from_store"] = sources_from_store
+        return stats
+
+    def _extend_coverage(
+        self,
+        sources: List[Dict],
+        succeeded: List[str],
+        date_from: Optional[dt.date],
+        date_to: dt.date,
+    ) -> None:
+        """Отмечает собранный диапазон у успешно разобранных источников; сегодняшний день не покрывается."""
+        covered_to = min(date_to, dt.date.today() - dt.timedelta(days=1))
+        succeeded_links = set(succeeded)
+        for source in sources:
+            if source["source_link"] not in succeeded_links:
+                continue
+
+            covered_from = date_from
+            if covered_from is None and source.get("last_message_date") is not None:
+                covered_from = source["last_message_date"] + dt.timedelta(days=1)
+            if covered_from is not None:
+                self._store.extend_coverage(source["source_link"], covered_from, covered_to)
+
+    async def update_dates_to_yesterday(self) -> int:
         """Обновляет даты источников на вчера."""
-        return self._database.update_dates_to_yesterday()
+        async with self._dates_lock:
+            return await self._database.update_dates_to_yesterday()
 
     def run_seed_db(self) -> None:
         """Запускает синхронизацию seed-данных в БД."""
@@ -65,5 +398,8 @@ class DigestOrchestrator:
         seed_database(dsn=dsn)
 
     async def disconnect(self) -> None:
-        """Закрывает ресурсы парсеров."""
+        """Закрывает ресурсы парсеров и базы данных."""
         await self._parser.disconnect()
+        self._normalizer.close()
+        if hasattr(self._database, "close"):
+            self._database.close()
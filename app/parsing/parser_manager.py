@@ -1,68 +1,155 @@
 import asyncio
 import logging
+from contextlib import nullcontext
 from datetime import date
-from typing import Any, Dict, List, Optional, Tuple
+from typing import Any, AsyncIterator, Dict, List, Optional, Tuple
+
+from parsing.fetch_cache import SourceFetchCache, covers, slice_messages
+from parsing.source_budget import source_budget
 
 logger = logging.getLogger(__name__)
 
+# VK склеивает одновременные запросы в execute по 25 штук, поэтому ему нужен лимит не меньше.
+DEFAULT_TYPE_CONCURRENCY = {"TG": 4, "VK": 25, "WEB": 8}
+
 
 class ParserManager:
     """Маршрутизирует источники по нужным парсерам."""
 
-    def __init__(self, tg_parser=None, vk_parser=None, web_parser=None) -> None:
-        """Сохраняет доступные парсеры."""
+    def __init__(
+        self,
+        tg_parser=None,
+        vk_parser=None,
+        web_parser=None,
+        max_concurrency: int = 32,
+        type_concurrency: Optional[Dict[str, int]] = None,
+        source_timeout: Optional[float] = 120.0,
+        cache_ttl: Optional[float] = 300.0,
+        cache_max_bytes: int = 16 * 1024 * 1024,
+    ) -> None:
+        """Сохраняет доступные парсеры, лимиты параллельности и кэш загрузок; cache_ttl=None отключает кэш."""
         self._tg = tg_parser
         self._vk = vk_parser
         self._web = web_parser
+        self._source_timeout = source_timeout
+        self._global_semaphore = asyncio.Semaphore(max_concurrency)
+        limits = {**DEFAULT_TYPE_CONCURRENCY, **(type_concurrency or {})}
+        self._type_semaphores = {name: asyncio.Semaphore(limit) for name, limit in limits.items()}
+        self._in_flight: Dict[Tuple, List[Dict]] = {}
+        self._cache = SourceFetchCache(ttl=cache_ttl, max_bytes=cache_max_bytes) if cache_ttl else None
 
     async def parse(
         self,
         sources: List[Dict],
         date_from: Optional[date] = None,
         date_to: Optional[date] = None,
-    ) -> Tuple[List[Dict], List[str], Dict[str, int]]:
+    ) -> Tuple[List[Dict], List[str], Dict[str, Any]]:
         """Запускает парсеры и возвращает сообщения, ошибки и статистику."""
-        tg_sources, vk_sources, web_sources, no_parser_sources = self._split_sources(sources)
+        messages, errors, stats, _ = await self.parse_detailed(sources, date_from=date_from, date_to=date_to)
+        return messages, errors, stats
 
-        stats = {
-            "sources_total": len(sources),
-            "sources_with_news": 0,
-            "sources_without_news": 0,
-            "sources_failed": 0,
-            "sources_without_parser": len(no_parser_sources),
-        }
+    async def parse_detailed(
+        self,
+        sources: List[Dict],
+        date_from: Optional[date] = None,
+        date_to: Optional[date] = None,
+    ) -> Tuple[List[Dict], List[str], Dict[str, Any], List[str]]:
+        """Как parse, но дополнительно возвращает ссылки источников, разобранных без ошибок."""
+        tg_sources, vk_sources, web_sources, no_parser_sources = self._split_sources(sources)
+        stats = self._new_stats(len(sources), len(no_parser_sources))
 
         jobs = self._jobs(tg_sources, vk_sources, web_sources, date_from, date_to)
         if not jobs:
-            return [], [], stats
+            return [], [], stats, []
 
         job_results = await asyncio.gather(*jobs)
         messages: List[Dict] = []
         errors: List[str] = []
+        succeeded: List[str] = []
 
         for item in job_results:
-            source_items = item["sources"]
-            source_count = len(source_items)
-            error_text = item["error"]
-            result = item["result"]
-
-            if error_text is not None:
-                stats["sources_failed"] += source_count
-                errors.append(error_text)
-                continue
+            result = self._account(item, stats, errors)
+            if result is not None:
+                messages.extend(result)
+                succeeded.append(item["source"]["source_link"])
 
-            if not isinstance(result, list):
-                stats["sources_failed"] += source_count
-                errors.append(f"Unexpected parser result type: {type(result)}")
-                continue
+        return messages, errors, stats, succeeded
 
-            messages.extend(result)
+    async def iter_parse(
+        self,
+        sources: List[Dict],
+        stats: Dict[str, Any],
+        errors: List[str],
+        date_from: Optional[date] = None,
+        date_to: Optional[date] = None,
+    ) -> AsyncIterator[Tuple[Dict, List[Dict]]]:
+        """Отдает источник и его сообщения по мере готовности, не дожидаясь самого медленного.
 
-            with_news = self._count_sources_with_news(source_items, result)
-            stats["sources_with_news"] += with_news
-            stats["sources_without_news"] += max(source_count - with_news, 0)
+        Статистика и ошибки копятся в переданных stats и errors; упавшие источники не отдаются.
+        """
+        tg_sources, vk_sources, web_sources, no_parser_sources = self._split_sources(sources)
+        stats.update(self._new_stats(len(sources), len(no_parser_sources)))
 
-        return messages, errors, stats
+        tasks = [
+            asyncio.ensure_future(job) for job in self._jobs(tg_sources, vk_sources, web_sources, date_from, date_to)
+        ]
+        try:
+            for next_done in asyncio.as_completed(tasks):
+                item = await next_done
+                result = self._account(item, stats, errors)
+                if result is not None:
+                    yield item["source"], result
+        finally:
+            for task in tasks:
+                task.cancel()
+
+    def _account(self, item: Dict[str, Any], stats: Dict[str, Any], errors: List[str]) -> Optional[List[Dict]]:
+        """Учитывает результат источника в статистике и ошибках; возвращает сообщения или None при сбое."""
+        error_text = item["error"]
+        result = item["result"]
+        if self._cache is not None:
+            stats["cache_hits" if item["cache_hit"] else "cache_misses"] += 1
+        fetch = item["fetch"]
+        if fetch:
+            stats["pages_fetched"] += fetch.get("pages", 0)
+            stats["bytes_fetched"] += fetch.get("bytes", 0)
+            stats["fetched_by_source"][item["source"]["source_link"]] = dict(fetch)
+
+        if error_text is not None:
+            stats["sources_failed"] += 1
+            errors.append(error_text)
+            return None
+
+        if not isinstance(result, list):
+            stats["sources_failed"] += 1
+            errors.append(f"Unexpected parser result type: {type(result)}")
+            return None
+
+        if result:
+            stats["sources_with_news"] += 1
+        else:
+            stats["sources_without_news"] += 1
+        return result
+
+    @staticmethod
+    def _new_stats(sources_total: int, sources_without_parser: int) -> Dict[str, Any]:
+        """Создает пустую статистику разбора.
+
+        fetched_by_source хранит по ссылке источника число страниц и байтов
+        загрузки, если парсер их сообщает.
+        """
+        return {
+            "sources_total": sources_total,
+            "sources_with_news": 0,
+            "sources_without_news": 0,
+            "sources_failed": 0,
+            "sources_without_parser": sources_without_parser,
+            "cache_hits": 0,
+            "cache_misses": 0,
+            "pages_fetched": 0,
+            "bytes_fetched": 0,
+            "fetched_by_source": {},
+        }
 
     def _split_sources(self, sources: List[Dict]) -> Tuple[List[Dict], List[Dict], List[Dict], List[Dict]]:
         """Делит источники по типам и отделяет неподдерживаемые."""
@@ -107,32 +194,124 @@ class ParserManager:
         date_from: Optional[date],
         date_to: Optional[date],
     ) -> List[Any]:
-        """Создает асинхронные задачи запуска парсеров."""
+        """Создает по асинхронной задаче на каждый источник."""
         tasks: List[Any] = []
 
-        if tg_sources and self._tg is not None:
-            tasks.append(self._run_parser_job("TG", self._tg, tg_sources, date_from, date_to))
-        if vk_sources and self._vk is not None:
-            tasks.append(self._run_parser_job("VK", self._vk, vk_sources, date_from, date_to))
-        if web_sources and self._web is not None:
-            tasks.append(self._run_parser_job("WEB", self._web, web_sources, date_from, date_to))
+        for parser_name, parser, source_items in (
+            ("TG", self._tg, tg_sources),
+            ("VK", self._vk, vk_sources),
+            ("WEB", self._web, web_sources),
+        ):
+            if parser is None:
+                continue
+            for source in source_items:
+                tasks.append(self._run_source_job(parser_name, parser, source, date_from, date_to))
 
         return tasks
 
-    async def _run_parser_job(
+    async def _run_source_job(
         self,
         parser_name: str,
         parser: Any,
-        source_items: List[Dict],
+        source: Dict,
         date_from: Optional[date],
         date_to: Optional[date],
     ) -> Dict[str, Any]:
-        """Запускает один парсер и сохраняет контекст источников."""
+        """Парсит один источник, присоединяясь к уже идущей загрузке, если она покрывает диапазон."""
         try:
-            result = await parser.parse(source_items, date_from=date_from, date_to=date_to)
-            return {"sources": source_items, "result": result, "error": None}
+            result, cache_hit, fetch = await self._shared_fetch(parser_name, parser, source, date_from, date_to)
+            return {"source": source, "result": result, "error": None, "cache_hit": cache_hit, "fetch": fetch}
+        except asyncio.TimeoutError:
+            error = f"{parser_name} source timeout after {self._source_timeout}s: {source.get('source_link')}"
+            return {"source": source, "result": None, "error": error, "cache_hit": False, "fetch": {}}
         except Exception as exc:
-            return {"sources": source_items, "result": None, "error": f"{parser_name} parser error: {exc}"}
+            error = f"{parser_name} parser error for {source.get('source_link')}: {exc}"
+            return {"source": source, "result": None, "error": error, "cache_hit": False, "fetch": {}}
+
+    async def _shared_fetch(
+        self,
+        parser_name: str,
+        parser: Any,
+        source: Dict,
+        date_from: Optional[date],
+        date_to: Optional[date],
+    ) -> Tuple[Any, bool, Dict[str, int]]:
+        """Отвечает из кэша или single-flight: одновременные запросы источника делят одну загрузку.
+
+        Возвращает результат, признак попадания в кэш и статистику загрузки;
+        страницы и байты достаются только запросу, который сам ходил в сеть.
+        """
+        key = (parser_name, source.get("source_name"), source.get("source_link"))
+        if self._cache is not None:
+            cached = self._cache.get(key, source, date_from, date_to)
+            if cached is not None:
+                logger.info("%s served from fetch cache: %s", parser_name, source.get("source_link"))
+                return cached, True, {}
+
+        for flight in self._in_flight.get(key, []):
+            if covers(flight, source, date_from, date_to):
+                logger.info("%s joined in-flight fetch for %s", parser_name, source.get("source_link"))
+                result = await asyncio.shield(flight["task"])
+                if not isinstance(result, list):
+                    return result, False, {}
+                return slice_messages(result, flight, source, date_from, date_to), False, {}
+
+        fetch: Dict[str, int] = {}
+        task = asyncio.ensure_future(self._limited_parse(parser_name, parser, source, date_from, date_to, fetch))
+        flight = {"task": task, "source": source, "date_from": date_from, "date_to": date_to}
+        self._in_flight.setdefault(key, []).append(flight)
+        task.add_done_callback(lambda _: self._drop_flight(key, flight))
+        result = await asyncio.shield(task)
+        if self._cache is not None and isinstance(result, list):
+            self._cache.put(key, source, date_from, date_to, result)
+        return result, False, fetch
+
+    async def _limited_parse(
+        self,
+        parser_name: str,
+        parser: Any,
+        source: Dict,
+        date_from: Optional[date],
+        date_to: Optional[date],
+        fetch: Dict[str, int],
+    ) -> Any:
+        """Парсит один источник с учетом лимитов параллельности и таймаута.
+
+        Сначала берется слот своего типа и только потом общий: источники, ждущие
+        занятого типа, не держат общие слоты и не задерживают источники других типов.
+        """
+        type_semaphore = self._type_semaphores.get(parser_name)
+        async with type_semaphore or nullcontext():
+            async with self._global_semaphore:
+                return await self._parse_source(parser, source, date_from, date_to, fetch)
+
+    def _drop_flight(self, key: Tuple, flight: Dict) -> None:
+        """Убирает завершенную загрузку из списка идущих."""
+        flights = self._in_flight.get(key, [])
+        if flight in flights:
+            flights.remove(flight)
+        if not flights:
+            self._in_flight.pop(key, None)
+
+    async def _parse_source(
+        self,
+        parser: Any,
+        source: Dict,
+        date_from: Optional[date],
+        date_to: Optional[date],
+        fetch: Dict[str, int],
+    ) -> Any:
+        """Вызывает parse_source парсера, если он есть, иначе parse по одному источнику."""
+        if getattr(parser, "reports_fetch_stats", False):
+            job = parser.parse_source(source, date_from=date_from, date_to=date_to, fetch_stats=fetch)
+        elif hasattr(parser, "parse_source"):
+            job = parser.parse_source(source, date_from=date_from, date_to=date_to)
+        else:
+            job = parser.parse([source], date_from=date_from, date_to=date_to)
+
+        # Паузы парсера через source_budget.pause (FloodWait) сдвигают срок и не съедают таймаут.
+        async with source_budget(self._source_timeout):
+            return await job
 
     def _source_info(self, source: Dict) -> Dict:
         """Оставляет поля, нужные парсеру."""
@@ -141,16 +320,14 @@ class ParserManager:
             "source_link": source.get("source_link"),
             "contact": source.get("contact"),
             "last_message_date": source.get("last_message_date"),
+            "last_message_id": source.get("last_message_id"),
         }
 
-    def _count_sources_with_news(self, source_items: List[Dict], messages: List[Dict]) -> int:
-        """Считает, для скольких источников есть хотя бы одна новость."""
-        news_keys = {(message.get("source_name"), message.get("source_link")) for message in messages}
-        return sum(1 for source in source_items if (source.get("source_name"), source.get("source_link")) in news_keys)
-
     async def disconnect(self) -> None:
         """Вызывает disconnect у доступных парсеров."""
         if self._tg is not None and hasattr(self._tg, "disconnect"):
             await self._tg.disconnect()
         if self._vk is not None and hasattr(self._vk, "disconnect"):
             await self._vk.disconnect()
+        if self._web is not None and hasattr(self._web, "disconnect"):
+            await self._web.disconnect()
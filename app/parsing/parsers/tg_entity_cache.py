@@ -0,0 +1,47 @@
+import logging
+from typing import Optional
+
+from telethon.tl.types import InputPeerChannel
+
+from parsing.state_file import JsonStateFile
+
+logger = logging.getLogger(__name__)
+
+
+class TelegramEntityCache:
+    """Хранит разрешенные Telegram-каналы в JSON-файле между запусками."""
+
+    def __init__(self, path: str) -> None:
+        """Открывает файл кэша."""
+        self._state = JsonStateFile(path)
+
+    def get(self, source_link: str) -> Optional[InputPeerChannel]:
+        """Возвращает сохраненный peer канала или None."""
+        entry = self._state.get(source_link)
+        if entry is None:
+            return None
+        return InputPeerChannel(channel_id=entry["channel_id"], access_hash=entry["access_hash"])
+
+    def username(self, source_link: str) -> Optional[str]:
+        """Возвращает username канала на момент разрешения."""
+        entry = self._state.get(source_link)
+        return entry.get("username") if entry else None
+
+    def put(self, source_link: str, peer, username: Optional[str] = None) -> None:
+        """Сохраняет peer канала; peer других типов не кэшируются."""
+        if not isinstance(peer, InputPeerChannel):
+            return
+
+        self._state.set(
+            source_link,
+            {
+                "channel_id": peer.channel_id,
+                "access_hash": peer.access_hash,
+                "username": username,
+            },
+        )
+
+    def invalidate(self, source_link: str) -> None:
+        """Удаляет запись, чтобы канал разрешился заново."""
+        if self._state.delete(source_link):
+            logger.info("TG entity cache invalidated for %s", source_link)
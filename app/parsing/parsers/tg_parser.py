@@ -1,11 +1,33 @@
+import asyncio
 import logging
+from dataclasses import dataclass
 from datetime import date, datetime
-from typing import Dict, List, Optional
+from typing import Any, AsyncIterator, Dict, List, Optional
 
 from telethon import TelegramClient
+from telethon.errors import ChannelInvalidError, ChannelPrivateError, FloodWaitError
+from telethon.tl.functions.messages import GetHistoryRequest
+from telethon.tl.types import Message
+
+from parsing.parsers.tg_entity_cache import TelegramEntityCache
+from parsing.records import NewsItem, Source
+from parsing.source_budget import pause
 
 logger = logging.getLogger(__name__)
 
+# GetHistoryRequest отдает не больше 100 сообщений за вызов.
+HISTORY_PAGE_SIZE = 100
+
+
+@dataclass(frozen=True, slots=True)
+class HistoryMessage:
+    """Поля сырого сообщения из GetHistoryRequest, которые читает парсер."""
+
+    id: int
+    date: datetime
+    text: str
+    chat: Any = None
+
 
 class TelegramParser:
     """Парсит Telegram-каналы через Telethon."""
@@ -16,13 +38,29 @@ class TelegramParser:
         api_hash: str,
         phone_number: str,
         session_name: str = "user_session",
+        max_concurrency: int = 4,
+        max_flood_wait: int = 300,
+        max_flood_retries: int = 3,
+        entity_cache_path: Optional[str] = None,
+        lean: bool = False,
     ):
-        """Сохраняет параметры клиента Telegram."""
+        """Сохраняет параметры клиента Telegram.
+
+        lean включает экономный режим: история читается сырыми GetHistoryRequest
+        в HistoryMessage, без сборки высокоуровневых Message с сущностями и медиа.
+        """
         self._session_name = session_name
         self._api_id = api_id
         self._api_hash = api_hash
         self._phone_number = phone_number
         self._client: Optional[TelegramClient] = None
+        self._client_lock = asyncio.Lock()
+        self._max_concurrency = max(1, max_concurrency)
+        self._max_flood_wait = max_flood_wait
+        self._max_flood_retries = max_flood_retries
+        self._flood_until = 0.0
+        self._entity_cache = TelegramEntityCache(entity_cache_path) if entity_cache_path else None
+        self._lean = lean
 
     async def parse(
         self,
@@ -31,13 +69,20 @@ class TelegramParser:
         date_to: Optional[date] = None,
     ) -> List[Dict]:
         """Собирает новости из переданных каналов."""
-        await self._ensure_client()
+        async with self._client_lock:
+            await self._ensure_client()
         all_results: List[Dict] = []
 
         logger.info("Starting TG parsing for %d channels", len(sources))
 
-        for source in sources:
-            channel_news = await self._parse_single_channel(source, date_from=date_from, date_to=date_to)
+        semaphore = asyncio.Semaphore(self._max_concurrency)
+
+        async def parse_limited(source: Dict) -> List[Dict]:
+            async with semaphore:
+                return await self._parse_single_channel(source, date_from=date_from, date_to=date_to)
+
+        channels_news = await asyncio.gather(*(parse_limited(source) for source in sources))
+        for channel_news in channels_news:
             all_results.extend(channel_news)
 
         logger.info("TG parsing finished. New messages: %d", len(all_results))
@@ -48,7 +93,8 @@ class TelegramParser:
         if self._client and self._client.is_connected():
             return
 
-        self._client = TelegramClient(self._session_name, self._api_id, self._api_hash)
+        # Telethon сам не спит на FloodWait: паузы идут через _wait_for_flood и не расходуют таймаут источника.
+        self._client = TelegramClient(self._session_name, self._api_id, self._api_hash, flood_sleep_threshold=0)
         await self._client.connect()
 
         if not await self._client.is_user_authorized():
@@ -66,6 +112,17 @@ class TelegramParser:
                 else:
                     raise
 
+    async def parse_source(
+        self,
+        source: Dict,
+        date_from: Optional[date] = None,
+        date_to: Optional[date] = None,
+    ) -> List[Dict]:
+        """Парсит один канал; в отличие от parse, пробрасывает ошибки источника."""
+        async with self._client_lock:
+            await self._ensure_client()
+        return await self._fetch_channel(source, date_from=date_from, date_to=date_to)
+
     async def _parse_single_channel(
         self,
         source: Dict,
@@ -73,56 +130,181 @@ class TelegramParser:
         date_to: Optional[date] = None,
     ) -> List[Dict]:
         """Парсит один канал в заданном диапазоне."""
-        results: List[Dict] = []
-
         try:
-            channel_link = source["source_link"]
-            source_name = source["source_name"]
-
-            last_date = self._to_date(source.get("last_message_date"))
-            start_date = self._to_date(date_from)
-            end_date = self._to_date(date_to)
-            lower_bound = start_date if start_date is not None else last_date
-            inclusive_start = start_date is not None
-
-            logger.info(
-                "TG channel=%s, lower_bound=%s, date_to=%s",
-                source_name,
-                lower_bound,
-                end_date,
+            return await self._fetch_channel(source, date_from=date_from, date_to=date_to)
+        except Exception as exc:
+            logger.error("TG parsing error for %s: %s", source.get("source_name"), exc)
+            return []
+
+    async def _fetch_channel(
+        self,
+        source: Dict,
+        date_from: Optional[date] = None,
+        date_to: Optional[date] = None,
+    ) -> List[NewsItem]:
+        """Читает сообщения канала в заданном диапазоне."""
+        results: List[NewsItem] = []
+
+        channel_link = source["source_link"]
+        source_name = source["source_name"]
+        record = Source.of(source)
+
+        last_date = self._to_date(source.get("last_message_date"))
+        start_date = self._to_date(date_from)
+        end_date = self._to_date(date_to)
+        lower_bound = start_date if start_date is not None else last_date
+        # Курсор отсекает уже виденные сообщения по id, поэтому граничный день можно включать.
+        cursor = source.get("last_message_id") if start_date is None else None
+        inclusive_start = start_date is not None or cursor is not None
+
+        logger.info(
+            "TG channel=%s, lower_bound=%s, min_id=%s, date_to=%s",
+            source_name,
+            lower_bound,
+            cursor,
+            end_date,
+        )
+
+        async for message in self._iter_channel_messages(channel_link, limit=50, min_id=cursor):
+            if not message or not message.text:
+                continue
+
+            msg_date = message.date.date()
+
+            if end_date and msg_date > end_date:
+                continue
+
+            if lower_bound is not None:
+                if inclusive_start:
+                    if msg_date < lower_bound:
+                        break
+                else:
+                    if msg_date <= lower_bound:
+                        break
+
+            results.append(
+                NewsItem(
+                    source=record,
+                    date=msg_date,
+                    message=message.text,
+                    external_id=getattr(message, "id", None),
+                )
             )
 
-            async for message in self._client.iter_messages(channel_link, limit=50):
-                if not message or not message.text:
-                    continue
+        return results
 
-                msg_date = message.date.date()
+    async def _iter_channel_messages(
+        self,
+        channel_link: str,
+        limit: int,
+        min_id: Optional[int] = None,
+    ) -> AsyncIterator:
+        """Итерирует сообщения канала новее min_id, переживая FloodWait без потери канала."""
+        offset_id = 0
+        fetched = 0
+        retries = 0
+        stale_peer_retried = False
 
-                if end_date and msg_date > end_date:
-                    continue
+        while fetched < limit:
+            await self._wait_for_flood()
+            try:
+                peer = await self._channel_peer(channel_link)
+                async for message in self._history(peer, limit - fetched, offset_id, min_id or 0):
+                    if fetched == 0:
+                        self._check_renamed(channel_link, message)
+                    fetched += 1
+                    offset_id = getattr(message, "id", None) or offset_id
+                    yield message
+                return
+            except (ValueError, ChannelInvalidError, ChannelPrivateError):
+                if self._entity_cache is None or stale_peer_retried or self._entity_cache.get(channel_link) is None:
+                    raise
+                stale_peer_retried = True
+                self._entity_cache.invalidate(channel_link)
+            except FloodWaitError as exc:
+                retries += 1
+                if exc.seconds > self._max_flood_wait or retries > self._max_flood_retries:
+                    raise
+                logger.warning("TG FloodWait %ss for %s, resuming after pause", exc.seconds, channel_link)
+                loop = asyncio.get_running_loop()
+                self._flood_until = max(self._flood_until, loop.time() + exc.seconds)
 
-                if lower_bound is not None:
-                    if inclusive_start:
-                        if msg_date < lower_bound:
-                            break
-                    else:
-                        if msg_date <= lower_bound:
-                            break
-
-                results.append(
-                    {
-                        "source_name": source_name,
-                        "source_link": channel_link,
-                        "contact": source.get("contact"),
-                        "date": msg_date.strftime("%Y-%m-%d"),
-                        "message": message.text.replace("\n", " "),
-                    }
+    def _history(self, peer, limit: int, offset_id: int = 0, min_id: int = 0) -> AsyncIterator:
+        """Итерирует сообщения канала от новых к старым через iter_messages или, в экономном режиме, сырые запросы."""
+        params = {"limit": limit}
+        if offset_id:
+            params["offset_id"] = offset_id
+        if min_id:
+            params["min_id"] = min_id
+        if not self._lean:
+            return self._client.iter_messages(peer, **params)
+        return self._raw_history(peer, limit, offset_id, min_id)
+
+    async def _raw_history(self, peer, limit: int, offset_id: int, min_id: int) -> AsyncIterator[HistoryMessage]:
+        """Читает историю страницами GetHistoryRequest и отдает только id, дату и текст сообщений."""
+        while limit > 0:
+            page_size = min(limit, HISTORY_PAGE_SIZE)
+            result = await self._client(
+                GetHistoryRequest(
+                    peer=peer,
+                    offset_id=offset_id,
+                    offset_date=None,
+                    add_offset=0,
+                    limit=page_size,
+                    max_id=0,
+                    min_id=min_id or 0,
+                    hash=0,
                 )
+            )
+            messages = getattr(result, "messages", None) or []
+            # В chats бывают и каналы пересланных или упомянутых сообщений: свой канал ищется по peer_id.
+            chats = {chat.id: chat for chat in getattr(result, "chats", None) or []}
+            for raw in messages:
+                # Служебные и пустые сообщения не несут текста новости.
+                if isinstance(raw, Message):
+                    chat = chats.get(getattr(raw.peer_id, "channel_id", None))
+                    yield HistoryMessage(id=raw.id, date=raw.date, text=raw.message, chat=chat)
 
-        except Exception as exc:
-            logger.error("TG parsing error for %s: %s", source.get("source_name"), exc)
+            if len(messages) < page_size:
+                return
+            limit -= len(messages)
+            offset_id = messages[-1].id
 
-        return results
+    async def _channel_peer(self, channel_link: str):
+        """Возвращает peer канала из кэша, разрешая ссылку только при промахе."""
+        if self._entity_cache is None:
+            return channel_link
+
+        peer = self._entity_cache.get(channel_link)
+        if peer is None:
+            peer = await self._client.get_input_entity(channel_link)
+            self._entity_cache.put(channel_link, peer, username=self._username_from_link(channel_link))
+        return peer
+
+    def _check_renamed(self, channel_link: str, message) -> None:
+        """Сбрасывает кэш, если username канала больше не совпадает со ссылкой."""
+        if self._entity_cache is None:
+            return
+
+        cached_username = self._entity_cache.username(channel_link)
+        actual_username = getattr(getattr(message, "chat", None), "username", None)
+        if cached_username and actual_username and cached_username.lower() != actual_username.lower():
+            logger.info("TG channel %s renamed to @%s", channel_link, actual_username)
+            self._entity_cache.invalidate(channel_link)
+
+    @staticmethod
+    def _username_from_link(channel_link: str) -> Optional[str]:
+        """Извлекает username из ссылки вида t.me/<username>."""
+        last = channel_link.rstrip("/").split("/")[-1].lstrip("@")
+        if not last or last.startswith("+") or "joinchat" in channel_link:
+            return None
+        return last
+
+    async def _wait_for_flood(self) -> None:
+        """Ждет окончания общего для аккаунта FloodWait, не расходуя таймаут источника."""
+        delay = self._flood_until - asyncio.get_running_loop().time()
+        if delay > 0:
+            await pause(delay)
 
     @staticmethod
     def _to_date(value) -> Optional[date]:
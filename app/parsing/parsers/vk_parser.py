@@ -1,26 +1,74 @@
+import asyncio
+import functools
+import json
 import logging
+import math
+import threading
+from concurrent.futures import ThreadPoolExecutor
 from datetime import date, datetime
-from typing import Dict, List, Optional
+from typing import Any, Callable, Dict, List, Optional, Tuple
 
 import vk_api
 
+from parsing.records import NewsItem, Source
+
 logger = logging.getLogger(__name__)
 
+# VK допускает не более 25 обращений к API внутри одного execute.
+EXECUTE_MAX_CALLS = 25
+# wall.get отдает не больше 100 постов за вызов.
+MAX_PAGE_SIZE = 100
+MIN_PAGE_SIZE = 5
+# Первая страница группы, частота постов которой еще неизвестна.
+DEFAULT_FIRST_PAGE_SIZE = 20
+# Запас к ожидаемому числу постов, чтобы обычный день укладывался в одну страницу.
+PAGE_SIZE_MARGIN = 1.5
+# Вес нового замера в скользящей средней частоты постов.
+RATE_SMOOTHING = 0.5
+# Поля поста, которые читает парсер; в экономном режиме execute возвращает только их столбцы.
+# VK отдает их у каждого поста, поэтому столбцы items@.поле совпадают по длине. is_pinned есть
+# только у закрепленного поста и передается отдельно: id первого поста, если он закреплен.
+LEAN_POST_FIELDS = ("id", "date", "text")
+
 
 class VkParser:
-    """Парсит группы и паблики VK."""
+    """Парсит группы и паблики VK.
+
+    Размер первой страницы подбирается по запомненной частоте постов группы,
+    дальше посты читаются полными страницами до нижней границы диапазона.
+    """
+
+    # ParserManager передает в parse_source словарь fetch_stats для числа страниц и байтов ответов.
+    reports_fetch_stats = True
 
     def __init__(
         self,
         token: str,
         session_name: str = "vk_session",
         api_version: str = "5.199",
+        max_workers: int = 4,
+        execute_batch_size: int = EXECUTE_MAX_CALLS,
+        lean: bool = False,
     ):
-        """Сохраняет параметры VK API."""
+        """Сохраняет параметры VK API.
+
+        lean включает экономный режим: wall.get всегда идет через execute, который
+        возвращает только поля LEAN_POST_FIELDS вместо полных постов с вложениями,
+        репостами, лайками и просмотрами.
+        """
         self._token = token
         self._vk_session: Optional[vk_api.VkApi] = None
         self._vk = None
         self._api_version = api_version
+        self._max_workers = max_workers
+        self._executor: Optional[ThreadPoolExecutor] = None
+        self._execute_batch_size = max(1, min(execute_batch_size, EXECUTE_MAX_CALLS))
+        self._lean = lean
+        self._pending_calls: List[Tuple[Dict, asyncio.Future]] = []
+        self._flush_scheduled = False
+        self._batch_tasks: set = set()
+        self._post_rates: Dict[str, float] = {}
+        self._transport = threading.local()
 
     def _ensure_client(self) -> None:
         """Инициализирует VK-клиент."""
@@ -29,8 +77,148 @@ class VkParser:
 
         self._vk_session = vk_api.VkApi(token=self._token, api_version=self._api_version)
         self._vk = self._vk_session.get_api()
+        self._vk_session.http.hooks["response"].append(self._count_response_bytes)
         logger.info("VK client initialized")
 
+    def _count_response_bytes(self, response, *args, **kwargs) -> None:
+        """Хук requests: прибавляет размер тела HTTP-ответа к счетчику текущего потока.
+
+        Берется Content-Length (байты по сети, сжатые), а без него — длина распакованного тела.
+        """
+        size = response.headers.get("Content-Length")
+        self._transport.bytes = getattr(self._transport, "bytes", 0) + int(size or len(response.content))
+
+    def _sized_call(self, method: Callable[..., Any], params: Dict) -> Tuple[Any, int]:
+        """Выполняет вызов vk_api и возвращает ответ вместе с числом полученных байтов."""
+        self._transport.bytes = 0
+        result = method(**params)
+        return result, self._transport.bytes
+
+    async def _call_api(self, method: Callable[..., Any], **params) -> Tuple[Any, int]:
+        """Выполняет синхронный вызов vk_api в пуле потоков, не блокируя event loop.
+
+        Возвращает ответ и размер HTTP-ответов, полученных за вызов.
+        """
+        if self._executor is None:
+            self._executor = ThreadPoolExecutor(max_workers=self._max_workers, thread_name_prefix="vk_api")
+
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self._executor, functools.partial(self._sized_call, method, params))
+
+    async def _wall_get(self, params: Dict) -> Tuple[Dict, int]:
+        """Ставит вызов wall.get в очередь, которая отправляется пачками через execute.
+
+        Возвращает ответ и долю байтов HTTP-ответа, приходящуюся на этот вызов.
+        """
+        if self._execute_batch_size <= 1 and not self._lean:
+            return await self._call_api(self._vk.wall.get, **params)
+
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+        self._pending_calls.append((dict(params), future))
+
+        if len(self._pending_calls) >= self._execute_batch_size:
+            self._flush_pending_calls()
+        elif not self._flush_scheduled:
+            self._flush_scheduled = True
+            loop.call_soon(self._flush_pending_calls)
+
+        return await future
+
+    def _flush_pending_calls(self) -> None:
+        """Отправляет накопленные вызовы wall.get пачками по execute_batch_size."""
+        self._flush_scheduled = False
+        while self._pending_calls:
+            batch = self._pending_calls[: self._execute_batch_size]
+            del self._pending_calls[: self._execute_batch_size]
+            task = asyncio.ensure_future(self._run_batch(batch))
+            self._batch_tasks.add(task)
+            task.add_done_callback(self._batch_tasks.discard)
+
+    async def _run_batch(self, batch: List[Tuple[Dict, asyncio.Future]]) -> None:
+        """Выполняет пачку wall.get одним запросом и раздает ответы ожидающим."""
+        try:
+            if len(batch) == 1 and not self._lean:
+                response, size = await self._call_api(self._vk.wall.get, **batch[0][0])
+                responses = [response]
+            else:
+                code = self._execute_code([params for params, _ in batch], lean=self._lean)
+                responses, size = await self._call_api(self._vk.execute, code=code)
+        except Exception as exc:
+            for _, future in batch:
+                if not future.done():
+                    future.set_exception(exc)
+            return
+
+        if not isinstance(responses, list) or len(responses) != len(batch):
+            error = RuntimeError(f"Unexpected VK execute response: {type(responses)}")
+            for _, future in batch:
+                if not future.done():
+                    future.set_exception(error)
+            return
+
+        for (params, future), response, share in zip(batch, responses, self._byte_shares(size, responses)):
+            if future.done():
+                continue
+            if isinstance(response, dict):
+                future.set_result((response, share))
+            else:
+                future.set_exception(RuntimeError(f"VK wall.get failed inside execute for {params}"))
+
+    @staticmethod
+    def _byte_shares(size: int, responses: List[Any]) -> List[int]:
+        """Делит байты одного ответа execute между вызовами пропорционально числу их постов."""
+        weights = [
+            1 + (len(response.get("items") or response.get("id") or []) if isinstance(response, dict) else 0)
+            for response in responses
+        ]
+        shares = [size * weight // sum(weights) for weight in weights]
+        shares[0] += size - sum(shares)
+        return shares
+
+    @staticmethod
+    def _execute_code(calls: List[Dict], lean: bool = False) -> str:
+        """Собирает VKScript, возвращающий массив ответов wall.get.
+
+        В экономном режиме каждый ответ сворачивается в столбцы нужных полей
+        (items@.поле) и id закрепленного поста в pinned, а неудавшийся вызов остается false.
+        """
+        if not lean:
+            body = ",".join(f"API.wall.get({json.dumps(params, ensure_ascii=False)})" for params in calls)
+            return f"return [{body}];"
+
+        lines = []
+        for index, params in enumerate(calls):
+            columns = ",".join(f'"{field}":r{index}.items@.{field}' for field in LEAN_POST_FIELDS)
+            lines.append(f"var r{index}=API.wall.get({json.dumps(params, ensure_ascii=False)});var l{index}=false;")
+            lines.append(
+                f"if(r{index}){{var p{index}=0;"
+                f"if(r{index}.items.length>0&&r{index}.items[0].is_pinned){{p{index}=r{index}.items[0].id;}}"
+                f'l{index}={{"count":r{index}.count,{columns},"pinned":p{index}}};}}'
+            )
+        body = ",".join(f"l{index}" for index in range(len(calls)))
+        return "".join(lines) + f"return [{body}];"
+
+    @staticmethod
+    def _items(response: Dict) -> Optional[List[Dict]]:
+        """Возвращает посты ответа wall.get, разворачивая столбцы экономного режима.
+
+        Закрепленный пост помечается is_pinned по id из pinned. Если столбцы все же
+        разной длины (items@.поле пропускает посты без поля), посты не сопоставить
+        по позициям, и возвращается None.
+        """
+        if "items" in response or "id" not in response:
+            return response.get("items", [])
+        columns = [response.get(field) or [] for field in LEAN_POST_FIELDS]
+        if any(len(column) != len(columns[0]) for column in columns):
+            return None
+        items = [dict(zip(LEAN_POST_FIELDS, values)) for values in zip(*columns)]
+        pinned = response.get("pinned")
+        for item in items:
+            if pinned and item["id"] == pinned:
+                item["is_pinned"] = 1
+        return items
+
     async def parse(
         self,
         sources: List[Dict],
@@ -42,12 +230,36 @@ class VkParser:
         results: List[Dict] = []
         logger.info("Starting VK parsing for %d groups", len(sources))
 
+        if self._execute_batch_size > 1:
+            groups_news = await asyncio.gather(
+                *(self._parse_single_group(source, date_from=date_from, date_to=date_to) for source in sources)
+            )
+            for group_news in groups_news:
+                results.extend(group_news)
+            return results
+
         for source in sources:
             group_news = await self._parse_single_group(source, date_from=date_from, date_to=date_to)
             results.extend(group_news)
 
         return results
 
+    async def parse_source(
+        self,
+        source: Dict,
+        date_from: Optional[date] = None,
+        date_to: Optional[date] = None,
+        fetch_stats: Optional[Dict[str, int]] = None,
+    ) -> List[Dict]:
+        """Парсит одну группу; в отличие от parse, пробрасывает ошибки источника.
+
+        В fetch_stats, если он передан, добавляются pages и bytes — число
+        вызовов wall.get и размер их HTTP-ответов; ответ execute на несколько
+        групп делится между ними пропорционально числу постов.
+        """
+        self._ensure_client()
+        return await self._fetch_group(source, date_from=date_from, date_to=date_to, fetch_stats=fetch_stats)
+
     async def _parse_single_group(
         self,
         source: Dict,
@@ -55,80 +267,161 @@ class VkParser:
         date_to: Optional[date] = None,
     ) -> List[Dict]:
         """Парсит одну VK-группу."""
-        results: List[Dict] = []
-
         try:
-            group_id = self._extract_group_identifier(source["source_link"])
-            last_date = self._to_date(source.get("last_message_date"))
-            start_date = self._to_date(date_from)
-            end_date = self._to_date(date_to)
-            lower_bound = start_date if start_date is not None else last_date
-            inclusive_start = start_date is not None
-
-            params = {
-                "count": 50,
-                "offset": 0,
-                "filter": "owner",
-            }
-
-            if group_id.isdigit():
-                params["owner_id"] = -int(group_id)
-            else:
-                params["domain"] = group_id
+            return await self._fetch_group(source, date_from=date_from, date_to=date_to)
+        except Exception as exc:
+            logger.error("VK parsing error in group %s: %s", source.get("source_name"), exc)
+            return []
 
-            for _ in range(2):
-                response = self._vk.wall.get(**params)
-                items = response.get("items", [])
-                if not items:
-                    break
+    async def _fetch_group(
+        self,
+        source: Dict,
+        date_from: Optional[date] = None,
+        date_to: Optional[date] = None,
+        fetch_stats: Optional[Dict[str, int]] = None,
+    ) -> List[NewsItem]:
+        """Читает посты группы в заданном диапазоне, листая стену до нижней границы."""
+        results: List[NewsItem] = []
+        if fetch_stats is None:
+            fetch_stats = {}
+        fetch_stats.setdefault("pages", 0)
+        fetch_stats.setdefault("bytes", 0)
+        record = Source.of(source)
 
-                stop = False
-                for post in items:
-                    if post.get("is_pinned"):
-                        continue
+        group_id = self._extract_group_identifier(source["source_link"])
+        last_date = self._to_date(source.get("last_message_date"))
+        start_date = self._to_date(date_from)
+        end_date = self._to_date(date_to)
+        lower_bound = start_date if start_date is not None else last_date
+        # Курсор отсекает уже виденные посты по id, поэтому граничный день можно включать.
+        cursor = source.get("last_message_id") if start_date is None else None
+        inclusive_start = start_date is not None or cursor is not None
 
-                    post_dt = datetime.fromtimestamp(post["date"])
-                    post_date = post_dt.date()
+        params = {
+            "count": self._first_page_size(group_id, lower_bound),
+            "offset": 0,
+            "filter": "owner",
+        }
 
-                    if end_date and post_date > end_date:
-                        continue
+        if self._lean:
+            params["extended"] = 0
+        if group_id.isdigit():
+            params["owner_id"] = -int(group_id)
+        else:
+            params["domain"] = group_id
 
-                    if lower_bound is not None:
-                        if inclusive_start:
-                            if post_date < lower_bound:
-                                stop = True
-                                break
-                        else:
-                            if post_date <= lower_bound:
-                                stop = True
-                                break
-
-                    text = (post.get("text") or "").strip()
-                    if not text:
+        # Без нижней границы читается одна полная страница, иначе стена листается до границы.
+        if lower_bound is None and cursor is None:
+            params["count"] = MAX_PAGE_SIZE
+        seen_ids = set()
+        posts_seen = 0
+        oldest_date: Optional[date] = None
+        complete = False
+        while True:
+            response, size = await self._wall_get(params)
+            fetch_stats["pages"] += 1
+            fetch_stats["bytes"] += size
+            items = self._items(response)
+            if items is None:
+                logger.warning("VK group %s: execute returned columns of different length, reloading page", group_id)
+                response, size = await self._call_api(self._vk.wall.get, **params)
+                fetch_stats["pages"] += 1
+                fetch_stats["bytes"] += size
+                items = self._items(response)
+            if not items:
+                complete = True
+                break
+
+            stop = False
+            new_posts = 0
+            for post in items:
+                if post.get("is_pinned"):
+                    continue
+
+                # Новые посты, вышедшие между запросами, сдвигают offset: повторы пропускаются.
+                post_id = post.get("id")
+                if post_id is not None:
+                    if post_id in seen_ids:
                         continue
+                    seen_ids.add(post_id)
+                new_posts += 1
 
-                    clean_text = " ".join(text.split())
-                    results.append(
-                        {
-                            "source_name": source["source_name"],
-                            "source_link": source["source_link"],
-                            "contact": source.get("contact"),
-                            "date": post_dt.strftime("%Y-%m-%d"),
-                            "message": clean_text,
-                        }
-                    )
-
-                if stop:
+                if cursor is not None and post.get("id") is not None and post["id"] <= cursor:
+                    stop = True
                     break
-                params["offset"] += params["count"]
 
-        except Exception as exc:
-            logger.error("VK parsing error in group %s: %s", source.get("source_name"), exc)
+                post_date = datetime.fromtimestamp(post["date"]).date()
+                posts_seen += 1
+                oldest_date = post_date
 
+                if end_date and post_date > end_date:
+                    continue
+
+                if lower_bound is not None:
+                    if inclusive_start:
+                        if post_date < lower_bound:
+                            stop = True
+                            break
+                    else:
+                        if post_date <= lower_bound:
+                            stop = True
+                            break
+
+                text = (post.get("text") or "").strip()
+                if not text:
+                    continue
+
+                results.append(NewsItem(source=record, date=post_date, message=text, external_id=post.get("id")))
+
+            if stop or len(items) < params["count"]:
+                complete = True
+                break
+            if not new_posts:
+                # Страница из одних повторов: offset не двигает стену, дальше листать бесполезно.
+                logger.warning(
+                    "VK group %s: page at offset %s repeats seen posts, stop paging", group_id, params["offset"]
+                )
+                break
+            if lower_bound is None and cursor is None:
+                break
+            params["offset"] += params["count"]
+            params["count"] = MAX_PAGE_SIZE
+
+        if complete:
+            self._remember_rate(group_id, posts_seen, oldest_date or lower_bound)
+        logger.info(
+            "VK group %s: %s posts, pages=%s, bytes=%s",
+            group_id,
+            len(results),
+            fetch_stats["pages"],
+            fetch_stats["bytes"],
+        )
         return results
 
+    def _first_page_size(self, group_id: str, lower_bound: Optional[date]) -> int:
+        """Подбирает размер первой страницы по частоте постов группы и длине окна."""
+        rate = self._post_rates.get(group_id)
+        if rate is None or lower_bound is None:
+            return DEFAULT_FIRST_PAGE_SIZE
+        days = max(1, (date.today() - lower_bound).days + 1)
+        # Закрепленный пост занимает место на странице, поэтому к оценке прибавляется один.
+        expected = math.ceil(rate * days * PAGE_SIZE_MARGIN) + 1
+        return max(MIN_PAGE_SIZE, min(MAX_PAGE_SIZE, expected))
+
+    def _remember_rate(self, group_id: str, posts_seen: int, since: Optional[date]) -> None:
+        """Обновляет скользящую частоту постов группы в день по дочитанной до границы стене."""
+        days = max(1, (date.today() - since).days + 1) if since is not None else 1
+        rate = posts_seen / days
+        previous = self._post_rates.get(group_id)
+        if previous is not None:
+            rate = RATE_SMOOTHING * rate + (1 - RATE_SMOOTHING) * previous
+        self._post_rates[group_id] = rate
+
     async def disconnect(self) -> None:
-        """Вызывается при завершении работы."""
+        """Останавливает пул потоков VK API."""
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
         logger.info("VkParser disconnect called")
 
     @staticmethod
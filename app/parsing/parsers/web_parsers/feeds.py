@@ -0,0 +1,153 @@
+import html
+import re
+from datetime import date, datetime
+from email.utils import parsedate_to_datetime
+from html.parser import HTMLParser
+from typing import List, Optional, Tuple
+from urllib.parse import urlsplit
+from xml.etree import ElementTree
+
+FEED_TYPES = {"application/rss+xml", "application/atom+xml", "application/feed+xml", "application/xml", "text/xml"}
+NEWS_PATH_MARKERS = ("news", "novost", "event", "sobyt", "announce", "obyavl")
+MAX_ITEM_TEXT = 1000
+
+_TAG_RE = re.compile(r"<[^>]+>")
+
+
+class PageTitleParser(HTMLParser):
+    """Потоково находит <title> страницы; done становится True, как только искать дальше незачем."""
+
+    def __init__(self) -> None:
+        """Готовит пустой заголовок."""
+        super().__init__(convert_charrefs=True)
+        self.title: Optional[str] = None
+        self.done = False
+        self._in_title = False
+        self._parts: List[str] = []
+
+    def handle_starttag(self, tag, attrs) -> None:
+        """Начинает сбор заголовка; тело страницы без <title> завершает поиск."""
+        if tag == "title" and not self.done:
+            self._in_title = True
+        elif tag == "body":
+            self.done = True
+
+    def handle_endtag(self, tag) -> None:
+        """Закрывает заголовок."""
+        if tag == "title" and self._in_title:
+            self._in_title = False
+            self.done = True
+            self.title = _clean("".join(self._parts))[:MAX_ITEM_TEXT] or None
+
+    def handle_data(self, data) -> None:
+        """Копит текст заголовка."""
+        if self._in_title:
+            self._parts.append(data)
+
+
+def feed_link(tag: str, attrs) -> Optional[str]:
+    """Возвращает href тега <link rel="alternate">, если он ведет на RSS/Atom."""
+    if tag != "link":
+        return None
+    values = {name: (value or "") for name, value in attrs}
+    rel = values.get("rel", "").lower().split()
+    if "alternate" in rel and values.get("type", "").lower() in FEED_TYPES and values.get("href"):
+        return values["href"]
+    return None
+
+
+def sitemap_links_from_robots(robots_txt: str) -> List[str]:
+    """Возвращает ссылки из директив Sitemap файла robots.txt."""
+    links = []
+    for line in robots_txt.splitlines():
+        key, _, value = line.partition(":")
+        if key.strip().lower() == "sitemap" and value.strip():
+            links.append(value.strip())
+    return links
+
+
+def parse_feed(xml_text: str) -> List[Tuple[date, str]]:
+    """Извлекает пары (дата, текст) из RSS или Atom."""
+    root = ElementTree.fromstring(xml_text.encode("utf-8") if isinstance(xml_text, str) else xml_text)
+    items: List[Tuple[date, str]] = []
+
+    for element in root.iter():
+        if _local_name(element.tag) not in ("item", "entry"):
+            continue
+
+        fields = {_local_name(child.tag): child for child in element}
+        item_date = _parse_feed_date(
+            _text(fields.get("pubDate")) or _text(fields.get("published")) or _text(fields.get("updated"))
+        )
+        if item_date is None:
+            continue
+
+        title = _clean(_text(fields.get("title")))
+        body = _clean(_text(fields.get("description")) or _text(fields.get("summary")) or _text(fields.get("content")))
+        text = ". ".join(part for part in (title, body) if part)
+        if text:
+            items.append((item_date, text[:MAX_ITEM_TEXT]))
+
+    return items
+
+
+def parse_sitemap(xml_text: str) -> List[Tuple[date, str]]:
+    """Извлекает из sitemap новостные страницы с датой lastmod; вместо текста — адрес страницы."""
+    root = ElementTree.fromstring(xml_text.encode("utf-8") if isinstance(xml_text, str) else xml_text)
+    items: List[Tuple[date, str]] = []
+
+    for element in root:
+        if _local_name(element.tag) != "url":
+            continue
+
+        fields = {_local_name(child.tag): _text(child) for child in element}
+        loc = (fields.get("loc") or "").strip()
+        lastmod = _parse_iso_date(fields.get("lastmod"))
+        if not loc or lastmod is None:
+            continue
+        if any(marker in urlsplit(loc).path.lower() for marker in NEWS_PATH_MARKERS):
+            items.append((lastmod, loc))
+
+    return items
+
+
+def _local_name(tag) -> str:
+    """Отбрасывает XML-namespace у имени тега."""
+    return tag.rsplit("}", 1)[-1] if isinstance(tag, str) else ""
+
+
+def _text(element) -> str:
+    """Возвращает текст элемента или пустую строку."""
+    if element is None:
+        return ""
+    return "".join(element.itertext()).strip()
+
+
+def _clean(text: str) -> str:
+    """Убирает HTML-разметку и лишние пробелы."""
+    return " ".join(html.unescape(_TAG_RE.sub(" ", text or "")).split())
+
+
+def _parse_feed_date(value: str) -> Optional[date]:
+    """Разбирает дату RSS (RFC 822) или Atom (ISO 8601)."""
+    if not value:
+        return None
+    try:
+        return parsedate_to_datetime(value).date()
+    except (TypeError, ValueError, IndexError):
+        return _parse_iso_date(value)
+
+
+def _parse_iso_date(value: Optional[str]) -> Optional[date]:
+    """Разбирает дату или дату-время ISO 8601."""
+    if not value:
+        return None
+    text = value.strip()
+    try:
+        return datetime.fromisoformat(text).date()
+    except ValueError:
+        pass
+    try:
+        return date.fromisoformat(text[:10])
+    except ValueError:
+        return None
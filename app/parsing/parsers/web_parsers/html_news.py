@@ -0,0 +1,141 @@
+import re
+from datetime import date
+from html.parser import HTMLParser
+from typing import List, Optional, Tuple
+
+from parsing.parsers.web_parsers.feeds import feed_link
+
+MONTHS = {
+    "января": 1,
+    "февраля": 2,
+    "марта": 3,
+    "апреля": 4,
+    "мая": 5,
+    "июня": 6,
+    "июля": 7,
+    "августа": 8,
+    "сентября": 9,
+    "октября": 10,
+    "ноября": 11,
+    "декабря": 12,
+}
+
+DATE_PATTERNS = (
+    (re.compile(r"\b(\d{1,2})\.(\d{1,2})\.(\d{4})\b"), lambda m: (int(m[3]), int(m[2]), int(m[1]))),
+    (re.compile(r"\b(\d{4})-(\d{2})-(\d{2})\b"), lambda m: (int(m[1]), int(m[2]), int(m[3]))),
+    (
+        re.compile(r"\b(\d{1,2})\s+(" + "|".join(MONTHS) + r")\s+(\d{4})\b", re.IGNORECASE),
+        lambda m: (int(m[3]), MONTHS[m[2].lower()], int(m[1])),
+    ),
+)
+
+SKIPPED_TAGS = {"script", "style", "noscript", "template", "svg", "head"}
+MAX_ITEM_TEXT = 1000
+
+
+def find_date(text: str) -> Optional[Tuple[date, int, int]]:
+    """Ищет первую дату в тексте и возвращает ее вместе с границами совпадения."""
+    best: Optional[Tuple[date, int, int]] = None
+    for pattern, parts in DATE_PATTERNS:
+        match = pattern.search(text)
+        if match is None or (best is not None and match.start() >= best[1]):
+            continue
+        try:
+            best = (date(*parts(match)), match.start(), match.end())
+        except ValueError:
+            continue
+    return best
+
+
+class NewsHtmlParser(HTMLParser):
+    """Потоково делит текст страницы на новости: каждая начинается с найденной даты.
+
+    Страницу можно подавать кусками через feed(). Если задан min_date, разбор
+    останавливается на первой новости старше него и stopped становится True.
+    Попутно из <head> собираются ссылки на RSS/Atom (feed_links).
+    """
+
+    def __init__(self, min_date: Optional[date] = None) -> None:
+        """Готовит пустой список новостей."""
+        super().__init__(convert_charrefs=True)
+        self.items: List[Tuple[date, str]] = []
+        self.feed_links: List[str] = []
+        self.stopped = False
+        self._min_date = min_date
+        self._skip_depth = 0
+        self._pending: List[str] = []
+        self._current_date: Optional[date] = None
+        self._current_text: List[str] = []
+        self._current_len = 0
+
+    def handle_starttag(self, tag, attrs) -> None:
+        """Отслеживает вход в теги без полезного текста и запоминает ссылки на ленты."""
+        self._flush_text()
+        href = feed_link(tag, attrs)
+        if href:
+            self.feed_links.append(href)
+        if tag in SKIPPED_TAGS:
+            self._skip_depth += 1
+
+    def handle_endtag(self, tag) -> None:
+        """Отслеживает выход из тегов без полезного текста."""
+        self._flush_text()
+        if tag in SKIPPED_TAGS and self._skip_depth:
+            self._skip_depth -= 1
+
+    def handle_data(self, data) -> None:
+        """Копит текст до ближайшего тега: кусок страницы может оборваться посреди даты."""
+        if not self._skip_depth and not self.stopped:
+            self._pending.append(data)
+
+    def close(self) -> None:
+        """Дописывает последнюю новость."""
+        super().close()
+        self._flush_text()
+        self._finish_item()
+
+    def _flush_text(self) -> None:
+        """Начинает новую новость на дате и копит текст текущей."""
+        if not self._pending:
+            return
+
+        text = " ".join("".join(self._pending).split())
+        self._pending = []
+        while text and not self.stopped:
+            found = find_date(text)
+            if found is None:
+                self._append(text)
+                return
+
+            found_date, start, end = found
+            self._append(text[:start])
+            self._finish_item()
+            if self._min_date is not None and found_date < self._min_date:
+                self.stopped = True
+                return
+            self._current_date = found_date
+            text = text[end:].strip(" .,:|-—")
+
+    def _append(self, text: str) -> None:
+        """Добавляет кусок текста к текущей новости с ограничением длины."""
+        text = text.strip()
+        if not text or self._current_date is None or self._current_len >= MAX_ITEM_TEXT:
+            return
+        self._current_text.append(text)
+        self._current_len += len(text) + 1
+
+    def _finish_item(self) -> None:
+        """Закрывает текущую новость, если у нее есть текст."""
+        if self._current_date is not None and self._current_text:
+            self.items.append((self._current_date, " ".join(self._current_text)[:MAX_ITEM_TEXT]))
+        self._current_date = None
+        self._current_text = []
+        self._current_len = 0
+
+
+def extract_news(html: str, min_date: Optional[date] = None) -> List[Tuple[date, str]]:
+    """Извлекает пары (дата, текст) из HTML новостной страницы."""
+    parser = NewsHtmlParser(min_date=min_date)
+    parser.feed(html)
+    parser.close()
+    return parser.items
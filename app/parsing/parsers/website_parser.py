@@ -1 +1,383 @@
-"""Заглушка для веб-парсера кафедральных сайтов."""
+import asyncio
+import logging
+from datetime import date, timedelta
+from typing import Dict, List, Optional, Tuple
+from urllib.parse import urljoin, urlsplit
+
+import httpx
+
+from parsing.parsers.web_parsers.feeds import PageTitleParser, parse_feed, parse_sitemap, sitemap_links_from_robots
+from parsing.parsers.web_parsers.html_news import NewsHtmlParser
+from parsing.records import NewsItem, Source, to_date
+from parsing.state_file import JsonStateFile
+
+logger = logging.getLogger(__name__)
+
+USER_AGENT = "CAZ-parser/1.0 (+https://vk.com/ffkaya)"
+
+# Стратегии в порядке убывания дешевизны: лента, карта сайта, разбор HTML.
+XML_EXTRACTORS = {
+    "feed": parse_feed,
+    "sitemap": parse_sitemap,
+}
+# Сколько самых свежих страниц из карты сайта скачивать за заголовками за один разбор.
+MAX_SITEMAP_PAGES = 50
+
+
+class WebsiteParser:
+    """Парсит новостные страницы сайтов кафедр."""
+
+    def __init__(
+        self,
+        state_path: Optional[str] = None,
+        max_connections: int = 20,
+        max_connections_per_host: int = 2,
+        timeout: float = 20.0,
+        rediscover_after_days: int = 30,
+        strategy_store=None,
+    ):
+        """Сохраняет параметры HTTP-клиента, файла состояния и таблицы стратегий.
+
+        В файле состояния лежат валидаторы условных запросов и извлеченные новости,
+        в strategy_store (SourceStrategyStore) — выбранный способ загрузки каждого
+        сайта; без нее стратегии живут только в памяти процесса.
+        """
+        self._state = JsonStateFile(state_path) if state_path else None
+        self._strategy_store = strategy_store
+        self._strategies: Optional[Dict[str, Dict]] = None if strategy_store is not None else {}
+        self._strategies_lock = asyncio.Lock()
+        self._rediscover_after_days = rediscover_after_days
+        self._limits = httpx.Limits(max_connections=max_connections, max_keepalive_connections=max_connections)
+        self._timeout = timeout
+        self._max_connections_per_host = max(1, max_connections_per_host)
+        self._host_semaphores: Dict[str, asyncio.Semaphore] = {}
+        self._client: Optional[httpx.AsyncClient] = None
+
+    def _ensure_client(self) -> None:
+        """Создает общий HTTP-клиент с пулом keep-alive соединений."""
+        if self._client is not None and not self._client.is_closed:
+            return
+
+        self._client = httpx.AsyncClient(
+            limits=self._limits,
+            timeout=self._timeout,
+            follow_redirects=True,
+            headers={"User-Agent": USER_AGENT},
+        )
+        logger.info("WEB client initialized")
+
+    async def parse(
+        self,
+        sources: List[Dict],
+        date_from: Optional[date] = None,
+        date_to: Optional[date] = None,
+    ) -> List[Dict]:
+        """Парсит список сайтов."""
+        self._ensure_client()
+        results: List[Dict] = []
+        logger.info("Starting WEB parsing for %d sites", len(sources))
+
+        sites_news = await asyncio.gather(
+            *(self._parse_single_site(source, date_from=date_from, date_to=date_to) for source in sources)
+        )
+        for site_news in sites_news:
+            results.extend(site_news)
+
+        return results
+
+    async def parse_source(
+        self,
+        source: Dict,
+        date_from: Optional[date] = None,
+        date_to: Optional[date] = None,
+    ) -> List[Dict]:
+        """Парсит один сайт; в отличие от parse, пробрасывает ошибки источника."""
+        self._ensure_client()
+        return await self._fetch_site(source, date_from=date_from, date_to=date_to)
+
+    async def _parse_single_site(
+        self,
+        source: Dict,
+        date_from: Optional[date] = None,
+        date_to: Optional[date] = None,
+    ) -> List[Dict]:
+        """Парсит один сайт в заданном диапазоне."""
+        try:
+            return await self._fetch_site(source, date_from=date_from, date_to=date_to)
+        except Exception as exc:
+            logger.error("WEB parsing error for %s: %s", source.get("source_name"), exc)
+            return []
+
+    async def _fetch_site(
+        self,
+        source: Dict,
+        date_from: Optional[date] = None,
+        date_to: Optional[date] = None,
+    ) -> List[NewsItem]:
+        """Читает новости сайта в заданном диапазоне."""
+        results: List[NewsItem] = []
+
+        last_date = to_date(source.get("last_message_date"))
+        start_date = to_date(date_from)
+        end_date = to_date(date_to)
+        lower_bound = start_date if start_date is not None else last_date
+        inclusive_start = start_date is not None
+        min_date = None
+        if lower_bound is not None:
+            min_date = lower_bound if inclusive_start else lower_bound + timedelta(days=1)
+
+        items = await self._fetch_source_items(source["source_link"], min_date=min_date)
+        record = Source.of(source)
+        for item_date, text in sorted(items, key=lambda item: item[0], reverse=True):
+            if end_date and item_date > end_date:
+                continue
+
+            if lower_bound is not None:
+                if inclusive_start:
+                    if item_date < lower_bound:
+                        break
+                else:
+                    if item_date <= lower_bound:
+                        break
+
+            results.append(NewsItem(source=record, date=item_date, message=text))
+
+        return results
+
+    async def _fetch_source_items(self, link: str, min_date: Optional[date] = None) -> List[Tuple[date, str]]:
+        """Получает новости источника самым дешевым из известных способов."""
+        await self._load_strategies()
+        strategy = self._strategy(link)
+        if strategy is None:
+            strategy, items = await self._discover_strategy(link, min_date=min_date)
+            await self._remember_strategy(link, strategy)
+            return items
+
+        try:
+            return await self._fetch_items(strategy["url"], strategy["kind"], min_date=min_date)
+        except Exception as exc:
+            if strategy["kind"] == "html":
+                raise
+            logger.warning("WEB %s strategy failed for %s, falling back to HTML: %s", strategy["kind"], link, exc)
+            await self._forget_strategy(link)
+            return await self._fetch_items(link, "html", min_date=min_date)
+
+    async def _discover_strategy(
+        self, link: str, min_date: Optional[date] = None
+    ) -> Tuple[Dict, List[Tuple[date, str]]]:
+        """Ищет RSS/Atom, затем карту сайта; если их нет, остаются новости самой страницы.
+
+        Страница читается тем же потоковым запросом, что и HTML-стратегия: ссылки на
+        ленты собираются из <head>, новости — до min_date.
+        """
+        page_items, feed_links = await self._download(link, "html", min_date=min_date)
+
+        for feed_url in feed_links:
+            items = await self._try_fetch_items(feed_url, "feed")
+            if items:
+                return self._new_strategy("feed", feed_url), items
+
+        for sitemap_url in await self._sitemap_candidates(link):
+            items = await self._try_fetch_items(sitemap_url, "sitemap", min_date=min_date)
+            if items:
+                return self._new_strategy("sitemap", sitemap_url), items
+
+        return self._new_strategy("html", link), page_items
+
+    async def _sitemap_candidates(self, link: str) -> List[str]:
+        """Возвращает карты сайта из robots.txt и стандартный /sitemap.xml."""
+        candidates: List[str] = []
+        robots_url = urljoin(link, "/robots.txt")
+        try:
+            async with self._host_semaphore(robots_url):
+                response = await self._client.get(robots_url)
+            if response.status_code == 200:
+                candidates.extend(sitemap_links_from_robots(response.text))
+        except httpx.HTTPError as exc:
+            logger.info("WEB robots.txt unavailable for %s: %s", link, exc)
+
+        default_sitemap = urljoin(link, "/sitemap.xml")
+        if default_sitemap not in candidates:
+            candidates.append(default_sitemap)
+        return candidates
+
+    async def _try_fetch_items(self, url: str, kind: str, min_date: Optional[date] = None) -> List[Tuple[date, str]]:
+        """Пробует получить новости по ссылке, считая любую ошибку отсутствием стратегии."""
+        try:
+            return await self._fetch_items(url, kind, min_date=min_date)
+        except Exception as exc:
+            logger.info("WEB %s candidate rejected %s: %s", kind, url, exc)
+            return []
+
+    async def _fetch_items(self, url: str, kind: str, min_date: Optional[date] = None) -> List[Tuple[date, str]]:
+        """Скачивает ресурс условным GET и извлекает новости; при 304 берет их из состояния."""
+        items, _ = await self._download(url, kind, min_date=min_date)
+        return items
+
+    async def _download(
+        self, url: str, kind: str, min_date: Optional[date] = None
+    ) -> Tuple[List[Tuple[date, str]], List[str]]:
+        """Возвращает новости ресурса и объявленные в HTML ссылки на ленты.
+
+        HTML читается потоково: загрузка обрывается на первой новости старше min_date.
+        Страницы из карты сайта заменяются их заголовками.
+        """
+        entry = self._state.get(f"http:{url}") if self._state is not None else None
+        headers: Dict[str, str] = {}
+        if entry and entry.get("items") is not None and self._covers(entry.get("min_date"), min_date):
+            if entry.get("etag"):
+                headers["If-None-Match"] = entry["etag"]
+            if entry.get("last_modified"):
+                headers["If-Modified-Since"] = entry["last_modified"]
+
+        async with self._host_semaphore(url):
+            async with self._client.stream("GET", url, headers=headers) as response:
+                if response.status_code == 304 and headers:
+                    logger.info("WEB resource not modified: %s", url)
+                    items = [(date.fromisoformat(item_date), text) for item_date, text in entry["items"]]
+                    return items, entry.get("feed_links", [])
+
+                response.raise_for_status()
+                feed_links: List[str] = []
+                if kind == "html":
+                    parser = await self._stream_html(response, min_date)
+                    items, stopped = parser.items, parser.stopped
+                    feed_links = [urljoin(str(response.url), href) for href in parser.feed_links]
+                else:
+                    items, stopped = XML_EXTRACTORS[kind](await response.aread()), False
+
+        cut = min_date if stopped else None
+        if kind == "sitemap":
+            items, cut = await self._sitemap_titles(items, min_date)
+        self._store_page(url, response, items, min_date=cut, feed_links=feed_links)
+        return items, feed_links
+
+    async def _sitemap_titles(
+        self, pages: List[Tuple[date, str]], min_date: Optional[date]
+    ) -> Tuple[List[Tuple[date, str]], Optional[date]]:
+        """Заменяет адреса страниц из карты сайта их заголовками; страницы без заголовка отбрасываются.
+
+        Скачиваются только страницы не старше min_date, и не больше MAX_SITEMAP_PAGES
+        самых свежих. Возвращает новости и дату, начиная с которой список полон.
+        """
+        fresh = sorted(
+            (page for page in pages if min_date is None or page[0] >= min_date), key=lambda page: page[0], reverse=True
+        )
+        cut = min_date
+        if len(fresh) > MAX_SITEMAP_PAGES:
+            cut = fresh[MAX_SITEMAP_PAGES - 1][0] + timedelta(days=1)
+            fresh = [page for page in fresh if page[0] >= cut]
+            logger.warning("WEB sitemap has more than %s news pages, reading only since %s", MAX_SITEMAP_PAGES, cut)
+
+        titles = await asyncio.gather(*(self._page_title(url) for _, url in fresh))
+        return [(page_date, title) for (page_date, _), title in zip(fresh, titles) if title], cut
+
+    async def _page_title(self, url: str) -> Optional[str]:
+        """Читает страницу потоком до </title> и возвращает заголовок; при ошибке — None."""
+        parser = PageTitleParser()
+        try:
+            async with self._host_semaphore(url):
+                async with self._client.stream("GET", url) as response:
+                    response.raise_for_status()
+                    async for chunk in response.aiter_text():
+                        parser.feed(chunk)
+                        if parser.done:
+                            break
+        except httpx.HTTPError as exc:
+            logger.info("WEB page title unavailable for %s: %s", url, exc)
+            return None
+        return parser.title
+
+    @staticmethod
+    async def _stream_html(response: httpx.Response, min_date: Optional[date]) -> NewsHtmlParser:
+        """Разбирает HTML по мере загрузки и прекращает чтение после новостей старше min_date."""
+        parser = NewsHtmlParser(min_date=min_date)
+        async for chunk in response.aiter_text():
+            parser.feed(chunk)
+            if parser.stopped:
+                logger.info("WEB stopped reading %s after news older than %s", response.url, min_date)
+                break
+        parser.close()
+        return parser
+
+    @staticmethod
+    def _covers(stored_min_date: Optional[str], min_date: Optional[date]) -> bool:
+        """Проверяет, что сохраненные новости не обрезаны позже нужной нижней границы."""
+        if stored_min_date is None:
+            return True
+        return min_date is not None and date.fromisoformat(stored_min_date) <= min_date
+
+    def _store_page(
+        self,
+        url: str,
+        response: httpx.Response,
+        items: List[Tuple[date, str]],
+        min_date: Optional[date] = None,
+        feed_links: Optional[List[str]] = None,
+    ) -> None:
+        """Сохраняет валидаторы кэша и извлеченные новости; min_date отмечает обрезанный список."""
+        if self._state is None:
+            return
+
+        self._state.set(
+            f"http:{url}",
+            {
+                "etag": response.headers.get("ETag"),
+                "last_modified": response.headers.get("Last-Modified"),
+                "items": [[item_date.isoformat(), text] for item_date, text in items],
+                "min_date": min_date.isoformat() if min_date is not None else None,
+                "feed_links": feed_links or [],
+            },
+        )
+
+    async def _load_strategies(self) -> None:
+        """Один раз читает таблицу стратегий в память."""
+        async with self._strategies_lock:
+            if self._strategies is None:
+                self._strategies = await asyncio.to_thread(self._strategy_store.load)
+                logger.info("WEB strategies loaded: %s", len(self._strategies))
+
+    def _strategy(self, link: str) -> Optional[Dict]:
+        """Возвращает сохраненную стратегию источника, если она не устарела."""
+        strategy = (self._strategies or {}).get(link)
+        if strategy is None:
+            return None
+
+        age = date.today() - date.fromisoformat(strategy["discovered_at"])
+        if strategy["kind"] == "html" and age.days >= self._rediscover_after_days:
+            return None
+        return strategy
+
+    async def _remember_strategy(self, link: str, strategy: Dict) -> None:
+        """Запоминает стратегию источника в памяти и в таблице стратегий."""
+        logger.info("WEB strategy for %s: %s %s", link, strategy["kind"], strategy["url"])
+        self._strategies[link] = strategy
+        if self._strategy_store is not None:
+            await asyncio.to_thread(self._strategy_store.save, link, strategy)
+
+    async def _forget_strategy(self, link: str) -> None:
+        """Сбрасывает стратегию, чтобы в следующий раз найти ее заново."""
+        self._strategies.pop(link, None)
+        if self._strategy_store is not None:
+            await asyncio.to_thread(self._strategy_store.delete, link)
+
+    @staticmethod
+    def _new_strategy(kind: str, url: str) -> Dict:
+        """Создает запись стратегии источника."""
+        return {"kind": kind, "url": url, "discovered_at": date.today().isoformat()}
+
+    def _host_semaphore(self, url: str) -> asyncio.Semaphore:
+        """Возвращает семафор, ограничивающий число соединений к одному хосту."""
+        host = urlsplit(url).netloc.lower()
+        semaphore = self._host_semaphores.get(host)
+        if semaphore is None:
+            semaphore = asyncio.Semaphore(self._max_connections_per_host)
+            self._host_semaphores[host] = semaphore
+        return semaphore
+
+    async def disconnect(self) -> None:
+        """Закрывает HTTP-клиент."""
+        if self._client is not None:
+            await self._client.aclose()
+            self._client = None
+            logger.info("WEB client closed")
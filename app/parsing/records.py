@@ -0,0 +1,91 @@
+import sys
+from collections.abc import Mapping
+from dataclasses import dataclass
+from datetime import date, datetime
+from typing import Any, Dict, Iterator, Optional, Tuple
+
+SOURCE_KEYS = ("source_name", "source_link", "contact")
+NEWS_ITEM_KEYS = SOURCE_KEYS + ("date", "message", "external_id", "links")
+
+_sources: Dict[Tuple, "Source"] = {}
+
+
+@dataclass(frozen=True, slots=True)
+class Source:
+    """Неизменяемые данные источника, общие для всех его новостей."""
+
+    source_name: Optional[str]
+    source_link: Optional[str]
+    contact: Optional[str]
+
+    @classmethod
+    def of(cls, source: Mapping) -> "Source":
+        """Возвращает единственный экземпляр для набора полей источника."""
+        key = tuple(source.get(field) for field in SOURCE_KEYS)
+        record = _sources.get(key)
+        if record is None:
+            record = cls(*(sys.intern(value) if isinstance(value, str) else value for value in key))
+            _sources[key] = record
+        return record
+
+
+@dataclass(frozen=True, slots=True)
+class NewsItem(Mapping):
+    """Неизменяемая новость со ссылкой на общий Source.
+
+    Поддерживает чтение как словарь (item["date"], item.get("source_link"),
+    dict(item)), чтобы прежний код, работающий со словарями сообщений, не менялся.
+    """
+
+    source: Source
+    date: date
+    message: str
+    external_id: Optional[int] = None
+    # Ссылки всех копий новости после склейки дубликатов; пусто, если копий не было.
+    links: Tuple[str, ...] = ()
+
+    @property
+    def source_name(self) -> Optional[str]:
+        return self.source.source_name
+
+    @property
+    def source_link(self) -> Optional[str]:
+        return self.source.source_link
+
+    @property
+    def contact(self) -> Optional[str]:
+        return self.source.contact
+
+    def __getitem__(self, key: str) -> Any:
+        if key in NEWS_ITEM_KEYS:
+            return getattr(self, key)
+        raise KeyError(key)
+
+    def get(self, key: str, default: Any = None) -> Any:
+        if key in NEWS_ITEM_KEYS:
+            return getattr(self, key)
+        return default
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(NEWS_ITEM_KEYS)
+
+    def __len__(self) -> int:
+        return len(NEWS_ITEM_KEYS)
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Возвращает новость обычным словарем."""
+        return {key: getattr(self, key) for key in NEWS_ITEM_KEYS}
+
+
+def to_date(value) -> Optional[date]:
+    """Преобразует дату сообщения или источника к объекту date."""
+    if isinstance(value, datetime):
+        return value.date()
+    if isinstance(value, date):
+        return value
+    if isinstance(value, str):
+        try:
+            return datetime.strptime(value, "%Y-%m-%d").date()
+        except ValueError:
+            return None
+    return None
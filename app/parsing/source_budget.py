@@ -0,0 +1,34 @@
+import asyncio
+from contextlib import asynccontextmanager
+from contextvars import ContextVar
+from typing import AsyncIterator, Optional
+
+_deadline: ContextVar[Optional[asyncio.Timeout]] = ContextVar("source_deadline", default=None)
+
+
+@asynccontextmanager
+async def source_budget(seconds: Optional[float]) -> AsyncIterator[None]:
+    """Ограничивает разбор одного источника по времени; None снимает ограничение.
+
+    По истечении срока тело прерывается с asyncio.TimeoutError.
+    """
+    if seconds is None:
+        yield
+        return
+    async with asyncio.timeout(seconds) as scope:
+        token = _deadline.set(scope)
+        try:
+            yield
+        finally:
+            _deadline.reset(token)
+
+
+async def pause(delay: float) -> None:
+    """Спит delay секунд, не расходуя бюджет текущего источника.
+
+    Для вынужденных ожиданий вроде FloodWait: срок источника сдвигается на время паузы.
+    """
+    scope = _deadline.get()
+    if scope is not None and scope.when() is not None:
+        scope.reschedule(scope.when() + delay)
+    await asyncio.sleep(delay)
@@ -0,0 +1,50 @@
+import json
+import logging
+import os
+from pathlib import Path
+from typing import Any, Dict, Optional
+
+logger = logging.getLogger(__name__)
+
+
+class JsonStateFile:
+    """Хранит служебное состояние парсеров в JSON-файле между запусками."""
+
+    def __init__(self, path: str) -> None:
+        """Запоминает путь к файлу состояния."""
+        self._path = Path(path)
+        self._entries: Optional[Dict[str, Any]] = None
+
+    def get(self, key: str, default: Any = None) -> Any:
+        """Возвращает запись по ключу."""
+        return self._load().get(key, default)
+
+    def set(self, key: str, value: Any) -> None:
+        """Сохраняет запись и сразу сбрасывает файл на диск."""
+        self._load()[key] = value
+        self._save()
+
+    def delete(self, key: str) -> bool:
+        """Удаляет запись; возвращает True, если она была."""
+        if self._load().pop(key, None) is None:
+            return False
+        self._save()
+        return True
+
+    def _load(self) -> Dict[str, Any]:
+        """Лениво читает файл состояния."""
+        if self._entries is None:
+            try:
+                self._entries = json.loads(self._path.read_text(encoding="utf-8"))
+            except FileNotFoundError:
+                self._entries = {}
+            except (OSError, ValueError) as exc:
+                logger.warning("State file %s is unreadable, starting empty: %s", self._path, exc)
+                self._entries = {}
+        return self._entries
+
+    def _save(self) -> None:
+        """Атомарно перезаписывает файл состояния."""
+        tmp_path = self._path.with_name(self._path.name + ".tmp")
+        tmp_path.write_text(json.dumps(self._entries, ensure_ascii=False, indent=2), encoding="utf-8")
+        os.replace(tmp_path, self._path)
@@ -1,6 +1,11 @@
+import heapq
 import logging
 from datetime import datetime
-from typing import Dict, List
+from typing import Callable, Dict, List, Mapping, Optional, Tuple
+
+from parsing.dedup import NewsDeduplicator, with_links
+from parsing.normalize import clean_text
+from parsing.records import to_date
 
 logger = logging.getLogger(__name__)
 
@@ -13,13 +18,10 @@ class TextComposer:
         self._message_len = message_len
         self._max_message_size = max_message_size
 
-    def compose(self, messages: List[Dict]) -> List[str]:
+    def compose(self, messages: List[Mapping]) -> List[str]:
         """Формирует массив сообщений для отправки в Telegram."""
         try:
-            today = datetime.now().strftime("%d.%m.%Y")
-            header = f"🎓 СВОДКА НОВОСТЕЙ КАФЕДР ({today})\n\n"
-
-            parts: List[str] = [header]
+            parts: List[str] = [self._header()]
             if not messages:
                 parts.append("Сообщений нет.\n\n")
                 parts.append(self._format_statistics([]))
@@ -29,8 +31,7 @@ class TextComposer:
 
             sorted_messages = self._sort_by_date(messages)
             for message in sorted_messages:
-                parts.append(self._format_message(message))
-                parts.append("\n")
+                parts.append(self._format_message(message) + "\n")
             parts.append(self._format_statistics(sorted_messages))
 
             result = self._pack_parts(parts)
@@ -41,85 +42,225 @@ class TextComposer:
             logger.error("Ошибка при составлении сообщения: %s", exc)
             return ["Ошибка при составлении сообщения"]
 
-    def _sort_by_date(self, messages: List[Dict]) -> List[Dict]:
+    def stream(self, window: Optional[int] = 50, deduplicate: bool = False) -> "DigestStream":
+        """Создает потоковую сборку: готовые части отдаются, пока источники еще разбираются.
+
+        window — сколько сообщений держать в буфере для сортировки по дате; None буферизует все.
+        deduplicate — склеивать почти одинаковые новости; копия, пришедшая после отправки
+        канонической новости, просто отбрасывается.
+        """
+        return DigestStream(self, window, deduplicate)
+
+    def _header(self) -> str:
+        """Возвращает заголовок дайджеста с сегодняшней датой."""
+        today = datetime.now().strftime("%d.%m.%Y")
+        return f"🎓 СВОДКА НОВОСТЕЙ КАФЕДР ({today})\n\n"
+
+    def _sort_by_date(self, messages: List[Mapping]) -> List[Mapping]:
         """Сортирует новости по убыванию даты."""
-        try:
-            sorted_list = sorted(
-                messages,
-                key=lambda item: datetime.strptime(item["date"], "%Y-%m-%d"),
-                reverse=True,
-            )
-            logger.info("Сообщения отсортированы по дате")
-            return sorted_list
-        except Exception as exc:
-            logger.error("Ошибка при сортировке: %s", exc)
+        keys = [to_date(item.get("date")) for item in messages]
+        if None in keys:
+            logger.error("Ошибка при сортировке: у части сообщений нет корректной даты")
             return messages
 
-    def _format_message(self, message: Dict) -> str:
+        order = sorted(range(len(messages)), key=keys.__getitem__, reverse=True)
+        logger.info("Сообщения отсортированы по дате")
+        return [messages[index] for index in order]
+
+    def _format_message(self, message: Mapping) -> str:
         """Форматирует одну новость в блок."""
-        try:
-            message_date = datetime.strptime(message["date"], "%Y-%m-%d").strftime("%d.%m.%Y")
-        except (ValueError, KeyError, TypeError):
-            message_date = message.get("date", "неизвестно")
+        parsed_date = to_date(message.get("date"))
+        if parsed_date is not None:
+            rendered_date = parsed_date.strftime("%d.%m.%Y")
+        else:
+            rendered_date = message.get("date", "неизвестно")
 
-        raw = (message.get("message") or "").strip()
-        raw = raw.replace("*", "")
-        raw = " ".join(raw.split())
+        # Оркестратор уже чистит тексты, но строки из хранилища и чужие вызовы compose могут прийти сырыми;
+        # на чистом тексте clean_text сводится к одному split/join.
+        raw = clean_text(message.get("message"))
         preview = raw[: self._message_len] if raw else "[нет текста]"
 
+        links = message.get("links")
+        if links and len(links) > 1:
+            source_line = f"🔗 Источники: {', '.join(links)}\n"
+        else:
+            source_line = f"🔗 Источник: {message.get('source_link', '—')}\n"
+
         formatted = (
             f"━━━━━━━━━━━━━\n📚 {message.get('source_name', '—')}\n"
-            f"🔗 Источник: {message.get('source_link', '—')}\n"
+            f"{source_line}"
             f"👤 Контакт: {message.get('contact', '—')}\n"
-            f"📅 Дата: {message_date}\n"
+            f"📅 Дата: {rendered_date}\n"
             f"📝 Новость: {preview}\n━━━━━━━━━━━━━\n"
         )
         return formatted
 
-    def _format_statistics(self, messages: List[Dict]) -> str:
+    def _format_statistics(self, messages: List[Mapping]) -> str:
         """Возвращает статистику по количеству новостей."""
-        total = len(messages)
+        return self._format_total(len(messages))
+
+    def _format_total(self, total: int) -> str:
+        """Возвращает строку статистики по числу новостей."""
         return f"━━━━━━━━━━━━━\n✅ Всего новостей: {total}\n"
 
     def _pack_parts(self, parts: List[str]) -> List[str]:
         """Укладывает текстовые части в сообщения до лимита."""
+        packer = _ChunkPacker(self._max_message_size, self._split_long_piece)
         chunks: List[str] = []
-        current = ""
-
         for part in parts:
-            for piece in self._split_long_piece(part):
-                if not current:
-                    current = piece
-                    continue
-
-                if len(current) + len(piece) <= self._max_message_size:
-                    current += piece
-                else:
-                    chunks.append(current.rstrip())
-                    current = piece
-
-        if current:
-            chunks.append(current.rstrip())
-
-        return [chunk for chunk in chunks if chunk] or [""]
+            chunks.extend(packer.add(part))
+        chunks.extend(packer.finish())
+        return chunks or [""]
 
     def _split_long_piece(self, piece: str) -> List[str]:
-        """Делит длинный кусок по лимиту."""
-        if len(piece) <= self._max_message_size:
+        """Делит кусок длиннее лимита, по возможности по переводам строк."""
+        if utf16_len(piece) <= self._max_message_size:
             return [piece]
 
         parts: List[str] = []
-        left = piece
-        while left:
-            if len(left) <= self._max_message_size:
-                parts.append(left)
+        start = 0
+        while start < len(piece):
+            end = min(len(piece), start + self._max_message_size)
+            if utf16_len(piece[start:end]) > self._max_message_size:
+                # Суррогатные пары занимают по две единицы: ищем самую длинную подходящую границу.
+                low, high = start, end
+                while high - low > 1:
+                    middle = (low + high) // 2
+                    if utf16_len(piece[start:middle]) <= self._max_message_size:
+                        low = middle
+                    else:
+                        high = middle
+                end = low
+
+            if end >= len(piece):
+                parts.append(piece[start:])
                 break
 
-            split_at = left.rfind("\n", 0, self._max_message_size + 1)
-            if split_at <= 0:
-                split_at = self._max_message_size
+            split_at = piece.rfind("\n", start, end + 1)
+            if split_at <= start:
+                split_at = end
 
-            parts.append(left[:split_at])
-            left = left[split_at:].lstrip("\n")
+            parts.append(piece[start:split_at])
+            start = split_at
+            while start < len(piece) and piece[start] == "\n":
+                start += 1
 
         return [part for part in parts if part]
+
+
+def utf16_len(text: str) -> int:
+    """Возвращает длину текста в кодовых единицах UTF-16, как ее считает Telegram."""
+    return len(text.encode("utf-16-le")) // 2
+
+
+class _ChunkPacker:
+    """Копит текстовые части и отдает сообщение, как только следующая часть в него не влезает.
+
+    Части не разрываются: блок новости целиком попадает в одно сообщение, если сам
+    не длиннее лимита. Размер считается в UTF-16, сообщение склеивается один раз.
+    """
+
+    def __init__(self, max_size: int, split: Callable[[str], List[str]]) -> None:
+        """Сохраняет лимит сообщения и функцию деления длинных кусков."""
+        self._max_size = max_size
+        self._split = split
+        self._pieces: List[str] = []
+        self._size = 0
+
+    def add(self, part: str) -> List[str]:
+        """Добавляет часть и возвращает заполненные сообщения."""
+        size = utf16_len(part)
+        if size <= self._max_size:
+            return self._append(part, size)
+
+        chunks: List[str] = []
+        for piece in self._split(part):
+            chunks.extend(self._append(piece, utf16_len(piece)))
+        return chunks
+
+    def _append(self, piece: str, size: int) -> List[str]:
+        """Кладет кусок в текущее сообщение или начинает новое, если он не влезает."""
+        chunks = self.finish() if self._pieces and self._size + size > self._max_size else []
+        self._pieces.append(piece)
+        self._size += size
+        return chunks
+
+    def finish(self) -> List[str]:
+        """Отдает последнее неполное сообщение."""
+        current = "".join(self._pieces).rstrip()
+        self._pieces, self._size = [], 0
+        return [current] if current else []
+
+
+class DigestStream:
+    """Потоково собирает дайджест: сообщения сортируются по дате в пределах окна буфера."""
+
+    def __init__(self, composer: TextComposer, window: Optional[int] = 50, deduplicate: bool = False) -> None:
+        """Начинает дайджест с заголовка; deduplicate склеивает почти одинаковые новости."""
+        self._composer = composer
+        self._window = window
+        self._buffer: List[Tuple[int, int, Mapping]] = []
+        self._seq = 0
+        self._total = 0
+        self._dedup = NewsDeduplicator() if deduplicate else None
+        self._buffered_links: Dict[int, List[str]] = {}
+        self._canonical_by_seq: Dict[int, int] = {}
+        self.duplicates = 0
+        self._packer = _ChunkPacker(composer._max_message_size, composer._split_long_piece)
+        self._pending = self._packer.add(composer._header())
+
+    def add(self, messages: List[Mapping]) -> List[str]:
+        """Добавляет сообщения и возвращает части, которые уже можно отправлять."""
+        chunks, self._pending = self._pending, []
+        for message in messages:
+            if self._dedup is not None and not self._register(message):
+                continue
+            heapq.heappush(self._buffer, (-self._ordinal(message), self._seq, message))
+            self._seq += 1
+            if self._window is not None and len(self._buffer) > self._window:
+                chunks.extend(self._emit(*heapq.heappop(self._buffer)[1:]))
+        return chunks
+
+    def _register(self, message: Mapping) -> bool:
+        """Учитывает новость в индексе дубликатов; False, если это копия уже добавленной.
+
+        Ссылка копии дописывается к канонической новости, пока та еще в буфере.
+        """
+        canonical, is_new = self._dedup.add(message)
+        link = message.get("source_link")
+        if is_new:
+            self._buffered_links[canonical] = [link]
+            self._canonical_by_seq[self._seq] = canonical
+            return True
+
+        self.duplicates += 1
+        links = self._buffered_links.get(canonical)
+        if links is not None and link not in links:
+            links.append(link)
+        return False
+
+    def finish(self) -> List[str]:
+        """Выгружает буфер, дописывает статистику и возвращает оставшиеся части."""
+        chunks, self._pending = self._pending, []
+        while self._buffer:
+            chunks.extend(self._emit(*heapq.heappop(self._buffer)[1:]))
+        if not self._total:
+            chunks.extend(self._packer.add("Сообщений нет.\n\n"))
+        chunks.extend(self._packer.add(self._composer._format_total(self._total)))
+        chunks.extend(self._packer.finish())
+        logger.info("Потоковый дайджест составлен: сообщений %s", self._total)
+        return chunks
+
+    def _emit(self, seq: int, message: Mapping) -> List[str]:
+        """Форматирует сообщение и укладывает его в текущую часть."""
+        self._total += 1
+        canonical = self._canonical_by_seq.pop(seq, None)
+        if canonical is not None:
+            message = with_links(message, self._buffered_links.pop(canonical))
+        return self._packer.add(self._composer._format_message(message) + "\n")
+
+    @staticmethod
+    def _ordinal(message: Mapping) -> int:
+        """Возвращает порядковый номер даты сообщения; без даты сообщение уходит в конец."""
+        parsed_date = to_date(message.get("date"))
+        return parsed_date.toordinal() if parsed_date is not None else 0
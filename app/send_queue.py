@@ -0,0 +1,151 @@
+import asyncio
+import datetime as dt
+import logging
+import time
+from collections import deque
+from typing import Any, Awaitable, Callable, Deque, Dict, List, Tuple
+
+from telegram.error import RetryAfter
+
+logger = logging.getLogger(__name__)
+
+# Лимиты Telegram Bot API: около 30 сообщений в секунду на бота,
+# около 1 в секунду в личный чат и 20 в минуту в группу.
+GLOBAL_RATE = 25.0
+CHAT_RATE = 1.0
+GROUP_RATE = 20 / 60
+CHAT_BURST = 3
+MAX_RETRIES = 5
+
+
+class TokenBucket:
+    """Ограничивает частоту событий: rate токенов в секунду, не больше capacity подряд."""
+
+    def __init__(self, rate: float, capacity: float = 1.0) -> None:
+        """Создает полное ведро."""
+        self._rate = rate
+        self._capacity = capacity
+        self._tokens = capacity
+        self._updated = time.monotonic()
+        self._paused_until = 0.0
+        self._lock = asyncio.Lock()
+
+    async def acquire(self) -> None:
+        """Ждет свободный токен и забирает его."""
+        async with self._lock:
+            while True:
+                now = time.monotonic()
+                if now < self._paused_until:
+                    await asyncio.sleep(self._paused_until - now)
+                    continue
+
+                self._tokens = min(self._capacity, self._tokens + (now - self._updated) * self._rate)
+                self._updated = now
+                if self._tokens >= 1:
+                    self._tokens -= 1
+                    return
+                await asyncio.sleep((1 - self._tokens) / self._rate)
+
+    def pause(self, delay: float) -> None:
+        """Не выдает токены delay секунд и обнуляет накопленный запас."""
+        self._paused_until = max(self._paused_until, time.monotonic() + delay)
+        self._tokens = 0.0
+        self._updated = time.monotonic()
+
+
+class SendQueue:
+    """Общая очередь исходящих сообщений бота.
+
+    Сообщения одного чата уходят строго по порядку, разные чаты отправляются
+    параллельно. Частота ограничена ведрами токенов на чат и на бота; на
+    RetryAfter очередь ждет указанное Telegram время и повторяет отправку.
+    """
+
+    def __init__(
+        self,
+        global_rate: float = GLOBAL_RATE,
+        chat_rate: float = CHAT_RATE,
+        group_rate: float = GROUP_RATE,
+        chat_burst: int = CHAT_BURST,
+        max_retries: int = MAX_RETRIES,
+    ) -> None:
+        """Сохраняет лимиты отправки."""
+        self._global = TokenBucket(global_rate, capacity=global_rate)
+        self._chat_rate = chat_rate
+        self._group_rate = group_rate
+        self._chat_burst = chat_burst
+        self._max_retries = max_retries
+        self._chat_buckets: Dict[int, TokenBucket] = {}
+        self._queues: Dict[int, Deque[Tuple[Callable[..., Awaitable], tuple, dict, asyncio.Future]]] = {}
+        self._workers: Dict[int, asyncio.Task] = {}
+
+    def submit(self, chat_id: int, send: Callable[..., Awaitable], /, *args, **kwargs) -> asyncio.Future:
+        """Ставит отправку в очередь чата и сразу возвращает future с ее результатом."""
+        future = asyncio.get_running_loop().create_future()
+        self._queues.setdefault(chat_id, deque()).append((send, args, kwargs, future))
+        if chat_id not in self._workers:
+            self._workers[chat_id] = asyncio.ensure_future(self._drain(chat_id))
+        return future
+
+    async def send(self, chat_id: int, send: Callable[..., Awaitable], /, *args, **kwargs) -> Any:
+        """Отправляет через очередь и ждет результата."""
+        return await self.submit(chat_id, send, *args, **kwargs)
+
+    async def send_many(self, chat_id: int, send: Callable[..., Awaitable], texts: List[str], /, **kwargs) -> List[Any]:
+        """Ставит в очередь чата несколько текстов подряд и ждет, пока уйдут все."""
+        futures = [self.submit(chat_id, send, text=text, **kwargs) for text in texts]
+        return list(await asyncio.gather(*futures))
+
+    async def _drain(self, chat_id: int) -> None:
+        """Отправляет сообщения чата по порядку, пока очередь не опустеет."""
+        queue = self._queues[chat_id]
+        while queue:
+            send, args, kwargs, future = queue.popleft()
+            if future.done():
+                continue
+            try:
+                result = await self._deliver(chat_id, send, args, kwargs)
+            except Exception as exc:
+                if not future.done():
+                    future.set_exception(exc)
+            else:
+                if not future.done():
+                    future.set_result(result)
+
+        del self._queues[chat_id]
+        del self._workers[chat_id]
+
+    async def _deliver(self, chat_id: int, send: Callable[..., Awaitable], args: tuple, kwargs: dict) -> Any:
+        """Отправляет одно сообщение в пределах лимитов, повторяя его после RetryAfter."""
+        bucket = self._chat_bucket(chat_id)
+        attempt = 0
+        while True:
+            await bucket.acquire()
+            await self._global.acquire()
+            try:
+                return await send(*args, **kwargs)
+            except RetryAfter as exc:
+                attempt += 1
+                if attempt > self._max_retries:
+                    raise
+                delay = self._retry_delay(exc)
+                logger.warning("Telegram flood limit for chat %s: retry %s in %.1fs", chat_id, attempt, delay)
+                self._global.pause(delay)
+                bucket.pause(delay)
+
+    def _chat_bucket(self, chat_id: int) -> TokenBucket:
+        """Возвращает ведро чата; группы (отрицательный id) ограничены строже."""
+        bucket = self._chat_buckets.get(chat_id)
+        if bucket is None:
+            rate = self._group_rate if chat_id < 0 else self._chat_rate
+            bucket = TokenBucket(rate, capacity=self._chat_burst)
+            self._chat_buckets[chat_id] = bucket
+        return bucket
+
+    @staticmethod
+    def _retry_delay(exc: RetryAfter) -> float:
+        """Возвращает паузу из RetryAfter в секундах."""
+        value = exc.retry_after
+        if isinstance(value, dt.timedelta):
+            return value.total_seconds()
+        return float(value)
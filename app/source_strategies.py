@@ -0,0 +1,59 @@
+import datetime as dt
+import logging
+from typing import Dict
+
+from sqlalchemy import delete, select
+from sqlalchemy.orm import sessionmaker
+
+from database import UPSERT_INSERTS
+from models.department import SourceStrategy
+
+logger = logging.getLogger(__name__)
+
+
+class SourceStrategyStore:
+    """Таблица стратегий сайтов: какой способ загрузки (лента, карта сайта, HTML) выбран для источника."""
+
+    def __init__(self, engine) -> None:
+        """Создает фабрику сессий поверх общего engine."""
+        self.engine = engine
+        self.Session = sessionmaker(bind=engine)
+        self._insert = UPSERT_INSERTS[engine.dialect.name]
+
+    def load(self) -> Dict[str, Dict]:
+        """Возвращает стратегии всех источников по ссылке."""
+        with self.Session() as session:
+            return {
+                row.source_link: {"kind": row.kind, "url": row.url, "discovered_at": row.discovered_at.isoformat()}
+                for row in session.scalars(select(SourceStrategy))
+            }
+
+    def save(self, source_link: str, strategy: Dict) -> None:
+        """Добавляет или заменяет стратегию источника."""
+        values = {
+            "source_link": source_link,
+            "kind": strategy["kind"],
+            "url": strategy["url"],
+            "discovered_at": dt.date.fromisoformat(strategy["discovered_at"]),
+        }
+        with self.Session() as session:
+            stmt = self._insert(SourceStrategy).values(values)
+            stmt = stmt.on_conflict_do_update(
+                index_elements=[SourceStrategy.source_link],
+                set_={
+                    "kind": stmt.excluded.kind,
+                    "url": stmt.excluded.url,
+                    "discovered_at": stmt.excluded.discovered_at,
+                    "updated_at": dt.datetime.now(dt.timezone.utc),
+                },
+            )
+            session.execute(stmt)
+            session.commit()
+        logger.info("Стратегия источника %s сохранена: %s", source_link, strategy["kind"])
+
+    def delete(self, source_link: str) -> bool:
+        """Удаляет стратегию источника; возвращает True, если она была."""
+        with self.Session() as session:
+            deleted = session.execute(delete(SourceStrategy).where(SourceStrategy.source_link == source_link)).rowcount
+            session.commit()
+        return bool(deleted)
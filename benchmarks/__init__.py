@@ -0,0 +1,12 @@
+"""Бенчмарки горячих путей парсинга и отправки дайджеста.
+
+Запуск из корня проекта: ``python -m benchmarks.<имя_модуля>``.
+"""
+
+import os
+import sys
+
+_project_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+for _path in (_project_root, os.path.join(_project_root, "app")):
+    if _path not in sys.path:
+        sys.path.insert(0, _path)
@@ -0,0 +1,46 @@
+"""Время TextComposer.compose на 100k сообщений: даты строками (strptime при сортировке и выводе) против date."""
+
+import random
+import time
+from datetime import date, timedelta
+
+from app.parsing.text_composer import TextComposer
+
+MESSAGES_COUNT = 100000
+REPEATS = 3
+
+
+def _messages(as_text: bool):
+    rng = random.Random(MESSAGES_COUNT)
+    messages = []
+    for index in range(MESSAGES_COUNT):
+        news_date = date(2026, 2, 15) - timedelta(days=rng.randrange(365))
+        messages.append(
+            {
+                "source_name": f"Кафедра {index % 300}",
+                "source_link": f"https://t.me/bench_{index % 300}",
+                "contact": "контакт",
+                "date": news_date.strftime("%Y-%m-%d") if as_text else news_date,
+                "message": f"Новость кафедры номер {index} о семинаре и конференции",
+            }
+        )
+    return messages
+
+
+def _measure(name: str, composer: TextComposer, messages) -> None:
+    timings = []
+    for _ in range(REPEATS):
+        started = time.perf_counter()
+        composer.compose(messages)
+        timings.append(time.perf_counter() - started)
+    print(f"{name:<6} messages={len(messages)} best={min(timings) * 1000:8.1f}ms")
+
+
+def main():
+    composer = TextComposer(message_len=200)
+    _measure("str", composer, _messages(as_text=True))
+    _measure("date", composer, _messages(as_text=False))
+
+
+if __name__ == "__main__":
+    main()
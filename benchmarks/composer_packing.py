@@ -0,0 +1,96 @@
+"""Время упаковки дайджеста из 50k новостей в сообщения: склейка через += против одного join на сообщение.
+
+Заодно считает, сколько сообщений прежней упаковки превышают лимит Telegram в UTF-16.
+"""
+
+import time
+
+from app.parsing.text_composer import TextComposer, utf16_len
+
+MESSAGES_COUNTS = (10000, 50000)
+MAX_MESSAGE_SIZE = 4000
+
+
+def _legacy_split_long_piece(piece: str):
+    if len(piece) <= MAX_MESSAGE_SIZE:
+        return [piece]
+
+    parts = []
+    left = piece
+    while left:
+        if len(left) <= MAX_MESSAGE_SIZE:
+            parts.append(left)
+            break
+
+        split_at = left.rfind("\n", 0, MAX_MESSAGE_SIZE + 1)
+        if split_at <= 0:
+            split_at = MAX_MESSAGE_SIZE
+
+        parts.append(left[:split_at])
+        left = left[split_at:].lstrip("\n")
+
+    return [part for part in parts if part]
+
+
+def _legacy_pack_parts(parts):
+    """Прежняя реализация: current += piece, длина в символах Python."""
+    chunks = []
+    current = ""
+
+    for part in parts:
+        for piece in _legacy_split_long_piece(part):
+            if not current:
+                current = piece
+                continue
+
+            if len(current) + len(piece) <= MAX_MESSAGE_SIZE:
+                current += piece
+            else:
+                chunks.append(current.rstrip())
+                current = piece
+
+    if current:
+        chunks.append(current.rstrip())
+
+    return [chunk for chunk in chunks if chunk] or [""]
+
+
+def _parts(composer: TextComposer, count: int):
+    messages = [
+        {
+            "source_name": f"Кафедра {index % 300}",
+            "source_link": f"https://t.me/bench_{index % 300}",
+            "contact": "контакт",
+            "date": "2026-02-15",
+            "message": f"Новость {index}: семинар 🎓, конференция 📅 и защита диссертации",
+        }
+        for index in range(count)
+    ]
+    return [composer._format_message(message) + "\n" for message in messages]
+
+
+def _measure(name: str, pack, parts) -> None:
+    started = time.perf_counter()
+    chunks = pack(parts)
+    elapsed = time.perf_counter() - started
+    too_long = sum(1 for chunk in chunks if utf16_len(chunk) > MAX_MESSAGE_SIZE)
+    print(
+        f"{name:<7} parts={len(parts):<6d} chunks={len(chunks):<5d} "
+        f"over_limit={too_long:<5d} time={elapsed * 1000:8.1f}ms"
+    )
+
+
+def main():
+    composer = TextComposer(message_len=200, max_message_size=MAX_MESSAGE_SIZE)
+    for count in MESSAGES_COUNTS:
+        parts = _parts(composer, count)
+        _measure("legacy", _legacy_pack_parts, parts)
+        _measure("linear", composer._pack_parts, parts)
+        # Один сплошной кусок без переводов строк: прежнее деление копирует хвост на каждом шаге.
+        long_piece = ["ñ" * (count * 100)]
+        _measure("legacy", _legacy_pack_parts, long_piece)
+        _measure("linear", composer._pack_parts, long_piece)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,104 @@
+"""Число запросов и время seed_database на 10k кафедр: SELECT на строку против пакетного upsert.
+
+По умолчанию используется временная SQLite-база; для PostgreSQL задайте BENCH_DB_DSN.
+"""
+
+import os
+import tempfile
+import time
+
+from sqlalchemy import create_engine, delete, event, select
+from sqlalchemy.engine import Engine
+from sqlalchemy.orm import sessionmaker
+
+from app.models.department import Base, Department
+from data.seed_db import _clean_value, _parse_last_news_date, seed_database
+
+DEPARTMENTS_COUNT = 10000
+CHANGED_SHARE = 10
+
+
+def _legacy_seed_database(rows, dsn: str) -> None:
+    """Прежняя реализация: SELECT и ORM-обновление на каждую строку."""
+    engine = create_engine(dsn)
+    with sessionmaker(bind=engine)() as session:
+        for row in rows:
+            name = _clean_value(row.get("name"))
+            payload = {
+                "contact": _clean_value(row.get("contact")),
+                "website_url": _clean_value(row.get("website_url")),
+                "vk_url": _clean_value(row.get("vk_url")),
+                "tg_url": _clean_value(row.get("tg_url")),
+                "last_news_date": _parse_last_news_date(row.get("last_news_date")),
+            }
+            existing_dep = session.execute(select(Department).where(Department.name == name)).scalar_one_or_none()
+            if existing_dep is None:
+                session.add(Department(name=name, **payload))
+                continue
+            for field, value in payload.items():
+                setattr(existing_dep, field, value)
+        session.commit()
+    engine.dispose()
+
+
+def _rows(revision: int):
+    return [
+        {
+            "name": f"bench_{index}",
+            "contact": f"contact_{index}_{revision if index % CHANGED_SHARE == 0 else 0}",
+            "website_url": f"https://example.com/{index}",
+            "tg_url": f"https://t.me/bench_{index}",
+        }
+        for index in range(DEPARTMENTS_COUNT)
+    ]
+
+
+def _measure(name: str, run, dsn: str) -> None:
+    engine = create_engine(dsn)
+    Base.metadata.create_all(engine)
+    with sessionmaker(bind=engine)() as session:
+        session.execute(delete(Department))
+        session.commit()
+    engine.dispose()
+
+    statements = []
+
+    def listener(*args):
+        statements.append(1)
+
+    # Оба варианта создают свой engine, поэтому запросы считаются на уровне класса Engine.
+    event.listen(Engine, "before_cursor_execute", listener)
+    try:
+        for phase, revision in (("insert", 0), ("reseed", 1)):
+            statements.clear()
+            started = time.perf_counter()
+            run(_rows(revision), dsn)
+            elapsed = time.perf_counter() - started
+            print(
+                f"{name:<7} {phase:<7} rows={DEPARTMENTS_COUNT} statements={len(statements):<6d} time={elapsed:6.2f}s"
+            )
+    finally:
+        event.remove(Engine, "before_cursor_execute", listener)
+
+
+def _upsert_seed_database(rows, dsn: str) -> None:
+    seed_database(seed_data=rows, dsn=dsn)
+
+
+def main():
+    dsn = os.getenv("BENCH_DB_DSN")
+    tmp_dir = None
+    if not dsn:
+        tmp_dir = tempfile.TemporaryDirectory()
+        dsn = f"sqlite:///{os.path.join(tmp_dir.name, 'bench.db')}"
+
+    try:
+        _measure("legacy", _legacy_seed_database, dsn)
+        _measure("upsert", _upsert_seed_database, dsn)
+    finally:
+        if tmp_dir is not None:
+            tmp_dir.cleanup()
+
+
+if __name__ == "__main__":
+    main()
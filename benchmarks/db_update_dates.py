@@ -0,0 +1,102 @@
+"""Число запросов и время Database.update_dates: по запросу на сообщение против одного запроса на поле.
+
+По умолчанию используется временная SQLite-база; для PostgreSQL задайте BENCH_DB_DSN.
+executemany считается одним запросом.
+"""
+
+import datetime as dt
+import os
+import random
+import tempfile
+import time
+
+from sqlalchemy import delete, event, update
+
+from database import Database
+from models.department import Base, Department
+
+DEPARTMENTS_COUNT = 200
+MESSAGE_COUNTS = (1000, 10000)
+
+
+def _legacy_update_dates(database: Database, messages) -> None:
+    """Прежняя реализация: отдельный UPDATE на каждое сообщение."""
+    with database.Session() as session:
+        for message in messages:
+            new_date = dt.datetime.strptime(message["date"], "%Y-%m-%d").date()
+            stmt = (
+                update(Department)
+                .where(Department.name == message["source_name"])
+                .where(Department.last_news_date.is_(None) | (Department.last_news_date < new_date))
+                .values(last_news_date=new_date, updated_at=dt.datetime.now(dt.timezone.utc))
+            )
+            session.execute(stmt)
+        session.commit()
+
+
+def _reset(database: Database) -> None:
+    with database.Session() as session:
+        session.execute(delete(Department))
+        session.add_all(
+            Department(
+                name=f"bench_{index}",
+                tg_url=f"https://t.me/bench_{index}",
+                last_news_date=dt.date(2026, 1, 1),
+            )
+            for index in range(DEPARTMENTS_COUNT)
+        )
+        session.commit()
+
+
+def _messages(count: int):
+    rng = random.Random(count)
+    return [
+        {
+            "source_name": f"bench_{rng.randrange(DEPARTMENTS_COUNT)}",
+            "source_link": None,
+            "date": (dt.date(2026, 2, 1) + dt.timedelta(days=rng.randrange(28))).strftime("%Y-%m-%d"),
+            "external_id": None,
+        }
+        for _ in range(count)
+    ]
+
+
+def _measure(database: Database, name: str, run, messages) -> None:
+    _reset(database)
+    statements = []
+
+    def listener(*args):
+        statements.append(1)
+
+    event.listen(database.engine, "before_cursor_execute", listener)
+    started = time.perf_counter()
+    run(database, messages)
+    elapsed = time.perf_counter() - started
+    event.remove(database.engine, "before_cursor_execute", listener)
+
+    print(f"{name:<8} messages={len(messages):<6d} statements={len(statements):<6d} time={elapsed * 1000:8.1f}ms")
+
+
+def main():
+    dsn = os.getenv("BENCH_DB_DSN")
+    tmp_dir = None
+    if not dsn:
+        tmp_dir = tempfile.TemporaryDirectory()
+        dsn = f"sqlite:///{os.path.join(tmp_dir.name, 'bench.db')}"
+
+    database = Database(dsn=dsn)
+    Base.metadata.create_all(database.engine)
+    print(f"dialect={database.engine.dialect.name} departments={DEPARTMENTS_COUNT}")
+    try:
+        for count in MESSAGE_COUNTS:
+            messages = _messages(count)
+            _measure(database, "legacy", _legacy_update_dates, messages)
+            _measure(database, "bulk", Database.update_dates, messages)
+    finally:
+        database.engine.dispose()
+        if tmp_dir is not None:
+            tmp_dir.cleanup()
+
+
+if __name__ == "__main__":
+    main()
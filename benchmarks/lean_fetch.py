@@ -0,0 +1,264 @@
+"""Байты ответа и CPU на 1000 постов: полные ответы VK и Telegram против экономного режима парсеров.
+
+Фикстуры повторяют форму записанных ответов: посты VK с вложениями, репостом,
+лайками и просмотрами, сообщения Telegram с сущностями, фото и реакциями.
+VK в экономном режиме получает из execute только столбцы id, date и text и id закрепленного поста;
+как и VK, фикстура опускает отсутствующие у поста поля, а закреплен первый пост стены.
+MTProto не умеет отдавать часть полей, поэтому у Telegram байты совпадают,
+а экономия — в разборе без высокоуровневых Message.
+"""
+
+import asyncio
+import json
+import random
+import time
+from datetime import date, datetime, timedelta, timezone
+
+from telethon.extensions import BinaryReader, markdown
+from telethon.tl import types
+
+from app.parsing.parsers.tg_parser import TelegramParser
+from app.parsing.parsers.vk_parser import LEAN_POST_FIELDS, VkParser
+
+POSTS_COUNT = 1000
+PAGE_SIZE = 100
+ROUNDS = 5
+START = datetime(2026, 2, 15, 12, tzinfo=timezone.utc)
+
+
+def _text(index: int) -> str:
+    words = ["семинар", "кафедры", "приглашаем", "студентов", "на", "конференцию", "по", "физике", "в", "аудитории"]
+    return " ".join(random.Random(index).choices(words, k=40)) + f" https://example.com/event/{index}"
+
+
+def _vk_post(index: int) -> dict:
+    timestamp = int((START - timedelta(minutes=30 * index)).timestamp())
+    photo = {
+        "album_id": -7,
+        "date": timestamp,
+        "id": 457239000 + index,
+        "owner_id": -12345,
+        "access_key": "a1b2c3d4e5f6a7b8c9",
+        "sizes": [
+            {
+                "height": height,
+                "width": height * 4 // 3,
+                "type": kind,
+                "url": f"https://sun9-1.userapi.com/{kind}{index}.jpg",
+            }
+            for kind, height in (("s", 75), ("m", 130), ("x", 604), ("y", 807), ("z", 1080), ("w", 1440))
+        ],
+        "text": "",
+        "has_tags": False,
+    }
+    return {
+        "inner_type": "wall_wallpost",
+        "can_delete": 0,
+        "comments": {"can_post": 1, "count": index % 7, "groups_can_post": True},
+        "marked_as_ads": 0,
+        "hash": f"h{index:020d}",
+        "type": "post",
+        "attachments": [{"type": "photo", "photo": photo}],
+        "date": timestamp,
+        "from_id": -12345,
+        "id": 10000 - index,
+        "likes": {"can_like": 1, "count": index % 40, "user_likes": 0, "can_publish": 1, "repost_disabled": False},
+        "reposts": {"count": index % 5, "user_reposted": 0},
+        "views": {"count": 300 + index},
+        "owner_id": -12345,
+        "post_source": {"platform": "android", "type": "api"},
+        "post_type": "post",
+        "text": _text(index),
+        "copy_history": (
+            [
+                {
+                    "id": index,
+                    "owner_id": -999,
+                    "from_id": -999,
+                    "date": timestamp - 600,
+                    "post_type": "post",
+                    "text": _text(index + 1),
+                }
+            ]
+            if index % 4 == 0
+            else []
+        ),
+    }
+
+
+def _vk_pages(lean: bool) -> list:
+    posts = [_vk_post(index) for index in range(POSTS_COUNT)]
+    posts[0]["is_pinned"] = 1
+    pages = []
+    for start in range(0, POSTS_COUNT, PAGE_SIZE):
+        items = posts[start : start + PAGE_SIZE]
+        response = {"count": POSTS_COUNT, "items": items}
+        if lean:
+            response = {
+                "count": POSTS_COUNT,
+                **{field: [item[field] for item in items if field in item] for field in LEAN_POST_FIELDS},
+                "pinned": items[0]["id"] if items[0].get("is_pinned") else 0,
+            }
+        pages.append(json.dumps(response, ensure_ascii=False).encode("utf-8"))
+    return pages
+
+
+class _RecordedVkApi:
+    """Отдает записанные страницы, разбирая JSON на каждый вызов, как это делает vk_api."""
+
+    def __init__(self, pages):
+        self._pages = pages
+        self.wall = self
+        self.plain_calls = 0
+
+    def _page(self, params):
+        index = params["offset"] // PAGE_SIZE
+        return json.loads(self._pages[index]) if index < len(self._pages) else {"items": []}
+
+    def get(self, **params):
+        self.plain_calls += 1
+        return self._page(params)
+
+    def execute(self, code):
+        params = json.loads(code[code.index("API.wall.get(") + 13 : code.index(");")])
+        return [self._page(params)]
+
+
+async def _vk_run(lean: bool, pages: list) -> float:
+    parser = VkParser(token="token", execute_batch_size=1, lean=lean)
+    parser._vk = _RecordedVkApi(pages)
+    parser._first_page_size = lambda group_id, lower_bound: PAGE_SIZE
+    source = {"source_name": "Кафедра", "source_link": "https://vk.com/public12345", "contact": None}
+
+    started = time.process_time()
+    for _ in range(ROUNDS):
+        messages = await parser.parse_source(source, date_from=date(2025, 1, 1), date_to=START.date())
+    elapsed = (time.process_time() - started) / ROUNDS
+    await parser.disconnect()
+    assert len(messages) == POSTS_COUNT - 1  # закрепленный пост пропускается
+    # Экономный режим не должен перечитывать страницы обычным wall.get.
+    assert not lean or parser._vk.plain_calls == 0
+    return elapsed
+
+
+def _tg_message(index: int) -> types.Message:
+    text = _text(index)
+    photo = types.Photo(
+        id=5000000000 + index,
+        access_hash=random.Random(index).getrandbits(62),
+        file_reference=bytes(16),
+        date=START,
+        sizes=[
+            types.PhotoSize(type=kind, w=width, h=width, size=width * 90)
+            for kind, width in (("m", 320), ("x", 800), ("y", 1280))
+        ],
+        dc_id=2,
+    )
+    return types.Message(
+        id=10000 - index,
+        peer_id=types.PeerChannel(channel_id=1234567),
+        date=START - timedelta(minutes=30 * index),
+        message=text,
+        post=True,
+        views=300 + index,
+        forwards=index % 5,
+        media=types.MessageMediaPhoto(photo=photo),
+        entities=[
+            types.MessageEntityBold(offset=0, length=7),
+            types.MessageEntityTextUrl(offset=8, length=7, url=f"https://example.com/{index}"),
+            types.MessageEntityHashtag(offset=16, length=8),
+        ],
+        reactions=types.MessageReactions(
+            results=[types.ReactionCount(reaction=types.ReactionEmoji(emoticon="👍"), count=index % 30)]
+        ),
+    )
+
+
+def _tg_pages() -> list:
+    channel = types.Channel(
+        id=1234567, title="Кафедра", photo=types.ChatPhotoEmpty(), date=START, access_hash=42, username="bench_channel"
+    )
+    messages = [_tg_message(index) for index in range(POSTS_COUNT)]
+    return [
+        bytes(
+            types.messages.ChannelMessages(
+                pts=1,
+                count=POSTS_COUNT,
+                messages=messages[start : start + PAGE_SIZE],
+                chats=[channel],
+                users=[],
+                topics=[],
+            )
+        )
+        for start in range(0, POSTS_COUNT, PAGE_SIZE)
+    ]
+
+
+class _RecordedTelegramClient:
+    """Декодирует записанные ответы GetHistoryRequest; iter_messages дополнительно собирает Message, как Telethon."""
+
+    def __init__(self, pages):
+        self._pages = pages
+        self._self_id = 1
+        # Message._finish_init только вызывает get у кэша сущностей; без попадания input-peer
+        # строится из сущностей ответа через публичный telethon.utils.get_input_peer.
+        self._mb_entity_cache = {}
+        self.parse_mode = markdown
+
+    def _decode(self, offset_id: int):
+        index = (10000 - offset_id) // PAGE_SIZE if offset_id else 0
+        if index >= len(self._pages):
+            return types.messages.ChannelMessages(pts=1, count=0, messages=[], chats=[], users=[], topics=[])
+        return BinaryReader(self._pages[index]).tgread_object()
+
+    async def __call__(self, request):
+        return self._decode(request.offset_id)
+
+    async def iter_messages(self, peer, limit, offset_id=0, min_id=0):
+        fetched = 0
+        while fetched < limit:
+            result = self._decode(offset_id)
+            if not result.messages:
+                return
+            entities = {entity.id: entity for entity in result.chats}
+            for message in result.messages:
+                message._finish_init(self, entities, None)
+                fetched += 1
+                offset_id = message.id
+                yield message
+
+
+async def _tg_run(lean: bool, pages: list) -> float:
+    parser = TelegramParser(api_id=1, api_hash="hash", phone_number="+7", lean=lean)
+    parser._client = _RecordedTelegramClient(pages)
+    source = {"source_name": "Кафедра", "source_link": "https://t.me/bench_channel", "contact": None}
+
+    async def fetch():
+        results = []
+        async for message in parser._iter_channel_messages(source["source_link"], limit=POSTS_COUNT):
+            results.append((message.id, message.date.date(), message.text.replace("\n", " ")))
+        return results
+
+    started = time.process_time()
+    for _ in range(ROUNDS):
+        messages = await fetch()
+    elapsed = (time.process_time() - started) / ROUNDS
+    assert len(messages) == POSTS_COUNT
+    return elapsed
+
+
+async def main():
+    per = POSTS_COUNT // 1000
+    for name, lean in (("vk full", False), ("vk lean", True)):
+        pages = _vk_pages(lean)
+        cpu = await _vk_run(lean, pages)
+        print(f"{name:<8} bytes/1000={sum(map(len, pages)) // per:>9d}  cpu/1000={cpu * 1000 / per:7.1f}ms")
+
+    pages = _tg_pages()
+    for name, lean in (("tg full", False), ("tg lean", True)):
+        cpu = await _tg_run(lean, pages)
+        print(f"{name:<8} bytes/1000={sum(map(len, pages)) // per:>9d}  cpu/1000={cpu * 1000 / per:7.1f}ms")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
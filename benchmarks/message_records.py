@@ -0,0 +1,70 @@
+"""Память на сообщение при бэкфилле в 100k новостей: словари против NewsItem с общим Source."""
+
+import tracemalloc
+from datetime import date, timedelta
+
+from app.parsing.records import NewsItem, Source
+
+MESSAGES_COUNT = 100000
+SOURCES_COUNT = 300
+
+
+def _sources():
+    return [
+        {
+            "source_name": f"Кафедра {index}",
+            "source_link": f"https://t.me/bench_{index}",
+            "contact": f"контакт {index}",
+        }
+        for index in range(SOURCES_COUNT)
+    ]
+
+
+def _texts():
+    return [f"Новость кафедры номер {index} о семинаре и конференции" for index in range(MESSAGES_COUNT)]
+
+
+def _as_dicts(sources, texts):
+    """Прежний формат: парсеры копируют поля источника в каждый словарь."""
+    return [
+        {
+            "source_name": sources[index % SOURCES_COUNT]["source_name"],
+            "source_link": sources[index % SOURCES_COUNT]["source_link"],
+            "contact": sources[index % SOURCES_COUNT]["contact"],
+            "date": date(2026, 2, 15) - timedelta(days=index % 365),
+            "message": text,
+            "external_id": index,
+        }
+        for index, text in enumerate(texts)
+    ]
+
+
+def _as_records(sources, texts):
+    return [
+        NewsItem(
+            source=Source.of(sources[index % SOURCES_COUNT]),
+            date=date(2026, 2, 15) - timedelta(days=index % 365),
+            message=text,
+            external_id=index,
+        )
+        for index, text in enumerate(texts)
+    ]
+
+
+def _measure(name: str, build) -> None:
+    sources, texts = _sources(), _texts()
+    tracemalloc.start()
+    messages = build(sources, texts)
+    current, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    print(f"{name:<8} messages={len(messages)} bytes_per_message={current / len(messages):6.1f}")
+
+
+def main():
+    # Тексты создаются до замера, поэтому в цифрах только накладные расходы на запись.
+    _measure("dict", _as_dicts)
+    _measure("NewsItem", _as_records)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,64 @@
+"""Время склейки дубликатов: MinHash-скетч с LSH-корзинами на 10k–100k новостей против попарного сравнения.
+
+Треть новостей — репосты с правками (префикс, регистр, ссылка в конце).
+"""
+
+import random
+import time
+from datetime import date
+
+from app.parsing.dedup import deduplicate, normalize_text
+from app.parsing.records import NewsItem, Source
+
+MESSAGES_COUNTS = (10000, 50000, 100000)
+PAIRWISE_COUNT = 2000
+REPOST_SHARE = 3
+
+
+def _messages(count: int):
+    rng = random.Random(count)
+    vocabulary = [f"слово{index}" for index in range(5000)]
+    sources = [
+        Source.of({"source_name": f"Кафедра {index}", "source_link": f"https://t.me/bench_{index}", "contact": None})
+        for index in range(300)
+    ]
+    messages = []
+    for index in range(count):
+        source = sources[index % len(sources)]
+        if messages and index % REPOST_SHARE == 0:
+            original = messages[rng.randrange(len(messages))].message
+            text = f"Репост: {original.upper()} https://vk.com/wall-{index}"
+        else:
+            text = " ".join(rng.choice(vocabulary) for _ in range(rng.randint(20, 80)))
+        messages.append(NewsItem(source=source, date=date(2026, 2, 15), message=text))
+    return messages
+
+
+def _pairwise(messages):
+    """Наивный вариант: сравнение каждой новости со всеми оставленными по множествам шинглов."""
+    kept = []
+    for message in messages:
+        words = normalize_text(message.message)
+        shingles = set(zip(words, words[1:], words[2:]))
+        if not any(len(shingles & other) / len(shingles | other) >= 0.6 for other in kept):
+            kept.append(shingles)
+    return kept
+
+
+def main():
+    for count in MESSAGES_COUNTS:
+        messages = _messages(count)
+        started = time.perf_counter()
+        unique = deduplicate(messages)
+        elapsed = time.perf_counter() - started
+        print(f"minhash  messages={count:<6d} unique={len(unique):<6d} time={elapsed * 1000:8.1f}ms")
+
+    messages = _messages(PAIRWISE_COUNT)
+    started = time.perf_counter()
+    unique = _pairwise(messages)
+    elapsed = time.perf_counter() - started
+    print(f"pairwise messages={PAIRWISE_COUNT:<6d} unique={len(unique):<6d} time={elapsed * 1000:8.1f}ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,56 @@
+"""Очистка текста 200k новостей: на месте против пачек в пуле процессов.
+
+Показывает общее время и самую долгую паузу event loop, за которую бот не мог бы ответить.
+"""
+
+import asyncio
+import time
+from datetime import date
+
+from app.parsing.normalize import TextNormalizer
+from app.parsing.records import NewsItem, Source
+
+MESSAGES_COUNT = 200000
+
+
+def _messages():
+    source = Source.of({"source_name": "Кафедра", "source_link": "https://t.me/bench", "contact": None})
+    text = "**Семинар** кафедры\n\nприглашаем   студентов на конференцию по физике\n" * 6
+    return [
+        NewsItem(source=source, date=date(2026, 2, 15), message=f"{text}{index}") for index in range(MESSAGES_COUNT)
+    ]
+
+
+async def _measure(name: str, normalizer: TextNormalizer, messages) -> None:
+    longest = 0.0
+    running = True
+
+    async def ticker():
+        nonlocal longest
+        last = time.perf_counter()
+        while running:
+            await asyncio.sleep(0.001)
+            now = time.perf_counter()
+            longest = max(longest, now - last)
+            last = now
+
+    task = asyncio.ensure_future(ticker())
+    await asyncio.sleep(0)
+    started = time.perf_counter()
+    result = await normalizer.normalize(messages)
+    elapsed = time.perf_counter() - started
+    running = False
+    await task
+    normalizer.close()
+    assert len(result) == MESSAGES_COUNT
+    print(f"{name:<7} messages={MESSAGES_COUNT} time={elapsed:5.2f}s  longest_loop_stall={longest * 1000:7.1f}ms")
+
+
+async def main():
+    messages = _messages()
+    await _measure("inline", TextNormalizer(threshold=MESSAGES_COUNT + 1), messages)
+    await _measure("process", TextNormalizer(), messages)
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,57 @@
+"""Время TG-парсинга каналов с сетевой задержкой: последовательно против ограниченной параллельности."""
+
+import asyncio
+import time
+from datetime import date, datetime, timezone
+
+from app.parsing.parsers.tg_parser import TelegramParser
+
+CHANNELS_COUNT = 30
+CHANNEL_LATENCY = 0.2
+
+
+class _Message:
+    def __init__(self, message_id, text):
+        self.id = message_id
+        self.date = datetime(2026, 2, 15, 10, tzinfo=timezone.utc)
+        self.text = text
+
+
+class _LatencyClient:
+    """Заглушка Telethon: каждый iter_messages ждет CHANNEL_LATENCY перед выдачей сообщений."""
+
+    def is_connected(self):
+        return True
+
+    def iter_messages(self, channel_link, limit=50, offset_id=0):
+        async def _generator():
+            await asyncio.sleep(CHANNEL_LATENCY)
+            for message_id in range(limit, 0, -1):
+                yield _Message(message_id, f"{channel_link} #{message_id}")
+
+        return _generator()
+
+
+async def _run(max_concurrency: int) -> None:
+    parser = TelegramParser(api_id=1, api_hash="hash", phone_number="+0", max_concurrency=max_concurrency)
+    parser._client = _LatencyClient()
+    sources = [
+        {"source_name": f"channel_{i}", "source_link": f"https://t.me/channel_{i}"} for i in range(CHANNELS_COUNT)
+    ]
+
+    started = time.perf_counter()
+    messages = await parser.parse(sources, date_from=date(2026, 2, 15), date_to=date(2026, 2, 15))
+    elapsed = time.perf_counter() - started
+
+    print(
+        f"max_concurrency={max_concurrency:<3d} channels={CHANNELS_COUNT} messages={len(messages)} time={elapsed:5.2f}s"
+    )
+
+
+async def main():
+    for max_concurrency in (1, 4, 8):
+        await _run(max_concurrency)
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
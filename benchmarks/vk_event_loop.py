@@ -0,0 +1,87 @@
+"""Задержка ответа бота во время VK-парсинга 40 источников.
+
+Параллельно с парсингом крутится корутина, имитирующая обработчик команды:
+каждые 10 мс она просыпается и замеряет, насколько event loop опоздал с ее запуском.
+"""
+
+import asyncio
+import statistics
+import time
+from datetime import date, datetime
+
+from app.parsing.parsers.vk_parser import VkParser
+
+SOURCES_COUNT = 40
+API_LATENCY = 0.05
+TICK = 0.01
+
+
+class _SlowWall:
+    def get(self, **params):
+        time.sleep(API_LATENCY)
+        if params.get("offset"):
+            return {"items": []}
+        return {"items": [{"date": int(datetime(2026, 2, 15, 10).timestamp()), "text": "новость"}]}
+
+
+class _SlowVkApi:
+    def __init__(self):
+        self.wall = _SlowWall()
+
+
+class _BlockingVkParser(VkParser):
+    """Старое поведение: синхронный вызов vk_api прямо в корутине."""
+
+    async def _call_api(self, method, **params):
+        return method(**params), 0
+
+
+async def _command_latency(stop: asyncio.Event):
+    delays = []
+    while not stop.is_set():
+        started = time.perf_counter()
+        await asyncio.sleep(TICK)
+        delays.append(time.perf_counter() - started - TICK)
+    return delays
+
+
+async def _run(parser: VkParser):
+    parser._vk = _SlowVkApi()
+    sources = [
+        {"source_name": f"group_{i}", "source_link": f"https://vk.com/public{i}", "last_message_date": None}
+        for i in range(SOURCES_COUNT)
+    ]
+    stop = asyncio.Event()
+    probe = asyncio.create_task(_command_latency(stop))
+    await asyncio.sleep(0)
+
+    started = time.perf_counter()
+    await parser.parse(sources, date_from=date(2026, 2, 15), date_to=date(2026, 2, 15))
+    elapsed = time.perf_counter() - started
+
+    stop.set()
+    delays = await probe
+    await parser.disconnect()
+    return elapsed, delays
+
+
+def _report(name, elapsed, delays):
+    delays_ms = sorted(delay * 1000 for delay in delays) or [0.0]
+    p95 = delays_ms[int(len(delays_ms) * 0.95) - 1] if len(delays_ms) > 1 else delays_ms[0]
+    print(
+        f"{name:<10} parse={elapsed:6.2f}s  ticks={len(delays):4d}  "
+        f"latency median={statistics.median(delays_ms):7.1f}ms p95={p95:7.1f}ms max={delays_ms[-1]:7.1f}ms"
+    )
+
+
+async def main():
+    for name, parser in (
+        ("blocking", _BlockingVkParser(token="token", execute_batch_size=1)),
+        ("offloaded", VkParser(token="token", execute_batch_size=1)),
+    ):
+        elapsed, delays = await _run(parser)
+        _report(name, elapsed, delays)
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,67 @@
+"""Число HTTP-запросов к VK при парсинге 40 групп: по одному wall.get против пачек execute."""
+
+import asyncio
+import json
+import re
+import time
+from datetime import date, datetime
+
+from app.parsing.parsers.vk_parser import VkParser
+
+SOURCES_COUNT = 40
+API_LATENCY = 0.05
+_WALL_GET_RE = re.compile(r"API\.wall\.get\((\{.*?\})\)")
+
+
+class _CountingVkApi:
+    """Заглушка VK API: считает HTTP-запросы и отдает по две новости на группу."""
+
+    def __init__(self):
+        self.requests = 0
+        self.wall = self
+
+    def get(self, **params):
+        self.requests += 1
+        time.sleep(API_LATENCY)
+        return self._page(params)
+
+    def execute(self, code):
+        self.requests += 1
+        time.sleep(API_LATENCY)
+        return [self._page(json.loads(args)) for args in _WALL_GET_RE.findall(code)]
+
+    @staticmethod
+    def _page(params):
+        if params.get("offset"):
+            return {"items": []}
+        return {
+            "items": [
+                {"date": int(datetime(2026, 2, 15, 10).timestamp()), "text": "новость"},
+                {"date": int(datetime(2026, 2, 10, 10).timestamp()), "text": "старая"},
+            ]
+        }
+
+
+async def _run(name: str, parser: VkParser) -> None:
+    api = _CountingVkApi()
+    parser._vk = api
+    sources = [
+        {"source_name": f"group_{i}", "source_link": f"https://vk.com/public{i}", "last_message_date": None}
+        for i in range(SOURCES_COUNT)
+    ]
+
+    started = time.perf_counter()
+    messages = await parser.parse(sources, date_from=date(2026, 2, 15), date_to=date(2026, 2, 15))
+    elapsed = time.perf_counter() - started
+    await parser.disconnect()
+
+    print(f"{name:<10} requests={api.requests:3d}  messages={len(messages):3d}  time={elapsed:5.2f}s")
+
+
+async def main():
+    await _run("wall.get", VkParser(token="token", execute_batch_size=1))
+    await _run("execute", VkParser(token="token"))
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
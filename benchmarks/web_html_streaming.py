@@ -0,0 +1,107 @@
+"""Время и пиковый RSS разбора большой сохраненной новостной страницы: целиком против потока с ранним выходом.
+
+Каждый вариант запускается в отдельном процессе и читает страницу с диска, поэтому
+пиковый RSS не смешивается между вариантами. Без аргумента страница генерируется
+во временный файл; сохраненную страницу сайта можно передать путем:
+
+    python -m benchmarks.web_html_streaming page.html
+"""
+
+import json
+import os
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import date, timedelta
+
+from app.parsing.parsers.web_parsers.html_news import NewsHtmlParser, extract_news
+
+ITEMS_COUNT = 20000
+CHUNK_SIZE = 64 * 1024
+NEWEST_DATE = date(2026, 2, 15)
+MIN_DATE = NEWEST_DATE - timedelta(days=7)
+
+
+def _item(index: int) -> str:
+    item_date = NEWEST_DATE - timedelta(days=index // 10)
+    body = "Новость кафедры о семинаре, конференции и защите диссертации. " * 3
+    return f'<div class="news"><span>{item_date:%d.%m.%Y}</span><p>{body}#{index}</p></div>\n'
+
+
+def _write_page(path: str) -> None:
+    """Сохраняет страницу в стиле старых сайтов кафедр: один длинный список новостей."""
+    with open(path, "w", encoding="utf-8") as page:
+        page.write("<html><head><title>Новости кафедры</title></head><body>\n")
+        for index in range(ITEMS_COUNT):
+            page.write(_item(index))
+        page.write("</body></html>\n")
+
+
+def _run_full(path: str) -> int:
+    with open(path, encoding="utf-8") as page:
+        items = extract_news(page.read())
+    return sum(1 for item_date, _ in items if item_date >= MIN_DATE)
+
+
+def _run_streaming(path: str) -> int:
+    parser = NewsHtmlParser(min_date=MIN_DATE)
+    with open(path, encoding="utf-8") as page:
+        for chunk in iter(lambda: page.read(CHUNK_SIZE), ""):
+            parser.feed(chunk)
+            if parser.stopped:
+                break
+    parser.close()
+    return len(parser.items)
+
+
+def _child(mode: str, path: str) -> None:
+    """Выполняет один вариант и печатает замер в JSON; ru_maxrss в Linux — в КиБ."""
+    baseline = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    started = time.perf_counter()
+    items = {"full": _run_full, "streaming": _run_streaming}[mode](path)
+    elapsed = time.perf_counter() - started
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    print(json.dumps({"items": items, "time": elapsed, "rss_kib": peak, "rss_growth_kib": peak - baseline}))
+
+
+def _measure(mode: str, path: str) -> None:
+    output = subprocess.run(
+        [sys.executable, "-m", "benchmarks.web_html_streaming", "--child", mode, path],
+        check=True,
+        capture_output=True,
+        text=True,
+    ).stdout
+    result = json.loads(output)
+    print(
+        f"{mode:<9} items={result['items']:<5d} time={result['time']:6.3f}s "
+        f"peak_rss={result['rss_kib'] / 1024:6.1f} MiB (+{result['rss_growth_kib'] / 1024:6.1f} MiB over imports)"
+    )
+
+
+def main():
+    if len(sys.argv) == 4 and sys.argv[1] == "--child":
+        _child(sys.argv[2], sys.argv[3])
+        return
+
+    if len(sys.argv) > 1:
+        path = sys.argv[1]
+        cleanup = False
+    else:
+        handle, path = tempfile.mkstemp(suffix=".html")
+        os.close(handle)
+        _write_page(path)
+        cleanup = True
+
+    try:
+        print(f"page={os.path.getsize(path) / 1024 / 1024:.1f} MiB min_date={MIN_DATE} path={path}")
+        _measure("full", path)
+        _measure("streaming", path)
+    finally:
+        if cleanup:
+            os.remove(path)
+
+
+if __name__ == "__main__":
+    main()
@@ -3,9 +3,10 @@
 import datetime as dt
 import os
 import sys
-from typing import Any, Dict, Iterable, Optional
+from typing import Any, Dict, Iterable, List, Optional
 
-from sqlalchemy import create_engine, select
+from sqlalchemy import case, create_engine, func, or_, select
+from sqlalchemy.dialects import postgresql, sqlite
 from sqlalchemy.orm import sessionmaker
 
 current_dir = os.path.dirname(os.path.abspath(__file__))
@@ -18,6 +19,10 @@ from app.models.department import Department
 from data.seed_data import DEPARTMENT_SEED_DATA
 
 DEFAULT_LAST_NEWS_DATE = dt.date(2026, 1, 1)
+SEED_FIELDS = ("contact", "website_url", "vk_url", "tg_url")
+UPSERT_INSERTS = {"postgresql": postgresql.insert, "sqlite": sqlite.insert}
+# Держит число параметров одного INSERT ниже лимита PostgreSQL (65535).
+SEED_BATCH_SIZE = 1000
 
 
 def _clean_value(value: Any) -> Optional[str]:
@@ -53,11 +58,38 @@ def _parse_last_news_date(value: Any) -> dt.date:
         return DEFAULT_LAST_NEWS_DATE
 
 
+def _upsert_statement(insert, rows: List[Dict[str, Any]], keep_date: bool):
+    """Строит INSERT ... ON CONFLICT (name) DO UPDATE, меняющий только отличающиеся строки.
+
+    При смене ссылки канала или группы сбрасывается ее курсор; при keep_date
+    существующая last_news_date сохраняется.
+    """
+    stmt = insert(Department).values(rows)
+    excluded = stmt.excluded
+    table = Department.__table__.c
+
+    set_ = {field: excluded[field] for field in SEED_FIELDS}
+    for url_field, cursor_field in (("tg_url", "tg_last_message_id"), ("vk_url", "vk_last_post_id")):
+        set_[cursor_field] = case(
+            (table[url_field].is_distinct_from(excluded[url_field]), None), else_=table[cursor_field]
+        )
+    set_["updated_at"] = func.now()
+    changed = [table[field].is_distinct_from(excluded[field]) for field in SEED_FIELDS]
+    if not keep_date:
+        set_["last_news_date"] = excluded.last_news_date
+        changed.append(table.last_news_date.is_distinct_from(excluded.last_news_date))
+
+    return stmt.on_conflict_do_update(index_elements=[Department.name], set_=set_, where=or_(*changed))
+
+
 def seed_database(
     seed_data: Optional[Iterable[Dict[str, Any]]] = None,
     dsn: Optional[str] = None,
 ) -> Dict[str, int]:
-    """Обновляет и добавляет кафедры в БД."""
+    """Обновляет и добавляет кафедры в БД одним upsert на пачку строк.
+
+    Даты существующих кафедр сохраняются, если в строке не задана last_news_date.
+    """
     dsn_to_use = dsn
     if not dsn_to_use:
         config = Settings()
@@ -75,37 +107,40 @@ def seed_database(
     session_factory = sessionmaker(bind=engine)
     rows = list(DEPARTMENT_SEED_DATA if seed_data is None else seed_data)
 
-    count_added = 0
-    count_updated = 0
+    payloads: Dict[str, Dict[str, Any]] = {}
+    for row in rows:
+        name = _clean_value(row.get("name"))
+        if name is None:
+            continue
+
+        payload = {"name": name, **{field: _clean_value(row.get(field)) for field in SEED_FIELDS}}
+        if _clean_value(row.get("last_news_date")) is not None:
+            payload["last_news_date"] = _parse_last_news_date(row.get("last_news_date"))
+        payloads[name] = payload
 
     with session_factory() as session:
-        for row in rows:
-            name = _clean_value(row.get("name"))
-            if name is None:
-                continue
-
-            payload = {
-                "contact": _clean_value(row.get("contact")),
-                "website_url": _clean_value(row.get("website_url")),
-                "vk_url": _clean_value(row.get("vk_url")),
-                "tg_url": _clean_value(row.get("tg_url")),
-                "last_news_date": _parse_last_news_date(row.get("last_news_date")),
-            }
-
-            stmt = select(Department).where(Department.name == name)
-            existing_dep = session.execute(stmt).scalar_one_or_none()
-
-            if existing_dep is None:
-                session.add(Department(name=name, **payload))
-                count_added += 1
-                continue
-
-            for field, value in payload.items():
-                setattr(existing_dep, field, value)
-            count_updated += 1
+        names = list(payloads)
+        existing = set()
+        for start in range(0, len(names), SEED_BATCH_SIZE):
+            stmt = select(Department.name).where(Department.name.in_(names[start : start + SEED_BATCH_SIZE]))
+            existing.update(session.scalars(stmt))
+
+        with_date = [payload for payload in payloads.values() if "last_news_date" in payload]
+        without_date = [
+            {**payload, "last_news_date": DEFAULT_LAST_NEWS_DATE}
+            for payload in payloads.values()
+            if "last_news_date" not in payload
+        ]
+        insert = UPSERT_INSERTS[engine.dialect.name]
+        for batch_rows, keep_date in ((with_date, False), (without_date, True)):
+            for start in range(0, len(batch_rows), SEED_BATCH_SIZE):
+                session.execute(_upsert_statement(insert, batch_rows[start : start + SEED_BATCH_SIZE], keep_date))
 
         session.commit()
 
+    count_added = len(payloads) - len(existing)
+    count_updated = len(existing)
+
     result = {
         "added": count_added,
         "updated": count_updated,
@@ -0,0 +1,30 @@
+"""Source cursors
+
+Revision ID: 5b0e3f7a9d21
+Revises: c21cae3c1cc8
+Create Date: 2026-10-17 12:00:00.000000
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision: str = '5b0e3f7a9d21'
+down_revision: Union[str, Sequence[str], None] = 'c21cae3c1cc8'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column('departments', sa.Column('tg_last_message_id', sa.BigInteger(), nullable=True))
+    op.add_column('departments', sa.Column('vk_last_post_id', sa.BigInteger(), nullable=True))
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_column('departments', 'vk_last_post_id')
+    op.drop_column('departments', 'tg_last_message_id')
@@ -0,0 +1,52 @@
+"""Message store
+
+Revision ID: 8d4c2a6e1f37
+Revises: 5b0e3f7a9d21
+Create Date: 2026-10-18 10:00:00.000000
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision: str = '8d4c2a6e1f37'
+down_revision: Union[str, Sequence[str], None] = '5b0e3f7a9d21'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table(
+        'messages',
+        sa.Column('id', sa.Integer(), autoincrement=True, nullable=False),
+        sa.Column('source_name', sa.String(length=255), nullable=False),
+        sa.Column('source_link', sa.String(length=255), nullable=False),
+        sa.Column('message_key', sa.String(length=64), nullable=False),
+        sa.Column('external_id', sa.BigInteger(), nullable=True),
+        sa.Column('contact', sa.String(length=255), nullable=True),
+        sa.Column('news_date', sa.Date(), nullable=False),
+        sa.Column('text', sa.Text(), nullable=False),
+        sa.Column('updated_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=True),
+        sa.PrimaryKeyConstraint('id'),
+        sa.UniqueConstraint('source_link', 'message_key'),
+    )
+    op.create_index(op.f('ix_messages_news_date'), 'messages', ['news_date'], unique=False)
+    op.create_table(
+        'message_coverage',
+        sa.Column('source_link', sa.String(length=255), nullable=False),
+        sa.Column('covered_from', sa.Date(), nullable=False),
+        sa.Column('covered_to', sa.Date(), nullable=False),
+        sa.Column('updated_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=True),
+        sa.PrimaryKeyConstraint('source_link'),
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_table('message_coverage')
+    op.drop_index(op.f('ix_messages_news_date'), table_name='messages')
+    op.drop_table('messages')
@@ -0,0 +1,37 @@
+"""Delivered fingerprints
+
+Revision ID: e4a7b9c2d315
+Revises: 8d4c2a6e1f37
+Create Date: 2026-10-18 12:00:00.000000
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision: str = 'e4a7b9c2d315'
+down_revision: Union[str, Sequence[str], None] = '8d4c2a6e1f37'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table(
+        'delivered_fingerprints',
+        sa.Column('fingerprint', sa.BigInteger(), autoincrement=False, nullable=False),
+        sa.Column('delivered_on', sa.Date(), nullable=False),
+        sa.PrimaryKeyConstraint('fingerprint'),
+    )
+    op.create_index(
+        op.f('ix_delivered_fingerprints_delivered_on'), 'delivered_fingerprints', ['delivered_on'], unique=False
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index(op.f('ix_delivered_fingerprints_delivered_on'), table_name='delivered_fingerprints')
+    op.drop_table('delivered_fingerprints')
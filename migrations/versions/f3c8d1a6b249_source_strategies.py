@@ -0,0 +1,36 @@
+"""Source strategies
+
+Revision ID: f3c8d1a6b249
+Revises: e4a7b9c2d315
+Create Date: 2026-10-18 14:00:00.000000
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision: str = 'f3c8d1a6b249'
+down_revision: Union[str, Sequence[str], None] = 'e4a7b9c2d315'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table(
+        'source_strategies',
+        sa.Column('source_link', sa.String(length=255), nullable=False),
+        sa.Column('kind', sa.String(length=16), nullable=False),
+        sa.Column('url', sa.Text(), nullable=False),
+        sa.Column('discovered_at', sa.Date(), nullable=False),
+        sa.Column('updated_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=True),
+        sa.PrimaryKeyConstraint('source_link'),
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_table('source_strategies')
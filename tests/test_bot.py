@@ -1,20 +1,45 @@
+import uuid
+
+import pytest
+
 from app.bot import DigestBotApp
 
 
 class _FakeOrchestrator:
+    def __init__(self, texts=("ok",)):
+        self.texts = list(texts)
+
     async def collect_digest(self, date_from=None, date_to=None, update_db_dates=False):
-        return {"texts": ["ok"], "errors": [], "stats": {}}
+        return {"texts": self.texts, "errors": [], "stats": {}}
+
+    async def stream_digest(self, date_from=None, date_to=None, update_db_dates=False):
+        for text in self.texts:
+            yield "text", text
+        yield "result", {"errors": [f"сбой_{uuid.uuid4().hex[:4]}"], "stats": {}}
 
     async def disconnect(self):
         return None
 
 
-def _bot():
+class _FakeBot:
+    def __init__(self):
+        self.sent = []
+
+    async def send_message(self, chat_id, text, parse_mode=None):
+        self.sent.append((chat_id, text))
+
+
+class _FakeContext:
+    def __init__(self):
+        self.bot = _FakeBot()
+
+
+def _bot(orchestrator=None):
     return DigestBotApp(
         token="token",
         chat_id=1,
         chat_id_errors=2,
-        orchestrator=_FakeOrchestrator(),
+        orchestrator=orchestrator or _FakeOrchestrator(),
         daily_time=None,
     )
 
@@ -28,11 +53,14 @@ def test_error_reports_include_required_source_statistics():
             "sources_without_news": 4,
             "sources_failed": 2,
             "sources_without_parser": 1,
+            "cache_hits": 6,
+            "cache_misses": 4,
         },
     }
     reports = _bot()._error_reports(result)
     message = "\n".join(reports)
     ok = "Найдены новости: 3" in message and "Нет парсера: 1" in message and "Не обработались: 2" in message
+    ok = ok and "попаданий 6, промахов 4" in message
     assert ok, "Failure: bot did not include required parsing statistics in error report"
 
 
@@ -52,6 +80,29 @@ def test_error_reports_return_separate_stats_and_error_blocks_without_split():
     assert ok, "Failure: bot error reports must be returned as plain blocks without text splitting"
 
 
-def test_digest_texts_returns_text_array_when_result_contains_texts():
-    texts = _bot()._digest_texts({"texts": ["первая", "вторая"], "text": "fallback"})
-    assert texts == ["первая", "вторая"], "Failure: digest_texts did not preserve ordered text chunks"
+@pytest.mark.anyio
+async def test_send_digest_sends_streamed_text_chunks_without_collecting_the_whole_digest():
+    orchestrator = _FakeOrchestrator(["первая", "вторая"])
+    context = _FakeContext()
+
+    async def collect_digest(**kwargs):
+        raise AssertionError("scheduled digest must be streamed")
+
+    orchestrator.collect_digest = collect_digest
+    await _bot(orchestrator)._send_digest(context)
+
+    texts = [text for chat_id, text in context.bot.sent if chat_id == 1]
+    assert texts == ["первая", "вторая"], "Failure: scheduled digest did not send ordered streamed chunks"
+
+
+@pytest.mark.anyio
+async def test_send_digest_sends_streamed_chunks_in_order_and_reports_to_errors_chat():
+    texts = [f"часть_{index}_{uuid.uuid4().hex[:4]}_ñ" for index in range(4)]
+    context = _FakeContext()
+
+    await _bot(_FakeOrchestrator(texts))._send_digest(context)
+
+    main = [text for chat_id, text in context.bot.sent if chat_id == 1]
+    reports = [text for chat_id, text in context.bot.sent if chat_id == 2]
+    ok = main == texts and len(reports) == 2 and "сбой_" in reports[1]
+    assert ok, "Failure: scheduled digest did not send streamed chunks in order with error reports"
@@ -0,0 +1,115 @@
+import datetime as dt
+import random
+import threading
+import uuid
+
+import pytest
+
+from app.database import AsyncDatabase, Database
+from app.models.department import Base, Department
+
+
+@pytest.fixture
+def database():
+    db = Database(dsn="sqlite://")
+    Base.metadata.create_all(db.engine)
+    return db
+
+
+def _department(db, **fields):
+    name = f"Кафедра_{uuid.uuid4().hex[:6]}_ñ"
+    with db.Session() as session:
+        session.add(Department(name=name, last_news_date=dt.date(2026, 2, 10), **fields))
+        session.commit()
+    return name
+
+
+def _load(db, name):
+    with db.Session() as session:
+        return session.query(Department).filter_by(name=name).one()
+
+
+def test_sources_returns_type_specific_cursor_for_every_link(database):
+    tg_cursor, vk_cursor = random.randint(1, 500), random.randint(501, 1000)
+    _department(
+        database,
+        website_url="https://example.com",
+        tg_url="https://t.me/example",
+        vk_url="https://vk.com/example",
+        tg_last_message_id=tg_cursor,
+        vk_last_post_id=vk_cursor,
+    )
+
+    cursors = {source["source_type"]: source["last_message_id"] for source in database.sources()}
+
+    assert cursors == {"web": None, "vk": vk_cursor, "tg": tg_cursor}, "Failure: sources did not expose source cursors"
+
+
+def test_update_dates_moves_cursor_of_the_matching_source_forward(database):
+    name = _department(database, tg_url="https://t.me/example", vk_url="https://vk.com/example", vk_last_post_id=7)
+    messages = [
+        {"source_name": name, "source_link": "https://t.me/example", "date": "2026-02-12", "external_id": 40},
+        {"source_name": name, "source_link": "https://t.me/example", "date": "2026-02-11", "external_id": 39},
+    ]
+
+    database.update_dates(messages)
+
+    dep = _load(database, name)
+    ok = dep.tg_last_message_id == 40 and dep.vk_last_post_id == 7 and dep.last_news_date == dt.date(2026, 2, 12)
+    assert ok, "Failure: update_dates did not advance the cursor of the matching source"
+
+
+def test_update_dates_cannot_move_cursor_backwards(database):
+    cursor = random.randint(100, 200)
+    name = _department(database, vk_url="https://vk.com/example", vk_last_post_id=cursor)
+
+    database.update_dates(
+        [
+            {
+                "source_name": name,
+                "source_link": "https://vk.com/example",
+                "date": "2026-02-01",
+                "external_id": cursor - 1,
+            }
+        ]
+    )
+
+    dep = _load(database, name)
+    ok = dep.vk_last_post_id == cursor and dep.last_news_date == dt.date(2026, 2, 10)
+    assert ok, "Failure: update_dates moved a source cursor or date backwards"
+
+
+def test_update_dates_applies_the_latest_date_of_each_department(database):
+    names = [_department(database) for _ in range(3)]
+    latest = {name: dt.date(2026, 2, random.randint(11, 28)) for name in names}
+    messages = [
+        {"source_name": name, "date": (day - dt.timedelta(days=offset)).strftime("%Y-%m-%d")}
+        for name, day in latest.items()
+        for offset in random.sample(range(5), 5)
+    ]
+
+    database.update_dates(messages)
+
+    ok = {name: _load(database, name).last_news_date for name in names} == latest
+    assert ok, "Failure: update_dates did not apply the latest message date of every department"
+
+
+@pytest.mark.anyio
+async def test_async_database_runs_queries_outside_the_event_loop_thread(tmp_path):
+    database = Database(dsn=f"sqlite:///{tmp_path / 'async.db'}")
+    Base.metadata.create_all(database.engine)
+    name = _department(database, tg_url="https://t.me/example")
+    async_db = AsyncDatabase(database, max_workers=1)
+    threads = []
+    original_sources = database.sources
+
+    def _sources():
+        threads.append(threading.get_ident())
+        return original_sources()
+
+    database.sources = _sources
+    sources = await async_db.sources()
+    async_db.close()
+
+    ok = [source["source_name"] for source in sources] == [name] and threads[0] != threading.get_ident()
+    assert ok, "Failure: async database ran a blocking query on the event loop thread"
@@ -0,0 +1,55 @@
+import datetime as dt
+import random
+import uuid
+
+from app.parsing.dedup import deduplicate
+from app.parsing.records import NewsItem, Source
+
+WORDS = [
+    "семинар",
+    "кафедра",
+    "конференция",
+    "доклад",
+    "студенты",
+    "защита",
+    "лекция",
+    "физика",
+    "приглашаем",
+    "аудитория",
+]
+
+
+def _text(length=40):
+    return " ".join(random.choice(WORDS) + str(random.randint(0, 999)) for _ in range(length))
+
+
+def _item(text, link=None):
+    link = link or f"https://t.me/{uuid.uuid4().hex[:6]}"
+    source = Source.of({"source_name": "Кафедра_ñ", "source_link": link, "contact": "контакт"})
+    return NewsItem(source=source, date=dt.date(2026, 2, 12), message=text)
+
+
+def test_deduplicate_merges_reposts_with_small_edits_and_lists_all_links():
+    text = _text()
+    original = _item(text)
+    repost = _item("Репост! " + text.upper() + " Подробнее: https://vk.com/wall-1_2")
+    other = _item(_text())
+
+    result = deduplicate([original, other, repost])
+
+    ok = len(result) == 2 and result[0].links == (original.source_link, repost.source_link)
+    ok = ok and result[1] is other and result[0].message == original.message
+    assert ok, "Failure: deduplicate did not merge the edited repost into one item with both links"
+
+
+def test_deduplicate_keeps_different_news_and_plain_dicts():
+    messages = [
+        {"source_link": f"https://vk.com/{index}", "message": _text(), "date": "2026-02-12"} for index in range(50)
+    ]
+    messages.append({**messages[7], "source_link": "https://vk.com/copy"})
+
+    result = deduplicate(messages)
+
+    ok = len(result) == 50 and result[7]["links"] == ["https://vk.com/7", "https://vk.com/copy"]
+    ok = ok and all("links" not in message for index, message in enumerate(result) if index != 7)
+    assert ok, "Failure: deduplicate merged different news or lost the copy link on a dict message"
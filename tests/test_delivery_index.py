@@ -0,0 +1,44 @@
+import datetime as dt
+import uuid
+
+import pytest
+from sqlalchemy.orm import sessionmaker
+
+from app.database import Database
+from app.delivery_index import DeliveryIndex
+from app.models.department import Base, DeliveredFingerprint
+
+
+@pytest.fixture
+def index():
+    db = Database(dsn="sqlite://")
+    Base.metadata.create_all(db.engine)
+    return DeliveryIndex(db.engine, ttl_days=30)
+
+
+def test_fingerprint_ignores_case_links_and_punctuation_but_not_words():
+    text = f"Семинар {uuid.uuid4().hex[:6]} пройдет в четверг"
+    first = DeliveryIndex.fingerprint({"message": f"{text}! https://t.me/a"})
+    second = DeliveryIndex.fingerprint({"message": f"  {text.upper()}…"})
+    other = DeliveryIndex.fingerprint({"message": f"{text} в пятницу"})
+
+    ok = first == second and first != other and DeliveryIndex.fingerprint({"message": "🔥 !!"}) is None
+    assert ok, "Failure: fingerprint did not match normalized copies or collided with a different text"
+
+
+def test_remember_refreshes_fresh_fingerprints_and_purges_expired_ones(index):
+    old = [DeliveryIndex.fingerprint({"message": f"старая {uuid.uuid4().hex}"}) for _ in range(3)]
+    new = [DeliveryIndex.fingerprint({"message": f"новая {uuid.uuid4().hex}"}) for _ in range(3)]
+    with sessionmaker(bind=index.engine)() as session:
+        session.add_all(
+            DeliveredFingerprint(fingerprint=value, delivered_on=dt.date.today() - dt.timedelta(days=40))
+            for value in old
+        )
+        session.commit()
+
+    index.remember(new + old[:1])
+
+    ok = index.delivered(old + new) == set(new + old[:1]) and index.recent() == set(new + old[:1])
+    with sessionmaker(bind=index.engine)() as session:
+        ok = ok and session.query(DeliveredFingerprint).count() == 4
+    assert ok, "Failure: delivery index did not purge expired fingerprints or keep the remembered ones"
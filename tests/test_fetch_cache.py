@@ -0,0 +1,58 @@
+import random
+import time
+import uuid
+from datetime import date
+
+from app.parsing.fetch_cache import SourceFetchCache
+
+
+def _source():
+    return {
+        "source_name": "кафедра_ñ",
+        "source_link": f"https://t.me/{uuid.uuid4().hex[:6]}",
+        "last_message_date": None,
+    }
+
+
+def _messages(source, days, text="ñ"):
+    return [{"source_link": source["source_link"], "date": f"2026-02-{day:02d}", "message": text} for day in days]
+
+
+def test_get_slices_cached_fetch_that_covers_the_requested_range():
+    cache = SourceFetchCache(ttl=60)
+    source = _source()
+    cache.put("key", source, date(2026, 2, 1), date(2026, 2, 20), _messages(source, range(1, 21)))
+    day = random.randint(2, 19)
+
+    sliced = cache.get("key", source, date(2026, 2, day), date(2026, 2, day))
+    wider = cache.get("key", source, date(2026, 1, 31), date(2026, 2, 20))
+
+    ok = [row["date"] for row in sliced] == [f"2026-02-{day:02d}"] and wider is None
+    ok = ok and (cache.hits, cache.misses) == (1, 1)
+    assert ok, "Failure: fetch cache did not slice a covering fetch or served an uncovered range"
+
+
+def test_get_cannot_return_expired_entries():
+    cache = SourceFetchCache(ttl=0.01)
+    source = _source()
+    cache.put("key", source, date(2026, 2, 1), date(2026, 2, 20), _messages(source, [5]))
+
+    time.sleep(0.02)
+
+    assert (
+        cache.get("key", source, date(2026, 2, 5), date(2026, 2, 5)) is None
+    ), "Failure: fetch cache served an expired entry"
+
+
+def test_put_evicts_least_recently_used_entries_over_memory_budget():
+    source = _source()
+    entry = _messages(source, range(1, 4), text="x" * 1000)
+    cache = SourceFetchCache(ttl=60, max_bytes=2 * SourceFetchCache._message_size(entry[0]) * len(entry))
+    cache.put("first", source, date(2026, 2, 1), date(2026, 2, 3), entry)
+    cache.put("second", source, date(2026, 2, 1), date(2026, 2, 3), entry)
+    cache.get("first", source, date(2026, 2, 1), date(2026, 2, 3))
+
+    cache.put("third", source, date(2026, 2, 1), date(2026, 2, 3), entry)
+
+    kept = [key for key in ("first", "second", "third") if key in cache._entries]
+    assert kept == ["first", "third"], "Failure: fetch cache did not evict the least recently used entry"
@@ -57,7 +57,7 @@ class _FakeOrchestrator:
         )
         return self._result
 
-    def update_dates_to_yesterday(self):
+    async def update_dates_to_yesterday(self):
         self.update_dates_calls += 1
         return self.update_dates_result
 
@@ -0,0 +1,67 @@
+import datetime as dt
+import random
+import uuid
+
+import pytest
+
+from app.database import Database
+from app.message_store import MessageStore
+from app.models.department import Base
+
+
+@pytest.fixture
+def store():
+    db = Database(dsn="sqlite://")
+    Base.metadata.create_all(db.engine)
+    return MessageStore(db.engine)
+
+
+def _message(link, external_id, day, text=None):
+    return {
+        "source_name": "Кафедра_ñ",
+        "source_link": link,
+        "contact": "контакт",
+        "date": f"2026-02-{day:02d}",
+        "message": text or f"новость_{uuid.uuid4().hex[:6]}",
+        "external_id": external_id,
+    }
+
+
+def test_save_upserts_messages_by_source_and_external_id(store):
+    link = f"https://t.me/{uuid.uuid4().hex[:6]}"
+    external_id = random.randint(1, 1000)
+
+    store.save([_message(link, external_id, 12, "старый текст")])
+    store.save([_message(link, external_id, 12, "новый текст ñ"), _message(link, None, 13, "новость сайта")])
+    stored = store.messages([link], dt.date(2026, 2, 1), dt.date(2026, 2, 28))
+
+    ok = [(row["date"], row["message"], row["external_id"]) for row in stored] == [
+        (dt.date(2026, 2, 13), "новость сайта", None),
+        (dt.date(2026, 2, 12), "новый текст ñ", external_id),
+    ]
+    assert ok, "Failure: message store did not upsert messages by source and external id"
+
+
+def test_messages_returns_only_requested_sources_and_dates(store):
+    link, other_link = f"https://vk.com/{uuid.uuid4().hex[:6]}", f"https://vk.com/{uuid.uuid4().hex[:6]}"
+    store.save([_message(link, 1, 10), _message(link, 2, 15), _message(other_link, 3, 15)])
+
+    stored = store.messages([link], dt.date(2026, 2, 14), dt.date(2026, 2, 16))
+
+    ok = [(row["source_link"], row["external_id"]) for row in stored] == [(link, 2)]
+    assert ok, "Failure: message store returned messages outside the requested sources or dates"
+
+
+def test_extend_coverage_merges_adjacent_ranges_and_replaces_older_ones(store):
+    link = f"https://t.me/{uuid.uuid4().hex[:6]}"
+
+    store.extend_coverage(link, dt.date(2026, 2, 1), dt.date(2026, 2, 7))
+    store.extend_coverage(link, dt.date(2026, 2, 8), dt.date(2026, 2, 10))
+    merged = store.coverage([link])[link]
+    store.extend_coverage(link, dt.date(2026, 2, 20), dt.date(2026, 2, 21))
+    replaced = store.coverage([link])[link]
+    store.extend_coverage(link, dt.date(2026, 1, 1), dt.date(2026, 1, 2))
+
+    ok = merged == (dt.date(2026, 2, 1), dt.date(2026, 2, 10))
+    ok = ok and replaced == store.coverage([link])[link] == (dt.date(2026, 2, 20), dt.date(2026, 2, 21))
+    assert ok, "Failure: message store did not merge adjacent coverage or keep the newest range"
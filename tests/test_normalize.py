@@ -0,0 +1,43 @@
+import asyncio
+import uuid
+from datetime import date
+
+import pytest
+
+from app.parsing.normalize import TextNormalizer, clean_text
+from app.parsing.records import NewsItem, Source
+
+pytestmark = pytest.mark.anyio
+
+
+def test_clean_text_removes_markdown_asterisks_and_collapses_whitespace():
+    text = clean_text("  Важная **новость**\nдля\t\tкафедры_ñ  ")
+    assert text == "Важная новость для кафедры_ñ", "Failure: clean_text did not strip asterisks and whitespace"
+
+
+async def test_normalize_fans_out_large_lists_to_processes_keeping_order_and_the_loop_responsive():
+    source = Source.of(
+        {"source_name": "Кафедра", "source_link": f"https://t.me/{uuid.uuid4().hex[:6]}", "contact": None}
+    )
+    messages = [
+        NewsItem(source=source, date=date(2026, 2, 15), message=f"новость\n**{index}**") for index in range(3000)
+    ]
+    normalizer = TextNormalizer(threshold=1000, batch_size=500, max_workers=2)
+    ticks = 0
+
+    async def ticker():
+        nonlocal ticks
+        while True:
+            ticks += 1
+            await asyncio.sleep(0.001)
+
+    task = asyncio.ensure_future(ticker())
+    try:
+        result = await normalizer.normalize(messages)
+    finally:
+        task.cancel()
+        normalizer.close()
+
+    ok = [item["message"] for item in result] == [f"новость {index}" for index in range(3000)]
+    ok = ok and all(item.source is source for item in result) and ticks > 1
+    assert ok, "Failure: normalizer did not clean a large list in processes without blocking the loop"
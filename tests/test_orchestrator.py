@@ -0,0 +1,235 @@
+import asyncio
+import datetime as dt
+import threading
+import uuid
+
+import pytest
+
+from app.database import Database
+from app.delivery_index import DeliveryIndex
+from app.message_store import MessageStore
+from app.models.department import Base
+from app.parsing.orchestrator import INLINE_DEDUP_LIMIT, DigestOrchestrator
+from app.parsing.parser_manager import ParserManager
+from app.parsing.text_composer import TextComposer
+
+pytestmark = pytest.mark.anyio
+
+TODAY = dt.date.today()
+
+
+class _FakeDatabase:
+    def __init__(self, sources):
+        self._sources = sources
+        self.updated = []
+
+    async def run(self, func, *args, **kwargs):
+        return func(*args, **kwargs)
+
+    async def sources(self):
+        return [dict(source) for source in self._sources]
+
+    async def update_dates(self, messages):
+        self.updated.extend(messages)
+
+
+class _FakeComposer:
+    def compose(self, messages):
+        return [f"сообщений: {len(messages)}"]
+
+
+class _DatedParser:
+    """Отдает новости за последние 10 дней с учетом тех же границ, что и настоящие парсеры."""
+
+    def __init__(self, failing_links=()):
+        self.failing_links = set(failing_links)
+        self.calls = []
+
+    async def parse_source(self, source, date_from=None, date_to=None):
+        self.calls.append({"link": source["source_link"], "date_from": date_from, "last": source["last_message_date"]})
+        if source["source_link"] in self.failing_links:
+            raise RuntimeError(f"сбой_{uuid.uuid4().hex[:4]}")
+
+        result = []
+        for days_ago in range(10):
+            day = TODAY - dt.timedelta(days=days_ago)
+            if day > date_to or (date_from is not None and day < date_from):
+                continue
+            if date_from is None and source["last_message_date"] is not None and day <= source["last_message_date"]:
+                continue
+            result.append(
+                {
+                    "source_name": source["source_name"],
+                    "source_link": source["source_link"],
+                    "contact": source["contact"],
+                    "date": day,
+                    "message": f"новость {day} ñ",
+                    "external_id": day.toordinal(),
+                }
+            )
+        return result
+
+
+@pytest.fixture
+def store():
+    db = Database(dsn="sqlite://")
+    Base.metadata.create_all(db.engine)
+    return MessageStore(db.engine)
+
+
+def _source():
+    suffix = uuid.uuid4().hex[:6]
+    return {
+        "source_name": f"кафедра_{suffix}_ñ",
+        "source_link": f"https://t.me/{suffix}",
+        "source_type": "tg",
+        "contact": "контакт",
+        "last_message_date": TODAY - dt.timedelta(days=30),
+        "last_message_id": None,
+    }
+
+
+def _dates(result):
+    return sorted(message["date"] for message in result["messages"])
+
+
+async def test_collect_digest_serves_covered_range_from_store_and_fetches_only_the_tail(store):
+    parser = _DatedParser()
+    orchestrator = DigestOrchestrator(
+        database=_FakeDatabase([_source()]),
+        parser_manager=ParserManager(tg_parser=parser, cache_ttl=None),
+        composer=_FakeComposer(),
+        message_store=store,
+    )
+    week_ago = TODAY - dt.timedelta(days=7)
+
+    first = await orchestrator.collect_digest(date_from=week_ago, date_to=TODAY)
+    second = await orchestrator.collect_digest(date_from=week_ago, date_to=TODAY)
+
+    ok = len(first["messages"]) == 8 and _dates(first) == _dates(second)
+    ok = ok and parser.calls[1]["date_from"] is None and parser.calls[1]["last"] == TODAY - dt.timedelta(days=1)
+    ok = ok and second["stats"]["sources_from_store"] == 1 and second["stats"]["sources_total"] == 1
+    assert ok, "Failure: orchestrator did not serve the covered range from the store and fetch only the tail"
+
+
+async def test_collect_digest_cannot_mark_failed_sources_as_covered(store):
+    source = _source()
+    orchestrator = DigestOrchestrator(
+        database=_FakeDatabase([source]),
+        parser_manager=ParserManager(tg_parser=_DatedParser(failing_links={source["source_link"]})),
+        composer=_FakeComposer(),
+        message_store=store,
+    )
+
+    result = await orchestrator.collect_digest(date_from=TODAY - dt.timedelta(days=7), date_to=TODAY)
+
+    ok = len(result["errors"]) == 1 and store.coverage([source["source_link"]]) == {}
+    assert ok, "Failure: orchestrator recorded coverage for a source that failed to parse"
+
+
+class _SlowDatabase(_FakeDatabase):
+    def __init__(self, sources):
+        super().__init__(sources)
+        self.active = 0
+        self.max_active = 0
+
+    async def update_dates(self, messages):
+        self.active += 1
+        self.max_active = max(self.max_active, self.active)
+        await asyncio.sleep(0.05)
+        self.active -= 1
+
+
+async def test_collect_digest_serializes_runs_that_advance_dates():
+    database = _SlowDatabase([_source()])
+    orchestrator = DigestOrchestrator(
+        database=database,
+        parser_manager=ParserManager(tg_parser=_DatedParser()),
+        composer=_FakeComposer(),
+    )
+
+    await asyncio.gather(*(orchestrator.collect_digest(update_db_dates=True) for _ in range(3)))
+
+    assert database.max_active == 1, "Failure: orchestrator let runs that advance dates overlap"
+
+
+async def test_stream_digest_yields_deduplicated_text_chunks_and_then_the_result(store):
+    orchestrator = DigestOrchestrator(
+        database=_FakeDatabase([_source(), _source()]),
+        parser_manager=ParserManager(tg_parser=_DatedParser(), cache_ttl=None),
+        composer=TextComposer(max_message_size=400),
+        message_store=store,
+        stream_window=5,
+    )
+    week_ago = TODAY - dt.timedelta(days=7)
+
+    await orchestrator.collect_digest(date_from=week_ago, date_to=TODAY)
+    events = [event async for event in orchestrator.stream_digest(date_from=week_ago, date_to=TODAY)]
+    kinds = [kind for kind, _ in events]
+    result = events[-1][1]
+
+    ok = kinds[-1] == "result" and kinds.count("text") > 1 and "result" not in kinds[:-1]
+    ok = ok and all(len(text) <= 400 for kind, text in events if kind == "text")
+    ok = ok and len(result["messages"]) == 16 and result["stats"]["sources_from_store"] == 2
+    ok = ok and "Всего новостей: 8" in events[-2][1] and result["stats"]["duplicates_merged"] == 8
+    ok = ok and "🔗 Источники: " in "".join(text for kind, text in events if kind == "text")
+    assert ok, "Failure: stream_digest did not stream deduplicated text chunks followed by the result"
+
+
+@pytest.mark.parametrize("streaming", [False, True])
+async def test_runs_that_advance_dates_skip_news_delivered_before_a_rewind(store, streaming):
+    source = _source()
+    database = _FakeDatabase([source])
+    orchestrator = DigestOrchestrator(
+        database=database,
+        parser_manager=ParserManager(tg_parser=_DatedParser(), cache_ttl=None),
+        composer=TextComposer(),
+        delivery_index=DeliveryIndex(store.engine),
+    )
+
+    async def run():
+        if not streaming:
+            return await orchestrator.collect_digest(update_db_dates=True)
+        events = [event async for event in orchestrator.stream_digest(update_db_dates=True)]
+        return events[-1][1]
+
+    source["last_message_date"] = TODAY - dt.timedelta(days=5)
+    first = await run()
+    source["last_message_date"] = TODAY - dt.timedelta(days=8)
+    second = await run()
+
+    ok = first["stats"]["already_delivered"] == 0 and second["stats"]["already_delivered"] == 4
+    ok = ok and len(second["messages"]) == 7 and len(database.updated) == 11
+    assert ok, "Failure: orchestrator resent news that an earlier run had already delivered"
+
+
+class _BulkParser:
+    def __init__(self, count):
+        self.count = count
+
+    async def parse_source(self, source, date_from=None, date_to=None):
+        return [
+            {**source, "date": TODAY - dt.timedelta(days=1), "message": f"новость {index} {uuid.uuid4().hex}"}
+            for index in range(self.count)
+        ]
+
+
+async def test_collect_digest_deduplicates_large_runs_off_the_event_loop(monkeypatch):
+    threads = []
+
+    def deduplicate(messages):
+        threads.append(threading.get_ident())
+        return list(messages)
+
+    monkeypatch.setattr("app.parsing.orchestrator.deduplicate", deduplicate)
+    count = INLINE_DEDUP_LIMIT + 1
+    orchestrator = DigestOrchestrator(
+        database=_FakeDatabase([_source()]),
+        parser_manager=ParserManager(tg_parser=_BulkParser(count), cache_ttl=None),
+        composer=_FakeComposer(),
+    )
+
+    result = await orchestrator.collect_digest(date_from=TODAY - dt.timedelta(days=1))
+
+    ok = threads and threads[0] != threading.get_ident() and result["texts"] == [f"сообщений: {count}"]
+    assert ok, "Failure: orchestrator deduplicated a large run on the event loop thread"
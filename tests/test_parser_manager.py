@@ -40,6 +40,33 @@ class _UnexpectedParser:
         return None
 
 
+class _PerSourceParser:
+    def __init__(self, hanging_links=(), failing_links=(), delay=0.0):
+        self.hanging_links = set(hanging_links)
+        self.failing_links = set(failing_links)
+        self.delay = delay
+        self.active = 0
+        self.max_active = 0
+        self.finished = 0
+
+    async def parse_source(self, source, date_from=None, date_to=None):
+        self.active += 1
+        self.max_active = max(self.max_active, self.active)
+        try:
+            if source["source_link"] in self.hanging_links:
+                await asyncio.sleep(3600)
+            if source["source_link"] in self.failing_links:
+                raise RuntimeError(f"сбой_{uuid.uuid4().hex[:4]}")
+            await asyncio.sleep(self.delay)
+            return [{"source_name": source["source_name"], "source_link": source["source_link"], "message": "ñ"}]
+        finally:
+            self.active -= 1
+            self.finished += 1
+
+    async def parse(self, sources, date_from=None, date_to=None):
+        raise AssertionError("parse must not be used when parse_source exists")
+
+
 def _source(source_type):
     suffix = uuid.uuid4().hex[:6]
     return {
@@ -128,3 +155,150 @@ async def test_parse_stays_stable_during_concurrent_calls():
 
     ok = all(len(result[0]) == 1 and result[1] == [] and result[2]["sources_total"] == 1 for result in [first, second, third])
     assert ok, "Failure: parser manager produced inconsistent results under concurrency"
+
+
+async def test_parse_counts_failures_per_source_instead_of_whole_parser():
+    sources = [_source("tg") for _ in range(random.randint(3, 6))]
+    failing = sources[0]["source_link"]
+    manager = ParserManager(tg_parser=_PerSourceParser(failing_links=[failing]))
+
+    messages, errors, stats = await manager.parse(sources, date_from=None, date_to=date(2026, 2, 15))
+
+    ok = len(messages) == len(sources) - 1 and len(errors) == 1 and failing in errors[0]
+    ok = ok and stats["sources_failed"] == 1 and stats["sources_with_news"] == len(sources) - 1
+    assert ok, "Failure: parser manager did not account failures per source"
+
+
+async def test_parse_dont_wait_for_hanging_source_longer_than_timeout():
+    sources = [_source("vk"), _source("vk")]
+    manager = ParserManager(vk_parser=_PerSourceParser(hanging_links=[sources[1]["source_link"]]), source_timeout=0.05)
+
+    messages, errors, stats = await asyncio.wait_for(
+        manager.parse(sources, date_from=None, date_to=date(2026, 2, 15)),
+        timeout=5,
+    )
+
+    ok = len(messages) == 1 and stats["sources_failed"] == 1 and "timeout" in errors[0]
+    assert ok, "Failure: parser manager waited for a hanging source beyond its timeout"
+
+
+async def test_parse_respects_global_and_per_type_concurrency_limits():
+    shared_parser = _PerSourceParser(delay=0.01)
+    tg_only_parser = _PerSourceParser(delay=0.01)
+    sources = [_source("tg") for _ in range(6)] + [_source("vk") for _ in range(6)]
+
+    mixed = ParserManager(tg_parser=shared_parser, vk_parser=shared_parser, max_concurrency=3)
+    single_type = ParserManager(tg_parser=tg_only_parser, type_concurrency={"TG": 2})
+    await mixed.parse(sources, date_from=None, date_to=date(2026, 2, 15))
+    await single_type.parse(sources[:6], date_from=None, date_to=date(2026, 2, 15))
+
+    ok = shared_parser.max_active == 3 and tg_only_parser.max_active == 2
+    assert ok, "Failure: parser manager exceeded configured concurrency limits"
+
+
+async def test_parse_dont_hold_other_types_behind_a_saturated_type_limit():
+    tg_parser = _PerSourceParser(delay=0.05)
+    web_parser = _PerSourceParser()
+    finished_before_web = []
+    web_parse_source = web_parser.parse_source
+
+    async def parse_web_source(source, date_from=None, date_to=None):
+        finished_before_web.append(tg_parser.finished)
+        return await web_parse_source(source, date_from=date_from, date_to=date_to)
+
+    web_parser.parse_source = parse_web_source
+    sources = [_source("tg") for _ in range(12)] + [_source("web")]
+    manager = ParserManager(tg_parser=tg_parser, web_parser=web_parser, max_concurrency=4, type_concurrency={"TG": 2})
+
+    messages, _, _ = await manager.parse(sources, date_from=None, date_to=date(2026, 2, 15))
+
+    ok = len(messages) == 13 and finished_before_web == [0] and tg_parser.max_active == 2
+    assert ok, "Failure: web source waited for global slots held by queued tg sources"
+
+
+class _CountingParser:
+    def __init__(self, delay=0.05):
+        self.delay = delay
+        self.calls = []
+
+    async def parse_source(self, source, date_from=None, date_to=None):
+        self.calls.append({"link": source["source_link"], "date_from": date_from, "date_to": date_to})
+        await asyncio.sleep(self.delay)
+        first_day = date_from.day if date_from is not None else source["last_message_date"].day + 1
+        return [
+            {"source_name": source["source_name"], "source_link": source["source_link"], "date": f"2026-02-{day:02d}"}
+            for day in range(first_day, date_to.day + 1)
+        ]
+
+
+async def test_parse_shares_one_in_flight_fetch_between_overlapping_requests():
+    parser = _CountingParser()
+    manager = ParserManager(tg_parser=parser)
+    sources = [_source("tg") for _ in range(random.randint(2, 4))]
+
+    wide, narrow = await asyncio.gather(
+        manager.parse(sources, date_from=date(2026, 2, 1), date_to=date(2026, 2, 20)),
+        manager.parse(sources, date_from=date(2026, 2, 14), date_to=date(2026, 2, 15)),
+    )
+
+    ok = len(parser.calls) == len(sources) and len(wide[0]) == 20 * len(sources)
+    ok = ok and sorted({row["date"] for row in narrow[0]}) == ["2026-02-14", "2026-02-15"]
+    ok = ok and len(narrow[0]) == 2 * len(sources) and narrow[2]["sources_with_news"] == len(sources)
+    assert ok, "Failure: parser manager did not share an in-flight fetch with an overlapping request"
+
+
+async def test_parse_starts_own_fetch_when_in_flight_range_is_narrower():
+    parser = _CountingParser()
+    manager = ParserManager(tg_parser=parser)
+    sources = [_source("tg")]
+
+    narrow, wide = await asyncio.gather(
+        manager.parse(sources, date_from=date(2026, 2, 14), date_to=date(2026, 2, 15)),
+        manager.parse(sources, date_from=date(2026, 2, 1), date_to=date(2026, 2, 20)),
+    )
+
+    ok = len(parser.calls) == 2 and len(narrow[0]) == 2 and len(wide[0]) == 20
+    assert ok, "Failure: parser manager reused an in-flight fetch that did not cover the requested range"
+
+
+async def test_command_joins_scheduled_run_whose_open_range_covers_it():
+    parser = _CountingParser()
+    manager = ParserManager(tg_parser=parser, cache_ttl=None)
+    sources = [{**_source("tg"), "last_message_date": date(2026, 2, 10)}]
+
+    scheduled, command, boundary = await asyncio.gather(
+        manager.parse(sources, date_from=None, date_to=date(2026, 2, 15)),
+        manager.parse(sources, date_from=date(2026, 2, 14), date_to=date(2026, 2, 15)),
+        manager.parse(sources, date_from=date(2026, 2, 10), date_to=date(2026, 2, 15)),
+    )
+
+    ok = [call["date_from"] for call in parser.calls] == [None, date(2026, 2, 10)]
+    ok = ok and len(scheduled[0]) == 5 and len(boundary[0]) == 6
+    ok = ok and sorted(row["date"] for row in command[0]) == ["2026-02-14", "2026-02-15"]
+    assert ok, "Failure: command did not join a scheduled run that covered its range"
+
+
+async def test_parse_answers_covered_repeat_request_from_cache_and_counts_hits():
+    parser = _CountingParser(delay=0)
+    manager = ParserManager(tg_parser=parser)
+    sources = [_source("tg") for _ in range(random.randint(2, 4))]
+
+    await manager.parse(sources, date_from=date(2026, 2, 1), date_to=date(2026, 2, 20))
+    messages, _, stats = await manager.parse(sources, date_from=date(2026, 2, 10), date_to=date(2026, 2, 12))
+
+    ok = len(parser.calls) == len(sources) and len(messages) == 3 * len(sources)
+    ok = ok and stats["cache_hits"] == len(sources) and stats["cache_misses"] == 0
+    assert ok, "Failure: parser manager did not answer a covered repeat request from its fetch cache"
+
+
+async def test_iter_parse_yields_finished_sources_without_waiting_for_slow_ones():
+    parser = _PerSourceParser(hanging_links={"slow"})
+    fast, slow = _source("tg"), {**_source("tg"), "source_link": "slow"}
+    stats, errors = {}, []
+
+    iterator = ParserManager(tg_parser=parser).iter_parse([slow, fast], stats, errors)
+    source, messages = await asyncio.wait_for(iterator.__anext__(), timeout=1)
+    await iterator.aclose()
+
+    ok = source["source_link"] == fast["source_link"] and len(messages) == 1 and stats["sources_with_news"] == 1
+    assert ok, "Failure: iter_parse waited for the slow source before yielding the finished one"
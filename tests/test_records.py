@@ -0,0 +1,38 @@
+import dataclasses
+import datetime as dt
+import uuid
+
+import pytest
+
+from app.parsing.records import NewsItem, Source
+
+
+def _source():
+    suffix = uuid.uuid4().hex[:6]
+    return {"source_name": f"кафедра_{suffix}_ñ", "source_link": f"https://t.me/{suffix}", "contact": "контакт"}
+
+
+def test_source_of_returns_one_shared_record_per_source():
+    source = _source()
+    first, second = Source.of(source), Source.of(dict(source))
+    ok = first is second and first is not Source.of({**source, "contact": "другой"})
+    assert ok, "Failure: Source.of did not intern equal sources into one record"
+
+
+def test_news_item_reads_like_the_old_message_dict_and_stays_immutable():
+    source = _source()
+    item = NewsItem(source=Source.of(source), date=dt.date(2026, 2, 12), message="новость_ñ", external_id=7)
+
+    ok = item["source_link"] == source["source_link"] and item.get("contact") == "контакт"
+    ok = ok and item.get("missing", "нет") == "нет" and dict(item) == item.to_dict()
+    ok = ok and item.to_dict() == {
+        **source,
+        "date": dt.date(2026, 2, 12),
+        "message": "новость_ñ",
+        "external_id": 7,
+        "links": (),
+    }
+    ok = ok and not hasattr(item, "__dict__")
+    with pytest.raises(dataclasses.FrozenInstanceError):
+        item.message = "другая"
+    assert ok, "Failure: NewsItem did not behave as a read-only message dict"
@@ -2,8 +2,12 @@ import datetime as dt
 import random
 import uuid
 
+from sqlalchemy import create_engine, select, update
+from sqlalchemy.orm import sessionmaker
+
+from app.models.department import Base, Department
 from data.seed_data import DEPARTMENT_SEED_DATA
-from data.seed_db import DEFAULT_LAST_NEWS_DATE, _clean_value, _parse_last_news_date
+from data.seed_db import DEFAULT_LAST_NEWS_DATE, _clean_value, _parse_last_news_date, seed_database
 
 
 def test_clean_value_cannot_keep_none_input():
@@ -44,3 +48,65 @@ def test_parse_last_news_date_keeps_existing_date_object():
 def test_seed_data_contains_non_empty_department_records():
     has_data = len(DEPARTMENT_SEED_DATA) > 0 and any("Ф" in row["name"] for row in DEPARTMENT_SEED_DATA if "name" in row)
     assert has_data, "Failure: seed data list did not contain expected department records"
+
+
+def _seeded_engine(tmp_path):
+    engine = create_engine(f"sqlite:///{tmp_path / 'seed.db'}")
+    Base.metadata.create_all(engine)
+    return engine
+
+
+def _departments(engine):
+    with sessionmaker(bind=engine)() as session:
+        return {dep.name: dep for dep in session.scalars(select(Department))}
+
+
+def test_seed_database_upserts_rows_and_keeps_dates_that_are_not_given(tmp_path):
+    engine = _seeded_engine(tmp_path)
+    dsn = str(engine.url)
+    kept, dated, added = (f"Кафедра_{uuid.uuid4().hex[:5]}_ñ" for _ in range(3))
+    with sessionmaker(bind=engine)() as session:
+        session.add_all(
+            [
+                Department(
+                    name=kept, tg_url="https://t.me/old", tg_last_message_id=10, last_news_date=dt.date(2026, 2, 1)
+                ),
+                Department(name=dated, vk_url="https://vk.com/same", vk_last_post_id=20),
+            ]
+        )
+        session.commit()
+
+    result = seed_database(
+        seed_data=[
+            {"name": kept, "tg_url": "https://t.me/new", "last_news_date": "-"},
+            {"name": dated, "vk_url": "https://vk.com/same", "last_news_date": "2026-03-05"},
+            {"name": f"  {added} ", "contact": "контакт"},
+        ],
+        dsn=dsn,
+    )
+
+    deps = _departments(engine)
+    ok = result == {"added": 1, "updated": 2, "total": 3}
+    ok = ok and deps[kept].last_news_date == dt.date(2026, 2, 1) and deps[kept].tg_last_message_id is None
+    ok = ok and deps[dated].last_news_date == dt.date(2026, 3, 5) and deps[dated].vk_last_post_id == 20
+    ok = ok and deps[added].last_news_date == DEFAULT_LAST_NEWS_DATE and deps[added].contact == "контакт"
+    assert ok, "Failure: seed_database did not upsert departments while keeping unset dates and cursors"
+
+
+def test_seed_database_dont_touch_unchanged_rows(tmp_path):
+    engine = _seeded_engine(tmp_path)
+    names = [f"Кафедра_{uuid.uuid4().hex[:5]}_ñ" for _ in range(2)]
+    seed_database(seed_data=[{"name": name, "contact": "контакт"} for name in names], dsn=str(engine.url))
+    old_stamp = dt.datetime(2020, 1, 1)
+    with sessionmaker(bind=engine)() as session:
+        session.execute(update(Department).values(updated_at=old_stamp))
+        session.commit()
+
+    seed_database(
+        seed_data=[{"name": names[0], "contact": "контакт"}, {"name": names[1], "contact": "другой"}],
+        dsn=str(engine.url),
+    )
+
+    deps = _departments(engine)
+    ok = deps[names[0]].updated_at == old_stamp and deps[names[1]].updated_at != old_stamp
+    assert ok, "Failure: seed_database rewrote a department whose seed values did not change"
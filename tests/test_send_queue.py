@@ -0,0 +1,61 @@
+import asyncio
+import random
+import time
+import uuid
+
+import pytest
+from telegram.error import RetryAfter
+
+from app.send_queue import SendQueue
+
+pytestmark = pytest.mark.anyio
+
+
+class _FakeBot:
+    def __init__(self, flood_texts=(), delay=0.0):
+        self.flood_texts = set(flood_texts)
+        self.delay = delay
+        self.sent = []
+
+    async def send_message(self, chat_id, text, parse_mode=None):
+        await asyncio.sleep(random.random() * self.delay)
+        if text in self.flood_texts:
+            self.flood_texts.discard(text)
+            raise RetryAfter(0)
+        self.sent.append((chat_id, text, time.monotonic()))
+        return text
+
+
+async def test_send_queue_keeps_per_chat_order_and_retries_after_flood_limit():
+    texts = [f"часть_{index}_{uuid.uuid4().hex[:4]}_ñ" for index in range(8)]
+    bot = _FakeBot(flood_texts={texts[3]}, delay=0.005)
+    queue = SendQueue(global_rate=1000, chat_rate=1000, chat_burst=100)
+
+    await asyncio.gather(
+        queue.send_many(1, bot.send_message, texts, chat_id=1),
+        queue.send_many(2, bot.send_message, texts[::-1], chat_id=2),
+    )
+
+    ok = [text for chat_id, text, _ in bot.sent if chat_id == 1] == texts
+    ok = ok and [text for chat_id, text, _ in bot.sent if chat_id == 2] == texts[::-1]
+    assert ok, "Failure: send queue broke per-chat order or lost the message hit by RetryAfter"
+
+
+async def test_send_queue_limits_rate_per_chat_but_sends_chats_in_parallel():
+    bot = _FakeBot()
+    queue = SendQueue(global_rate=1000, chat_rate=50, chat_burst=1)
+
+    started = time.monotonic()
+    await asyncio.gather(
+        *(
+            queue.send_many(chat_id, bot.send_message, ["а", "б", "в", "г", "д", "е"], chat_id=chat_id)
+            for chat_id in (1, 2)
+        )
+    )
+    elapsed = time.monotonic() - started
+
+    chat_times = [[sent_at for chat_id, _, sent_at in bot.sent if chat_id == chat] for chat in (1, 2)]
+    gaps = [later - earlier for times in chat_times for earlier, later in zip(times, times[1:])]
+    ok = len(bot.sent) == 12 and elapsed >= 0.09 and min(gaps) >= 0.015
+    ok = ok and chat_times[1][0] < chat_times[0][-1]
+    assert ok, "Failure: send queue did not hold the per-chat rate or serialized different chats"
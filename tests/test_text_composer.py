@@ -1,10 +1,11 @@
 import asyncio
 import random
 import uuid
+from datetime import date
 
 import pytest
 
-from app.parsing.text_composer import TextComposer
+from app.parsing.text_composer import TextComposer, utf16_len
 
 
 def _message(date_text, text):
@@ -69,3 +70,56 @@ async def test_compose_dont_produce_inconsistent_text_under_concurrent_calls():
 
     ok = first == second == third and isinstance(first, list) and "Источник" in "\n".join(first)
     assert ok, "Failure: compose produced inconsistent output under concurrent calls"
+
+
+def test_stream_without_window_produces_the_same_chunks_as_compose():
+    composer = TextComposer(message_len=120, max_message_size=600)
+    messages = [_message(f"2026-02-{random.randint(1, 28):02d}", f"новость_{index}_ñ") for index in range(40)]
+
+    stream = composer.stream(window=None)
+    chunks = []
+    for start in range(0, len(messages), 7):
+        chunks.extend(stream.add(messages[start : start + 7]))
+    chunks.extend(stream.finish())
+
+    assert chunks == composer.compose(messages), "Failure: unbuffered stream did not match compose output"
+
+
+def test_stream_sends_full_chunks_before_finish_and_sorts_within_window():
+    composer = TextComposer(message_len=120, max_message_size=600)
+    stream = composer.stream(window=3)
+
+    early = stream.add([_message(f"2026-02-{day:02d}", "новость_ñ") for day in (10, 12, 11, 14, 13)])
+    early += stream.add([_message("2026-01-20", "старая") for _ in range(10)])
+    text = "\n".join(early + stream.finish())
+
+    ok = len(early) >= 1 and text.find("14.02.2026") < text.find("12.02.2026") < text.find("10.02.2026")
+    assert ok, "Failure: stream did not emit finished chunks early or broke date order inside the window"
+
+
+def test_compose_renders_typed_dates_without_string_round_trip():
+    older, newer = _message(date(2026, 2, 10), "старый"), _message(date(2026, 2, 11), "новый_ñ")
+    text = "\n".join(TextComposer(message_len=120).compose(messages=[older, newer]))
+
+    ok = 0 <= text.find("11.02.2026") < text.find("10.02.2026")
+    assert ok, "Failure: compose did not sort and render typed dates"
+
+
+def test_compose_measures_chunk_limit_in_utf16_and_keeps_message_blocks_whole():
+    messages = [_message("2026-02-11", "🎓📅" * random.randint(10, 40)) for _ in range(60)]
+    texts = TextComposer(message_len=200, max_message_size=1000).compose(messages=messages)
+
+    ok = len(texts) > 1 and all(utf16_len(text) <= 1000 for text in texts)
+    # Чанк начинается с заголовка, блока источника или итоговой строки, но не с середины блока.
+    ok = ok and all(text.startswith(("🎓", "━━━━━━━━━━━━━\n📚", "━━━━━━━━━━━━━\n✅")) for text in texts)
+    ok = ok and all(text.count("📚") == text.count("📝 Новость") for text in texts)
+    assert ok, "Failure: compose exceeded the UTF-16 limit or split a message block between chunks"
+
+
+def test_compose_splits_a_long_piece_without_newlines_into_exact_utf16_chunks():
+    composer = TextComposer(max_message_size=100)
+
+    pieces = composer._split_long_piece("a😀" * 120)
+
+    ok = "".join(pieces) == "a😀" * 120 and len(pieces[0]) == 67 and all(utf16_len(piece) <= 100 for piece in pieces)
+    assert ok, "Failure: long piece was not split on UTF-16 boundaries without losing text"
@@ -1,19 +1,24 @@
 import asyncio
 import random
 import uuid
-from datetime import date, datetime
+from datetime import date, datetime, timedelta
 
 import pytest
+from telethon.errors import ChannelInvalidError, FloodWaitError
+from telethon.tl.types import Channel, ChatPhotoEmpty, InputPeerChannel, Message, MessageService, PeerChannel
+from telethon.tl.types.messages import ChannelMessages
 
+from app.parsing.parser_manager import ParserManager
 from app.parsing.parsers.tg_parser import TelegramParser
 
 pytestmark = pytest.mark.anyio
 
 
 class _FakeMessage:
-    def __init__(self, dt_value, text):
+    def __init__(self, dt_value, text, message_id=None):
         self.date = dt_value
         self.text = text
+        self.id = message_id
 
 
 class _FakeTelegramClient:
@@ -55,6 +60,46 @@ class _FakeTelegramClient:
         return self._disconnect_calls
 
 
+class _SlowTelegramClient(_FakeTelegramClient):
+    def __init__(self):
+        super().__init__()
+        self.active = 0
+        self.max_active = 0
+
+    def iter_messages(self, channel_link, limit=50):
+        async def _generator():
+            self.active += 1
+            self.max_active = max(self.max_active, self.active)
+            await asyncio.sleep(random.uniform(0.001, 0.01))
+            self.active -= 1
+            for message in self._messages.get(channel_link, []):
+                yield message
+
+        return _generator()
+
+
+class _FloodingTelegramClient(_FakeTelegramClient):
+    def __init__(self, flood_after, flood_seconds=0):
+        super().__init__()
+        self.flood_after = flood_after
+        self.flood_seconds = flood_seconds
+        self.calls = []
+
+    def iter_messages(self, channel_link, limit=50, offset_id=0, min_id=0):
+        self.calls.append({"limit": limit, "offset_id": offset_id, "min_id": min_id})
+
+        async def _generator():
+            messages = [
+                m for m in self._messages.get(channel_link, []) if (not offset_id or m.id < offset_id) and m.id > min_id
+            ]
+            for index, message in enumerate(messages[:limit]):
+                if len(self.calls) == 1 and index == self.flood_after:
+                    raise FloodWaitError(request=None, capture=self.flood_seconds)
+                yield message
+
+        return _generator()
+
+
 class _ParserWithStubEnsure(TelegramParser):
     def __init__(self, fake_client):
         super().__init__(api_id=1, api_hash="hash", phone_number="+79990000000", session_name="session")
@@ -73,6 +118,27 @@ class _ParserWithFailingEnsure(TelegramParser):
         raise RuntimeError(f"сбой_инициализации_{uuid.uuid4().hex[:6]}")
 
 
+class _ResolvingTelegramClient(_FakeTelegramClient):
+    def __init__(self, channel_ids):
+        super().__init__()
+        self.channel_ids = dict(channel_ids)
+        self.resolve_calls = []
+
+    async def get_input_entity(self, channel_link):
+        self.resolve_calls.append(channel_link)
+        return InputPeerChannel(channel_id=self.channel_ids[channel_link], access_hash=random.randint(1, 10**9))
+
+    def iter_messages(self, peer, limit=50):
+        async def _generator():
+            links = [link for link, channel_id in self.channel_ids.items() if channel_id == peer.channel_id]
+            if not links:
+                raise ChannelInvalidError(request=None)
+            for message in self._messages.get(links[0], []):
+                yield message
+
+        return _generator()
+
+
 def _source(link):
     return {
         "source_name": f"кафедра_{uuid.uuid4().hex[:6]}_ñ",
@@ -121,7 +187,7 @@ async def test_parse_single_channel_includes_start_date_when_explicit_date_from_
 
     result = await parser._parse_single_channel(_source(channel_link), date_from=date(2026, 2, 13), date_to=date(2026, 2, 15))
 
-    ok = [row["date"] for row in result] == ["2026-02-15", "2026-02-14", "2026-02-13"]
+    ok = [row["date"] for row in result] == [date(2026, 2, 15), date(2026, 2, 14), date(2026, 2, 13)]
     assert ok, "Failure: parser did not include explicit inclusive date_from boundary"
 
 
@@ -139,6 +205,195 @@ async def test_parse_calls_ensure_client_and_merges_results_for_many_sources():
     assert ok, "Failure: parse did not initialize client once and merge source results"
 
 
+async def test_parse_fetches_channels_concurrently_within_limit_and_keeps_order():
+    fake_client = _SlowTelegramClient()
+    channels = [f"https://t.me/{uuid.uuid4().hex[:8]}" for _ in range(random.randint(6, 10))]
+    for index, channel in enumerate(channels):
+        fake_client.set_messages(channel, [_FakeMessage(datetime(2026, 2, 15, 10, 0, 0), f"новость_{index}")])
+    parser = _ParserWithStubEnsure(fake_client=fake_client)
+    parser._max_concurrency = 3
+
+    result = await parser.parse([_source(channel) for channel in channels], date_from=None, date_to=date(2026, 2, 15))
+
+    ok = [row["message"] for row in result] == [f"новость_{index}" for index in range(len(channels))]
+    ok = ok and 1 < fake_client.max_active <= 3
+    assert ok, "Failure: parser did not fetch channels concurrently within the limit preserving order"
+
+
+async def test_parse_single_channel_resumes_channel_after_flood_wait():
+    fake_client = _FloodingTelegramClient(flood_after=1)
+    channel = f"https://t.me/{uuid.uuid4().hex[:8]}"
+    fake_client.set_messages(
+        channel,
+        [
+            _FakeMessage(datetime(2026, 2, 15 - index, 10, 0, 0), f"новость_{index}", message_id=100 - index)
+            for index in range(3)
+        ],
+    )
+    parser = TelegramParser(api_id=1, api_hash="hash", phone_number="+79990000000", session_name="session")
+    parser._client = fake_client
+
+    result = await parser._parse_single_channel(_source(channel), date_from=date(2026, 2, 1), date_to=date(2026, 2, 15))
+
+    ok = [row["message"] for row in result] == ["новость_0", "новость_1", "новость_2"]
+    ok = ok and fake_client.calls[-1]["offset_id"] == 100
+    assert ok, "Failure: parser did not resume the channel after FloodWaitError"
+
+
+async def test_flood_wait_longer_than_source_timeout_does_not_drop_the_channel():
+    fake_client = _FloodingTelegramClient(flood_after=1, flood_seconds=1)
+    channel = f"https://t.me/{uuid.uuid4().hex[:8]}"
+    fake_client.set_messages(
+        channel,
+        [
+            _FakeMessage(datetime(2026, 2, 15 - index, 10, 0, 0), f"новость_{index}", message_id=100 - index)
+            for index in range(3)
+        ],
+    )
+    parser = TelegramParser(api_id=1, api_hash="hash", phone_number="+79990000000", session_name="session")
+    parser._client = fake_client
+    manager = ParserManager(tg_parser=parser, source_timeout=0.5, cache_ttl=None)
+
+    messages, errors, _ = await manager.parse(
+        [{**_source(channel), "source_type": "tg"}], date_from=date(2026, 2, 1), date_to=date(2026, 2, 15)
+    )
+
+    ok = [row["message"] for row in messages] == ["новость_0", "новость_1", "новость_2"] and errors == []
+    assert ok, "Failure: FloodWait pause was counted against the source timeout"
+
+
+async def test_parse_single_channel_cannot_wait_longer_than_flood_limit():
+    fake_client = _FloodingTelegramClient(flood_after=0)
+    channel = f"https://t.me/{uuid.uuid4().hex[:8]}"
+    fake_client.set_messages(channel, [_FakeMessage(datetime(2026, 2, 15, 10, 0, 0), "новость", message_id=1)])
+    parser = TelegramParser(api_id=1, api_hash="hash", phone_number="+79990000000", session_name="session")
+    parser._client = fake_client
+    parser._max_flood_retries = 0
+
+    result = await parser._parse_single_channel(_source(channel), date_from=date(2026, 2, 1), date_to=date(2026, 2, 15))
+
+    assert result == [] and len(fake_client.calls) == 1, "Failure: parser retried beyond the FloodWait retry limit"
+
+
+async def test_parse_single_channel_reuses_persisted_entities_without_resolving_again(tmp_path):
+    cache_path = str(tmp_path / f"entities_{uuid.uuid4().hex[:6]}.json")
+    channel = f"https://t.me/{uuid.uuid4().hex[:8]}"
+    channel_ids = {channel: random.randint(1000, 9999)}
+    first_client = _ResolvingTelegramClient(channel_ids)
+    second_client = _ResolvingTelegramClient(channel_ids)
+    for client in (first_client, second_client):
+        client.set_messages(channel, [_FakeMessage(datetime(2026, 2, 15, 10, 0, 0), "новость_ñ")])
+
+    results = []
+    for client in (first_client, second_client):
+        parser = TelegramParser(api_id=1, api_hash="hash", phone_number="+7", entity_cache_path=cache_path)
+        parser._client = client
+        results.append(await parser._parse_single_channel(_source(channel), date_from=date(2026, 2, 1), date_to=None))
+
+    ok = all(len(result) == 1 for result in results)
+    ok = ok and len(first_client.resolve_calls) == 1 and second_client.resolve_calls == []
+    assert ok, "Failure: parser resolved a cached channel entity again on a repeated run"
+
+
+async def test_parse_single_channel_resolves_again_when_cached_entity_is_invalid(tmp_path):
+    cache_path = str(tmp_path / "entities.json")
+    channel = f"https://t.me/{uuid.uuid4().hex[:8]}"
+    stale_client = _ResolvingTelegramClient({channel: 1})
+    fresh_client = _ResolvingTelegramClient({channel: 2})
+    fresh_client.set_messages(channel, [_FakeMessage(datetime(2026, 2, 15, 10, 0, 0), "после переименования")])
+
+    stale_parser = TelegramParser(api_id=1, api_hash="hash", phone_number="+7", entity_cache_path=cache_path)
+    stale_parser._client = stale_client
+    await stale_parser._parse_single_channel(_source(channel), date_from=date(2026, 2, 1), date_to=None)
+    parser = TelegramParser(api_id=1, api_hash="hash", phone_number="+7", entity_cache_path=cache_path)
+    parser._client = fresh_client
+    result = await parser._parse_single_channel(_source(channel), date_from=date(2026, 2, 1), date_to=None)
+
+    ok = len(result) == 1 and fresh_client.resolve_calls == [channel]
+    assert ok, "Failure: parser did not invalidate a stale cached channel entity"
+
+
+async def test_parse_single_channel_fetches_only_messages_newer_than_cursor():
+    fake_client = _FloodingTelegramClient(flood_after=-1)
+    channel = f"https://t.me/{uuid.uuid4().hex[:8]}"
+    fake_client.set_messages(
+        channel,
+        [
+            _FakeMessage(datetime(2026, 2, 14, 18, 0, 0), "вечер граничного дня", message_id=12),
+            _FakeMessage(datetime(2026, 2, 14, 9, 0, 0), "уже отправлено", message_id=11),
+        ],
+    )
+    parser = TelegramParser(api_id=1, api_hash="hash", phone_number="+7")
+    parser._client = fake_client
+    source = _source(channel)
+    source["last_message_date"] = date(2026, 2, 14)
+    source["last_message_id"] = 11
+
+    result = await parser._parse_single_channel(source, date_from=None, date_to=date(2026, 2, 15))
+
+    ok = [(row["message"], row["external_id"]) for row in result] == [("вечер граничного дня", 12)]
+    ok = ok and fake_client.calls[0]["min_id"] == 11
+    assert ok, "Failure: parser did not fetch by min_id cursor including the boundary day"
+
+
+async def test_parse_single_channel_lean_mode_reads_raw_history_into_light_records():
+    peer = PeerChannel(channel_id=random.randint(1, 10**6))
+    history = [
+        Message(id=300 - i, peer_id=peer, date=datetime(2026, 2, 15, 12) - timedelta(hours=i), message=f"пост_{i}")
+        for i in range(150)
+    ]
+    history.insert(3, MessageService(id=500, peer_id=peer, date=datetime(2026, 2, 15), action=None))
+    requests = []
+
+    class _RawClient(_FakeTelegramClient):
+        async def __call__(self, request):
+            requests.append(request)
+            page = [m for m in history if not request.offset_id or m.id < request.offset_id][: request.limit]
+            return ChannelMessages(pts=0, count=len(history), messages=page, chats=[], users=[], topics=[])
+
+        def iter_messages(self, *args, **kwargs):
+            raise AssertionError("lean mode must not build high-level messages")
+
+    parser = TelegramParser(api_id=1, api_hash="hash", phone_number="+7", lean=True)
+    parser._client = _RawClient()
+    source = _source(f"https://t.me/{uuid.uuid4().hex[:8]}")
+    source["last_message_date"] = date(2026, 2, 10)
+
+    result = await parser._parse_single_channel(source, date_from=None, date_to=date(2026, 2, 15))
+
+    ok = [row["message"] for row in result][:2] == ["пост_0", "пост_1"] and len(result) == 49
+    ok = ok and [request.limit for request in requests] == [50] and requests[0].min_id == 0
+    assert ok, "Failure: lean telegram mode did not read raw history into light records"
+
+
+async def test_lean_mode_checks_rename_against_own_channel_among_several_chats(tmp_path):
+    cache_path = str(tmp_path / "entities.json")
+    username = f"kaf_{uuid.uuid4().hex[:8]}"
+    channel = f"https://t.me/{username}"
+    channel_id = random.randint(1000, 9999)
+    peer = PeerChannel(channel_id=channel_id)
+    history = [Message(id=10, peer_id=peer, date=datetime(2026, 2, 15, 12), message="репост_ñ")]
+    chats = [
+        Channel(id=channel_id + 1, title="Источник репоста", photo=ChatPhotoEmpty(), date=None, username="other_chan"),
+        Channel(id=channel_id, title="Кафедра", photo=ChatPhotoEmpty(), date=None, username=username.upper()),
+    ]
+
+    class _RawResolvingClient(_ResolvingTelegramClient):
+        async def __call__(self, request):
+            return ChannelMessages(pts=0, count=1, messages=history, chats=chats, users=[], topics=[])
+
+    clients = [_RawResolvingClient({channel: channel_id}) for _ in range(2)]
+    results = []
+    for client in clients:
+        parser = TelegramParser(api_id=1, api_hash="hash", phone_number="+7", entity_cache_path=cache_path, lean=True)
+        parser._client = client
+        results.append(await parser._parse_single_channel(_source(channel), date_from=date(2026, 2, 1), date_to=None))
+
+    ok = all([row["message"] for row in result] == ["репост_ñ"] for result in results)
+    ok = ok and len(clients[0].resolve_calls) == 1 and clients[1].resolve_calls == []
+    assert ok, "Failure: lean mode took a foreign chat from the history response for its own channel"
+
+
 async def test_parse_cannot_continue_when_client_initialization_fails():
     parser = _ParserWithFailingEnsure()
     failed = False
@@ -1,10 +1,15 @@
 import asyncio
+import json
 import random
+import re
+import threading
 import uuid
-from datetime import date, datetime
+from datetime import date, datetime, timedelta
+from types import SimpleNamespace
 
 import pytest
 
+from app.parsing.parser_manager import ParserManager
 from app.parsing.parsers.vk_parser import VkParser
 
 pytestmark = pytest.mark.anyio
@@ -18,9 +23,11 @@ class _FakeWall:
     def __init__(self, pages):
         self._pages = list(pages)
         self.calls = []
+        self.threads = []
 
     def get(self, **params):
         self.calls.append(params)
+        self.threads.append(threading.get_ident())
         if self._pages:
             return {"items": self._pages.pop(0)}
         return {"items": []}
@@ -29,6 +36,71 @@ class _FakeWall:
 class _FakeVkApi:
     def __init__(self, pages):
         self.wall = _FakeWall(pages)
+        self.execute_calls = []
+
+    def execute(self, code):
+        calls = [json.loads(args) for args in re.findall(r"API\.wall\.get\((\{.*?\})\)", code)]
+        self.execute_calls.append(calls)
+        return [self.wall.get(**params) for params in calls]
+
+
+class _FakeGroupsWall(_FakeWall):
+    def __init__(self, api):
+        super().__init__(pages=[])
+        self._api = api
+
+    def get(self, **params):
+        self.calls.append(params)
+        return self._api._send({"items": self._api._page(params)})
+
+
+class _FakeGroupsVkApi(_FakeVkApi):
+    def __init__(self, posts_by_owner):
+        super().__init__(pages=[])
+        self.wall = _FakeGroupsWall(self)
+        self.posts_by_owner = posts_by_owner
+        self.failed_owners = set()
+        self.on_response = None
+        self.sent = 0
+
+    def execute(self, code):
+        calls = [json.loads(args) for args in re.findall(r"API\.wall\.get\((\{.*?\})\)", code)]
+        self.execute_calls.append(calls)
+        return self._send(
+            [False if params["owner_id"] in self.failed_owners else {"items": self._page(params)} for params in calls]
+        )
+
+    def _send(self, response):
+        body = json.dumps(response, ensure_ascii=False).encode("utf-8")
+        self.sent += len(body)
+        if self.on_response is not None:
+            self.on_response(SimpleNamespace(headers={}, content=body))
+        return response
+
+    def _page(self, params):
+        posts = self.posts_by_owner.get(params["owner_id"], [])
+        return posts[params["offset"] : params["offset"] + params["count"]]
+
+
+class _LeanVkApi(_FakeGroupsVkApi):
+    def execute(self, code):
+        calls = [json.loads(args) for args in re.findall(r"API\.wall\.get\((\{.*?\})\)", code)]
+        self.execute_calls.append(calls)
+        fields = re.findall(r'"(\w+)":r0\.items@\.', code)
+        return self._send([self._columns(self._page(params), fields) for params in calls])
+
+    @staticmethod
+    def _columns(items, fields):
+        # Как VKScript items@.поле: посты без поля в столбец не попадают.
+        columns = {f: [p[f] for p in items if f in p] for f in fields}
+        pinned = items[0]["id"] if items and items[0].get("is_pinned") else 0
+        return {"count": len(items), **columns, "pinned": pinned}
+
+
+class _StuckOffsetVkApi(_FakeGroupsVkApi):
+    def _page(self, params):
+        # Сбой offset: стена всегда отдает свое начало.
+        return self.posts_by_owner.get(params["owner_id"], [])[: params["count"]]
 
 
 class _ParserWithFailingEnsure(VkParser):
@@ -92,7 +164,7 @@ async def test_parse_single_group_uses_last_message_date_when_date_from_is_none(
     source["last_message_date"] = date(2026, 2, 14)
     result = await parser._parse_single_group(source, date_from=None, date_to=date(2026, 2, 15))
 
-    ok = len(result) == 1 and result[0]["date"] == "2026-02-15" and result[0]["message"] == "оставить эту"
+    ok = len(result) == 1 and result[0]["date"] == date(2026, 2, 15) and result[0]["message"] == "оставить\nэту"
     assert ok, "Failure: vk parser did not respect last_message_date lower bound"
 
 
@@ -115,10 +187,204 @@ async def test_parse_single_group_includes_start_boundary_when_date_from_is_expl
         date_to=date(2026, 2, 15),
     )
 
-    ok = [row["date"] for row in result] == ["2026-02-15", "2026-02-14", "2026-02-13"]
+    ok = [row["date"] for row in result] == [date(2026, 2, 15), date(2026, 2, 14), date(2026, 2, 13)]
     assert ok, "Failure: vk parser did not include explicit inclusive date_from"
 
 
+async def test_parse_single_group_stops_at_post_cursor_and_keeps_boundary_day():
+    parser = VkParser(token="token")
+    parser._vk = _FakeVkApi(
+        pages=[
+            [
+                {"id": 91, "is_pinned": 1, "date": _timestamp(2026, 2, 1), "text": "закреп"},
+                {"id": 105, "date": _timestamp(2026, 2, 14, 18), "text": "вечер граничного дня"},
+                {"id": 104, "date": _timestamp(2026, 2, 14, 9), "text": "уже отправлено"},
+            ]
+        ]
+    )
+    source = _source("https://vk.com/public123")
+    source["last_message_date"] = date(2026, 2, 14)
+    source["last_message_id"] = 104
+
+    result = await parser._parse_single_group(source, date_from=None, date_to=date(2026, 2, 15))
+
+    ok = [(row["message"], row["external_id"]) for row in result] == [("вечер граничного дня", 105)]
+    assert ok, "Failure: vk parser did not stop at the post cursor"
+
+
+async def test_parse_single_group_runs_vk_api_calls_outside_event_loop_thread():
+    parser = VkParser(token="token", max_workers=random.randint(1, 3))
+    parser._vk = _FakeVkApi(pages=[[{"date": _timestamp(2026, 2, 15), "text": "новость_ñ"}]])
+
+    await parser._parse_single_group(_source("https://vk.com/public123"), date_from=None, date_to=date(2026, 2, 15))
+    await parser.disconnect()
+
+    threads = parser._vk.wall.threads
+    ok = bool(threads) and threading.get_ident() not in threads
+    assert ok, "Failure: vk parser called blocking vk_api on the event loop thread"
+
+
+async def test_parse_packs_wall_get_calls_of_many_groups_into_execute_batches():
+    group_count = random.randint(26, 40)
+    parser = VkParser(token="token")
+    parser._vk = _FakeGroupsVkApi(
+        posts_by_owner={
+            -i: [
+                {"date": _timestamp(2026, 2, 15), "text": f"новость_{i}"},
+                {"date": _timestamp(2026, 2, 10), "text": "стоп"},
+            ]
+            for i in range(1, group_count + 1)
+        }
+    )
+    sources = [_source(f"https://vk.com/public{i}") for i in range(1, group_count + 1)]
+
+    result = await parser.parse(sources, date_from=date(2026, 2, 15), date_to=date(2026, 2, 15))
+
+    batches = parser._vk.execute_calls
+    ok = [row["message"] for row in result] == [f"новость_{i}" for i in range(1, group_count + 1)]
+    batched_calls = sum(len(batch) for batch in batches) + len(parser._vk.wall.calls)
+    ok = ok and all(len(batch) <= 25 for batch in batches) and batched_calls == group_count
+    assert ok, "Failure: vk parser did not batch wall.get calls through execute preserving source order"
+
+
+async def test_parse_source_pages_busy_groups_to_the_bound_and_shrinks_first_page_of_quiet_ones():
+    today = date.today()
+    midnight = int(datetime.combine(today, datetime.min.time()).timestamp())
+    busy_posts = [{"id": 1000 - i, "date": midnight - i * 7000, "text": f"пост_{i}"} for i in range(250)]
+    posts = {
+        -1: busy_posts + [{"id": 1, "date": _timestamp(2020, 1, 1), "text": "стоп"}],
+        -2: [{"id": 7, "date": _timestamp(2020, 1, 1), "text": "давно"}],
+    }
+    parser = VkParser(token="token", execute_batch_size=1)
+    parser._vk = _FakeGroupsVkApi(posts_by_owner=posts)
+    parser._vk.on_response = parser._count_response_bytes
+    manager = ParserManager(vk_parser=parser, cache_ttl=None)
+    sources = [{**_source(f"https://vk.com/public{i}"), "source_type": "vk"} for i in (1, 2)]
+    month_ago = today - timedelta(days=30)
+
+    messages, _, stats, _ = await manager.parse_detailed(sources, date_from=month_ago, date_to=today)
+    await manager.parse_detailed(sources[1:], date_from=month_ago, date_to=today)
+
+    counts = [(call["owner_id"], call["count"]) for call in parser._vk.wall.calls]
+    fetched = stats["fetched_by_source"]
+    ok = len(messages) == 250 and fetched["https://vk.com/public1"]["pages"] == 4 and counts[-1] == (-2, 5)
+    ok = ok and stats["pages_fetched"] == 5
+    ok = ok and stats["bytes_fetched"] == sum(item["bytes"] for item in fetched.values())
+    ok = ok and 0 < stats["bytes_fetched"] < parser._vk.sent
+    assert ok, "Failure: vk parser did not page to the lower bound or adapt the first page size"
+
+
+async def test_parse_source_lean_mode_requests_only_needed_columns_through_execute():
+    posts = [
+        {"id": 9, "is_pinned": 1, "date": _timestamp(2026, 1, 1), "text": "закреп", "likes": {"count": 5}},
+        {"id": 8, "date": _timestamp(2026, 2, 15), "text": "новость_ñ", "attachments": [{"type": "photo"}]},
+        {"id": 7, "date": _timestamp(2026, 2, 10), "text": "старая", "copy_history": []},
+    ]
+    parser = VkParser(token="token", execute_batch_size=1, lean=True)
+    parser._vk = _LeanVkApi(posts_by_owner={-5: posts})
+    parser._vk.on_response = parser._count_response_bytes
+    day = date(2026, 2, 15)
+    fetch_stats = {}
+
+    result = await parser.parse_source(
+        _source("https://vk.com/public5"), date_from=day, date_to=day, fetch_stats=fetch_stats
+    )
+
+    ok = [(row["message"], row["external_id"]) for row in result] == [("новость_ñ", 8)]
+    ok = ok and parser._vk.execute_calls[0][0]["extended"] == 0 and not parser._vk.wall.calls
+    ok = ok and fetch_stats["bytes"] == parser._vk.sent
+    ok = ok and fetch_stats["bytes"] < len(json.dumps({"items": posts}, ensure_ascii=False).encode("utf-8"))
+    assert ok, "Failure: lean vk mode did not fetch trimmed columns through execute"
+
+
+async def test_parse_source_lean_mode_pages_walls_through_execute_only_with_or_without_pinned_post():
+    today = date.today()
+    midnight = int(datetime.combine(today, datetime.min.time()).timestamp())
+    posts = [{"id": 400 - i, "date": midnight - i * 3600, "text": f"пост_{i}_ñ"} for i in range(30)]
+    pinned = {"id": 500, "is_pinned": 1, "date": _timestamp(2020, 1, 1), "text": "закреп"}
+    parser = VkParser(token="token", lean=True)
+    parser._vk = _LeanVkApi(posts_by_owner={-5: [pinned, *posts], -6: posts})
+    week_ago = today - timedelta(days=7)
+
+    results = await asyncio.gather(
+        *(
+            parser.parse_source(_source(link), date_from=week_ago, date_to=today)
+            for link in ("https://vk.com/public5", "https://vk.com/public6")
+        )
+    )
+
+    expected = [400 - i for i in range(30)]
+    ok = all([row["external_id"] for row in result] == expected for result in results)
+    ok = ok and not parser._vk.wall.calls and [len(calls) for calls in parser._vk.execute_calls] == [2, 2]
+    assert ok, "Failure: lean vk mode did not page both walls through batched execute calls alone"
+
+
+async def test_parse_source_lean_mode_reloads_page_when_columns_are_ragged():
+    day = date(2026, 2, 15)
+    posts = [
+        {"id": 8, "date": _timestamp(2026, 2, 15, 12), "text": "новость_ñ"},
+        {"id": 7, "date": _timestamp(2026, 2, 15, 11)},
+        {"id": 6, "date": _timestamp(2026, 2, 15, 10), "text": "еще_ñ"},
+    ]
+    parser = VkParser(token="token", execute_batch_size=1, lean=True)
+    parser._vk = _LeanVkApi(posts_by_owner={-5: posts})
+
+    result = await parser.parse_source(_source("https://vk.com/public5"), date_from=day, date_to=day)
+
+    ok = [(row["message"], row["external_id"]) for row in result] == [("новость_ñ", 8), ("еще_ñ", 6)]
+    ok = ok and len(parser._vk.wall.calls) == 1 and parser._vk.wall.calls[0]["offset"] == 0
+    assert ok, "Failure: lean vk mode misaligned posts of a ragged execute response"
+
+
+async def test_parse_source_pages_long_walls_and_stops_when_offset_repeats_a_page():
+    today = date.today()
+    midnight = int(datetime.combine(today, datetime.min.time()).timestamp())
+    posts = [{"id": 5000 - i, "date": midnight, "text": f"пост_{i}"} for i in range(1500)]
+    week_ago = today - timedelta(days=7)
+    parser = VkParser(token="token", execute_batch_size=1)
+    parser._vk = _FakeGroupsVkApi(posts_by_owner={-5: posts})
+    stuck = VkParser(token="token", execute_batch_size=1)
+    stuck._vk = _StuckOffsetVkApi(posts_by_owner={-5: posts})
+
+    long_wall = await parser.parse_source(_source("https://vk.com/public5"), date_from=week_ago)
+    repeated = await stuck.parse_source(_source("https://vk.com/public5"), date_from=week_ago)
+
+    ok = len(long_wall) == 1500 and len(parser._vk.wall.calls) == 16
+    ok = ok and [row["external_id"] for row in repeated] == [5000 - i for i in range(100)]
+    ok = ok and len(stuck._vk.wall.calls) == 3
+    assert ok, "Failure: vk parser capped a long wall or kept paging a wall whose offset does not move"
+
+
+async def test_parse_dont_drop_other_groups_when_one_call_fails_inside_execute():
+    parser = VkParser(token="token")
+    parser._vk = _FakeGroupsVkApi(
+        posts_by_owner={-i: [{"date": _timestamp(2026, 2, 15), "text": "ñ"}] for i in (1, 2, 3)}
+    )
+    parser._vk.failed_owners = {-2}
+    sources = [_source(f"https://vk.com/public{i}") for i in (1, 2, 3)]
+
+    result = await parser.parse(sources, date_from=date(2026, 2, 15), date_to=date(2026, 2, 15))
+
+    ok = {row["source_link"] for row in result} == {"https://vk.com/public1", "https://vk.com/public3"}
+    assert ok, "Failure: vk parser lost healthy groups after a failed call inside execute"
+
+
+async def test_parse_source_raises_group_errors_that_parse_swallows():
+    parser = VkParser(token="token", execute_batch_size=1)
+    parser._vk = _FakeGroupsVkApi(posts_by_owner={})
+    parser._vk.wall = None
+    source = _source("https://vk.com/public123")
+
+    swallowed = await parser.parse([source], date_from=None, date_to=date(2026, 2, 15))
+    raised = False
+    try:
+        await parser.parse_source(source, date_from=None, date_to=date(2026, 2, 15))
+    except AttributeError:
+        raised = True
+
+    assert swallowed == [] and raised, "Failure: vk parse_source did not surface the per-group error"
+
+
 async def test_parse_cannot_continue_when_client_initialization_fails():
     parser = _ParserWithFailingEnsure()
     failed = False
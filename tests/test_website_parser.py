@@ -0,0 +1,288 @@
+import random
+import threading
+import uuid
+from datetime import date
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+from app.database import Database
+from app.models.department import Base
+from app.parsing.parsers.web_parsers.feeds import parse_feed, parse_sitemap
+from app.parsing.parsers.web_parsers.html_news import NewsHtmlParser, extract_news
+from app.parsing.parsers.website_parser import WebsiteParser
+from app.source_strategies import SourceStrategyStore
+
+pytestmark = pytest.mark.anyio
+
+NEWS_PAGE = """
+<html><head><title>Кафедра</title><script>var d = "01.01.2020";</script></head>
+<body>
+  <div class="news"><span>15.02.2026</span><p>Семинар кафедры ñ</p><p>в аудитории 5-19</p></div>
+  <div class="news"><span>14 февраля 2026</span><p>Защита диссертации</p></div>
+  <div class="news"><span>2026-02-10</span><p>Старая новость</p></div>
+</body></html>
+"""
+
+FEED_PAGE = """<html><head><link rel="alternate" type="application/rss+xml" href="/rss.xml"></head>
+<body>15.02.2026 Новость из HTML</body></html>"""
+
+RSS_FEED = """<?xml version="1.0" encoding="utf-8"?>
+<rss version="2.0"><channel>
+  <item><title>Семинар</title><description>&lt;p&gt;Доклад ñ&lt;/p&gt;</description>
+    <pubDate>Sun, 15 Feb 2026 10:00:00 +0300</pubDate></item>
+  <item><title>Без даты</title></item>
+</channel></rss>
+"""
+
+SITEMAP = """<?xml version="1.0" encoding="UTF-8"?>
+<urlset xmlns="http://www.sitemaps.org/schemas/sitemap/0.9">
+  <url><loc>https://example.com/news/seminar</loc><lastmod>2026-02-15T09:00:00+03:00</lastmod></url>
+  <url><loc>https://example.com/about</loc><lastmod>2026-02-15</lastmod></url>
+</urlset>
+"""
+
+
+class _SiteServer:
+    def __init__(self):
+        self.pages = {}
+        self.requests = []
+        server = self
+
+        class _Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                page = server.pages.get(self.path)
+                server.requests.append({"path": self.path, "if_none_match": self.headers.get("If-None-Match")})
+                if page is None:
+                    self.send_response(404)
+                    self.end_headers()
+                    return
+                body, etag = page
+                if etag and self.headers.get("If-None-Match") == etag:
+                    self.send_response(304)
+                    self.end_headers()
+                    server.requests[-1]["status"] = 304
+                    return
+                payload = body.encode("utf-8")
+                self.send_response(200)
+                self.send_header("Content-Type", "text/html; charset=utf-8")
+                self.send_header("Content-Length", str(len(payload)))
+                if etag:
+                    self.send_header("ETag", etag)
+                self.end_headers()
+                self.wfile.write(payload)
+                server.requests[-1]["status"] = 200
+
+            def log_message(self, *args):
+                return None
+
+        self._httpd = ThreadingHTTPServer(("127.0.0.1", 0), _Handler)
+        self._thread = threading.Thread(target=self._httpd.serve_forever, daemon=True)
+
+    def url(self, path):
+        return f"http://127.0.0.1:{self._httpd.server_address[1]}{path}"
+
+    def start(self):
+        self._thread.start()
+
+    def stop(self):
+        self._httpd.shutdown()
+        self._httpd.server_close()
+
+
+@pytest.fixture
+def site_server():
+    server = _SiteServer()
+    server.start()
+    yield server
+    server.stop()
+
+
+def _source(link):
+    return {
+        "source_name": f"кафедра_{uuid.uuid4().hex[:5]}_ñ",
+        "source_link": link,
+        "contact": "контакт",
+        "last_message_date": date(2026, 2, random.randint(10, 13)),
+    }
+
+
+def test_extract_news_splits_page_by_dates_and_skips_scripts():
+    items = extract_news(NEWS_PAGE)
+
+    ok = [item[0] for item in items] == [date(2026, 2, 15), date(2026, 2, 14), date(2026, 2, 10)]
+    ok = ok and items[0][1] == "Семинар кафедры ñ в аудитории 5-19"
+    assert ok, "Failure: html extractor did not split news items by their dates"
+
+
+def test_news_parser_joins_dates_split_between_chunks_and_stops_at_min_date():
+    parser = NewsHtmlParser(min_date=date(2026, 2, 14))
+    for start in range(0, len(NEWS_PAGE), 7):
+        parser.feed(NEWS_PAGE[start : start + 7])
+    parser.close()
+
+    ok = parser.stopped and parser.items == extract_news(NEWS_PAGE)[:2]
+    assert ok, "Failure: streaming html extractor lost dates split between chunks or read past min_date"
+
+
+async def test_parse_returns_site_news_within_date_range(site_server):
+    site_server.pages["/news"] = (NEWS_PAGE, None)
+    parser = WebsiteParser()
+
+    result = await parser.parse(
+        [_source(site_server.url("/news"))], date_from=date(2026, 2, 14), date_to=date(2026, 2, 15)
+    )
+    await parser.disconnect()
+
+    ok = [row["date"] for row in result] == [date(2026, 2, 15), date(2026, 2, 14)]
+    assert ok, "Failure: website parser did not filter site news by the requested range"
+
+
+async def test_parse_source_reuses_stored_items_when_page_is_not_modified(site_server, tmp_path):
+    etag = f'"{uuid.uuid4().hex}"'
+    site_server.pages["/news"] = (NEWS_PAGE, etag)
+    state_path = str(tmp_path / "web_state.json")
+    source = _source(site_server.url("/news"))
+
+    results = []
+    for _ in range(2):
+        parser = WebsiteParser(state_path=state_path)
+        results.append(await parser.parse_source(source, date_from=date(2026, 2, 1), date_to=date(2026, 2, 28)))
+        await parser.disconnect()
+
+    page_requests = [request for request in site_server.requests if request["path"] == "/news"]
+    statuses = [request["status"] for request in page_requests]
+    ok = statuses == [200, 304] and page_requests[1]["if_none_match"] == etag and results[0] == results[1]
+    assert ok, "Failure: website parser did not use a conditional GET for an unchanged page"
+
+
+async def test_parse_source_discovers_strategy_reading_the_page_only_down_to_min_date(site_server, tmp_path):
+    site_server.pages["/news"] = (NEWS_PAGE, None)
+    parser = WebsiteParser(state_path=str(tmp_path / "web_state.json"))
+    source = _source(site_server.url("/news"))
+
+    result = await parser.parse_source(source, date_from=date(2026, 2, 15), date_to=date(2026, 2, 28))
+    await parser.disconnect()
+
+    stored = parser._state.get(f"http:{source['source_link']}")
+    ok = [row["date"] for row in result] == [date(2026, 2, 15)] and stored["min_date"] == "2026-02-15"
+    ok = ok and [request["path"] for request in site_server.requests].count("/news") == 1
+    assert ok, "Failure: website parser discovery did not stream the page down to min_date"
+
+
+async def test_parse_source_cannot_hide_http_errors(site_server):
+    parser = WebsiteParser()
+    failed = False
+
+    try:
+        await parser.parse_source(_source(site_server.url("/missing")), date_from=None, date_to=None)
+    except Exception:
+        failed = True
+    await parser.disconnect()
+
+    assert failed, "Failure: website parser parse_source swallowed an HTTP error"
+
+
+async def test_parse_dont_fail_other_sites_when_one_site_is_down(site_server):
+    site_server.pages["/news"] = (NEWS_PAGE, None)
+    parser = WebsiteParser()
+    sources = [_source(site_server.url("/missing")), _source(site_server.url("/news"))]
+
+    result = await parser.parse(sources, date_from=date(2026, 2, 15), date_to=date(2026, 2, 15))
+    await parser.disconnect()
+
+    ok = len(result) == 1 and result[0]["source_link"] == sources[1]["source_link"]
+    assert ok, "Failure: website parser lost healthy sites because of a failing one"
+
+
+def test_feed_helpers_parse_rss_links_and_news_sitemap_entries():
+    page = NewsHtmlParser()
+    page.feed(FEED_PAGE)
+    page.close()
+    feed_items = parse_feed(RSS_FEED.encode("utf-8"))
+    sitemap_items = parse_sitemap(SITEMAP.encode("utf-8"))
+
+    ok = page.feed_links == ["/rss.xml"] and feed_items == [(date(2026, 2, 15), "Семинар. Доклад ñ")]
+    ok = ok and sitemap_items == [(date(2026, 2, 15), "https://example.com/news/seminar")]
+    assert ok, "Failure: feed helpers did not parse feed links, RSS items or sitemap entries"
+
+
+async def test_parse_source_remembers_discovered_feed_and_skips_html_on_next_run(site_server, tmp_path):
+    site_server.pages["/news"] = (FEED_PAGE, None)
+    site_server.pages["/rss.xml"] = (RSS_FEED, None)
+    state_path = str(tmp_path / "web_state.json")
+    database = Database(dsn=f"sqlite:///{tmp_path / 'strategies.db'}")
+    Base.metadata.create_all(database.engine)
+    store = SourceStrategyStore(database.engine)
+    source = _source(site_server.url("/news"))
+
+    results = []
+    for _ in range(2):
+        parser = WebsiteParser(state_path=state_path, strategy_store=store)
+        results.append(await parser.parse_source(source, date_from=date(2026, 2, 1), date_to=date(2026, 2, 28)))
+        await parser.disconnect()
+
+    paths = [request["path"] for request in site_server.requests]
+    ok = paths == ["/news", "/rss.xml", "/rss.xml"] and [row["message"] for row in results[1]] == ["Семинар. Доклад ñ"]
+    ok = ok and store.load()[source["source_link"]]["url"] == site_server.url("/rss.xml")
+    assert ok, "Failure: website parser did not reuse the discovered feed strategy"
+
+
+async def test_parse_source_uses_page_titles_for_sitemap_news(site_server):
+    sitemap = """<?xml version="1.0" encoding="UTF-8"?>
+<urlset xmlns="http://www.sitemaps.org/schemas/sitemap/0.9">
+  <url><loc>{fresh}</loc><lastmod>2026-02-15T09:00:00+03:00</lastmod></url>
+  <url><loc>{old}</loc><lastmod>2026-01-10</lastmod></url>
+</urlset>
+""".format(fresh=site_server.url("/news/seminar"), old=site_server.url("/news/old"))
+    site_server.pages["/news"] = ("<html><body>Новости скоро</body></html>", None)
+    site_server.pages["/sitemap.xml"] = (sitemap, None)
+    site_server.pages["/news/seminar"] = ("<html><head><title> Семинар  кафедры ñ </title></head></html>", None)
+    site_server.pages["/news/old"] = ("<html><head><title>Старая</title></head></html>", None)
+    parser = WebsiteParser()
+
+    result = await parser.parse_source(
+        _source(site_server.url("/news")), date_from=date(2026, 2, 1), date_to=date(2026, 2, 28)
+    )
+    await parser.disconnect()
+
+    paths = [request["path"] for request in site_server.requests]
+    ok = [row["message"] for row in result] == ["Семинар кафедры ñ"] and "/news/old" not in paths
+    assert ok, "Failure: website parser did not replace sitemap addresses with page titles"
+
+
+async def test_parse_source_falls_back_to_html_when_remembered_feed_disappears(site_server, tmp_path):
+    site_server.pages["/news"] = (FEED_PAGE, None)
+    site_server.pages["/rss.xml"] = (RSS_FEED, None)
+    parser = WebsiteParser(state_path=str(tmp_path / "web_state.json"))
+    source = _source(site_server.url("/news"))
+
+    await parser.parse_source(source, date_from=date(2026, 2, 1), date_to=date(2026, 2, 28))
+    del site_server.pages["/rss.xml"]
+    result = await parser.parse_source(source, date_from=date(2026, 2, 1), date_to=date(2026, 2, 28))
+    await parser.disconnect()
+
+    ok = [row["message"] for row in result] == ["Новость из HTML"] and parser._strategy(source["source_link"]) is None
+    assert ok, "Failure: website parser did not fall back to HTML after the feed disappeared"
+
+
+async def test_parse_source_does_not_reuse_page_cut_at_a_later_date(site_server, tmp_path):
+    etag = f'"{uuid.uuid4().hex}"'
+    site_server.pages["/news"] = (NEWS_PAGE, etag)
+    parser = WebsiteParser(state_path=str(tmp_path / "web_state.json"))
+    source = _source(site_server.url("/news"))
+
+    await parser.parse_source(source, date_from=date(2026, 2, 1), date_to=date(2026, 2, 28))
+    site_server.pages["/news"] = (NEWS_PAGE, f'"{uuid.uuid4().hex}"')
+    narrow = await parser.parse_source(source, date_from=date(2026, 2, 15), date_to=date(2026, 2, 28))
+    wide = await parser.parse_source(source, date_from=date(2026, 2, 1), date_to=date(2026, 2, 28))
+    await parser.disconnect()
+
+    statuses = [request["status"] for request in site_server.requests if request["path"] == "/news"]
+    ok = (
+        len(narrow) == 1
+        and len(wide) == 3
+        and statuses[-1] == 200
+        and site_server.requests[-1]["if_none_match"] is None
+    )
+    assert ok, "Failure: website parser reused a page that was read only down to a later date"